@@ -0,0 +1,19 @@
+"""URL configuration of the ASGI deployment, see app.asgi
+
+The API views are served by core.async_views: the same views and URL
+names as app.urls, with their blocking work run in a bounded pool.
+"""
+from django.contrib import admin
+from django.urls import path
+
+from core.async_views import async_include, async_view
+from core.views import MetricsView, healthz, readyz
+
+urlpatterns = [
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
+    path('admin/', admin.site.urls),
+    path('api/metrics/', async_view(MetricsView.as_view()), name='metrics'),
+    path('api/user/', async_include('user.urls')),
+    path('api/recipe/', async_include('recipe.urls')),
+]
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'core',
@@ -45,7 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,7 +57,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'app.urls'
+# app.asgi selects app.asgi_urls, which serves the API views asynchronously
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'app.urls')
 
 TEMPLATES = [
     {
@@ -78,17 +82,207 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The backend adds health checks and an optional in-process pool, see
+# core.db.backends.postgresql. Connections are kept for DB_CONN_MAX_AGE
+# seconds; with DB_POOL_SIZE set, use 0 so requests hand theirs back to
+# the pool. Behind a pooler in transaction mode (pgbouncer) set
+# DB_DISABLE_SERVER_SIDE_CURSORS=1, as cursors cannot outlive the
+# transaction that the pooler pins to one server connection.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'HOST': os.environ.get('DB_HOST'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
-        'PORT' : os.environ.get('DB_PORT')
+        'PORT' : os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS':
+            os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        'POOL_SIZE': int(os.environ.get('DB_POOL_SIZE', 0)),
+        'POOL_TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'DISABLE_SERVER_SIDE_CURSORS':
+            os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS') == '1',
     }
 }
 
+# Read replicas, see core.routers. Every host in DB_REPLICA_HOSTS gets an
+# alias replica1, replica2, ... using the credentials of default. Users
+# are pinned to the primary for REPLICA_PIN_SECONDS after a write, which
+# should exceed the replication lag; REPLICA_PIN_CACHE_ALIAS must be
+# shared by all workers, see core.checks. An unreachable replica is
+# skipped for REPLICA_RETRY_SECONDS.
+
+_replica_hosts = [
+    host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',')
+    if host
+]
+for _number, _host in enumerate(_replica_hosts, 1):
+    DATABASES['replica%d' % _number] = dict(
+        DATABASES['default'], HOST=_host, TEST={'MIRROR': 'default'}
+    )
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = [
+    'replica%d' % number for number in range(1, len(_replica_hosts) + 1)
+]
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+REPLICA_PIN_CACHE_ALIAS = os.environ.get('REPLICA_PIN_CACHE_ALIAS', 'default')
+REPLICA_RETRY_SECONDS = 30
+
+
+# Response compression, see core.middleware. Encodings are tried in this
+# order; br and zstd need the brotli and zstandard packages.
+
+COMPRESSION_ENCODINGS = os.environ.get(
+    'COMPRESSION_ENCODINGS', 'zstd,br,gzip'
+).split(',')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4
+COMPRESSION_ZSTD_LEVEL = 3
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+# The JSON renderer and parser use orjson when it is installed.
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'default'),
+    },
+    # Rendered list payloads. The local-memory backend evicts least
+    # recently used entries once MAX_ENTRIES is reached.
+    'lists': {
+        'BACKEND': os.environ.get(
+            'LIST_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('LIST_CACHE_LOCATION', 'lists'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('LIST_CACHE_MAX_ENTRIES', 2000)),
+        },
+    },
+    # Per-user list version tokens, see recipe.cache. Kept apart from the
+    # payloads so they are not evicted to make room for them.
+    'versions': {
+        'BACKEND': os.environ.get(
+            'VERSION_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('VERSION_CACHE_LOCATION', 'versions'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.environ.get('VERSION_CACHE_MAX_ENTRIES', 100000)
+            ),
+        },
+    },
+}
+
+# Set when more than one process serves requests: the system checks in
+# core.checks then refuse caches that keep a copy per process
+SHARED_CACHES_REQUIRED = os.environ.get('SHARED_CACHES_REQUIRED') == '1'
+
+RECIPE_LIST_CACHE_ENABLED = os.environ.get('RECIPE_LIST_CACHE', '1') == '1'
+RECIPE_LIST_CACHE_ALIAS = 'lists'
+RECIPE_LIST_VERSION_CACHE_ALIAS = 'versions'
+RECIPE_LIST_CACHE_TIMEOUT = 300
+# Larger payloads are not cached, bounding memory to roughly
+# MAX_ENTRIES * RECIPE_LIST_CACHE_MAX_BYTES
+RECIPE_LIST_CACHE_MAX_BYTES = 256 * 1024
+# Build tag and ingredient lists from values() rows instead of running
+# the serializer per item
+RECIPE_VALUES_LIST = os.environ.get('RECIPE_VALUES_LIST', '1') == '1'
+# Largest number of items accepted by the bulk create endpoints
+RECIPE_BULK_MAX_ITEMS = 5000
+# Most ids of ?tags= or ?ingredients= with match=all; each adds an EXISTS
+# subquery to the recipe list
+RECIPE_FILTER_MAX_ALL_IDS = 20
+# Rows fetched per round trip when streaming exports
+RECIPE_EXPORT_CHUNK_SIZE = 2000
+# Recipes written per transaction by the NDJSON importer
+RECIPE_IMPORT_BATCH_SIZE = 1000
+# Search backend, see recipe.search: 'postgres' uses the indexed
+# search_vector column, 'python' an in-process inverted index and 'auto'
+# picks by database vendor
+RECIPE_SEARCH_BACKEND = os.environ.get('RECIPE_SEARCH_BACKEND', 'auto')
+# Users whose in-process search index is kept in memory
+RECIPE_SEARCH_INDEX_SIZE = int(os.environ.get('RECIPE_SEARCH_INDEX_SIZE', 128))
+# Name suggestions, see recipe.autocomplete: users whose prefix indexes are
+# kept in memory, and how many users must share a name (at most
+# SHARED_MAX_NAMES of them, refreshed every SHARED_TTL seconds) before it
+# is suggested to everyone
+RECIPE_AUTOCOMPLETE_USERS = int(os.environ.get('RECIPE_AUTOCOMPLETE_USERS', 1024))
+RECIPE_AUTOCOMPLETE_SHARED_MIN_USERS = 3
+RECIPE_AUTOCOMPLETE_SHARED_MAX_NAMES = 10000
+RECIPE_AUTOCOMPLETE_SHARED_TTL = 300
+
+# Token authentication cache, see core.authentication. Set
+# AUTH_TOKEN_CACHE_ALIAS to a shared cache alias to use it instead of the
+# per-process cache, so revoking a token reaches every worker.
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get('AUTH_TOKEN_CACHE_ALIAS') or None
+
+# ASGI serving, see core.async_views. Threads running the blocking part of
+# async views; at most this many database connections per process.
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 16))
+
+# Per-request query counts and phase timings, see core.instrumentation.
+# Set INSTRUMENTATION=1 to add Server-Timing headers, log a JSON line per
+# request and serve per-route histograms at /api/metrics/. An SQL shape
+# run more than INSTRUMENTATION_N_PLUS_ONE times in a request is logged
+# as an N+1 warning.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION') == '1'
+INSTRUMENTATION_N_PLUS_ONE = int(
+    os.environ.get('INSTRUMENTATION_N_PLUS_ONE', 10)
+)
+
+# /healthz answers while the process runs; /readyz also needs the database
+# and default cache to answer, see core.health. Its result is reused for
+# HEALTH_CHECK_TTL seconds so frequent probes stay cheap.
+HEALTH_CHECK_TTL = float(os.environ.get('HEALTH_CHECK_TTL', 1))
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+# Comma separated hasher paths; the first one hashes new passwords and
+# stored hashes made by the others are upgraded on login.
+
+PASSWORD_HASHERS = os.environ.get('PASSWORD_HASHERS', ','.join([
+    'core.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+])).split(',')
+
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get('PASSWORD_HASH_ITERATIONS', 260000)
+)
+# Processes used to hash passwords off the request thread, 0 hashes inline
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -0,0 +1,41 @@
+"""
+Production settings, used by gunicorn.conf.py and docker-compose.prod.yml.
+
+Everything not overridden here comes from app.settings. DEBUG is off,
+which also stops Django from keeping every SQL query of a request in
+memory and enables the cached template loader.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from app.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set')
+
+# gunicorn.conf.py forks several workers, which must share every cache;
+# see core.checks. MEMCACHED_LOCATION lists host:port servers.
+SHARED_CACHES_REQUIRED = True
+_memcached = os.environ.get('MEMCACHED_LOCATION')
+if _memcached:
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': _memcached.split(','),
+            'KEY_PREFIX': alias,
+        }
+        for alias in CACHES  # noqa: F405
+    }
+    # A second tier for token lookups, see core.authentication
+    AUTH_TOKEN_CACHE_ALIAS = os.environ.get(
+        'AUTH_TOKEN_CACHE_ALIAS', 'default'
+    ) or None
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host
+]
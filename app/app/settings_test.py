@@ -0,0 +1,32 @@
+"""
+Fast test settings: python manage.py test --settings=app.settings_test
+
+Everything not overridden here comes from app.settings. The tests run
+against in-memory SQLite built straight from the models rather than by
+replaying every migration, hash passwords with MD5 and are spread over
+all CPU cores by core.test_runner.FastTestRunner. The Postgres specific
+tests skip themselves; run the suite with app.settings before merging.
+"""
+from app.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        # Create the schema from the models, a snapshot of the migrations
+        'TEST': {'MIGRATE': False},
+    },
+    # Not in DATABASE_REPLICAS, so only core.tests.test_routers reads
+    # from it
+    'replica1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Insecure, but hashing is most of the cost of creating a test user
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+PASSWORD_HASH_WORKERS = 0
+
+TEST_RUNNER = 'core.test_runner.FastTestRunner'
@@ -0,0 +1,210 @@
+"""Async adapters that serve the synchronous API views under ASGI.
+
+Under ASGI Django runs every synchronous view on one shared thread, so a
+worker process handles a single request at a time. `async_view` turns a
+view into a coroutine that hands the blocking part of the request - the
+ORM, serializers and rendering - to a pool of ASYNC_VIEW_THREADS threads
+shared by all requests. The event loop only holds the sockets, so idle
+or slow clients cost a coroutine instead of a thread, while the pool
+bounds the number of concurrent database connections.
+
+Django 3.2 iterates streamed bodies on the event loop, where the ORM
+refuses to run. Serve the project with this module's ASGIHandler, which
+sends the body of a streaming response chunk by chunk as a pool thread
+produces it.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers import asgi
+from django.db import close_old_connections, connections
+from django.urls import URLPattern, URLResolver, include
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared pool that runs blocking work"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_VIEW_THREADS,
+                thread_name_prefix='async-view'
+            )
+    return _executor
+
+
+def shutdown():
+    """Close the database connections of the pool threads and stop them"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return
+    # Every task waits for the others, so each runs on its own thread
+    size = settings.ASYNC_VIEW_THREADS
+    barrier = threading.Barrier(size)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+    for future in [executor.submit(close) for _ in range(size)]:
+        future.result()
+    executor.shutdown()
+
+
+def _call(func, args, kwargs):
+    # Pool threads keep their own connections; drop the ones that are
+    # broken or past CONN_MAX_AGE like Django does around each request
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def _run_in(context, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(context.run, _call, func, args, kwargs)
+    )
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run func in the shared pool and return its result.
+
+    Context variables set by the caller are visible to func.
+    """
+    return await _run_in(contextvars.copy_context(), func, *args, **kwargs)
+
+
+_done = object()
+
+
+async def _stream(context, body, make_bytes):
+    """Yield the chunks of a streamed body as a pool thread produces them.
+
+    The body may read through a database cursor, which belongs to the
+    connection of the thread that opened it, so one thread produces the
+    whole body, at most one chunk ahead of the event loop. Stopping early
+    closes the body on that thread.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue()
+    taken = threading.Semaphore(1)
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            for part in body:
+                chunk = make_bytes(part)
+                taken.acquire()
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        finally:
+            close = getattr(body, 'close', None)
+            if close is not None:
+                close()
+            loop.call_soon_threadsafe(chunks.put_nowait, _done)
+
+    producer = asyncio.ensure_future(_run_in(context, produce))
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is _done:
+                break
+            taken.release()
+            yield chunk
+    finally:
+        stopped.set()
+        taken.release()
+        # Raises what the body raised
+        await producer
+
+
+def _respond(view, request, args, kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response
+
+
+def async_view(view):
+    """Wrap a synchronous view so it runs in the shared pool"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # The body is produced in the context the view ran in
+        context = contextvars.copy_context()
+        response = await _run_in(
+            context, _respond, view, request, args, kwargs
+        )
+        if response.streaming:
+            # Sent by ASGIHandler instead of iterated on the event loop
+            response.pooled_content = _stream(
+                context, response._iterator, response.make_bytes
+            )
+            response.streaming_content = ()
+        return response
+    return wrapper
+
+
+def asyncify(patterns):
+    """Return a copy of URL patterns with every view wrapped by async_view"""
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            result.append(URLResolver(
+                pattern.pattern, asyncify(pattern.url_patterns),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace
+            ))
+        elif isinstance(pattern, URLPattern):
+            result.append(URLPattern(
+                pattern.pattern, async_view(pattern.callback),
+                pattern.default_args, pattern.name
+            ))
+        else:
+            result.append(pattern)
+    return result
+
+
+def async_include(module):
+    """Like include() for a URL module, with its views made async"""
+    module = include(module)[0]
+    return include((asyncify(module.urlpatterns), module.app_name))
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """ASGI handler that sends pooled streamed bodies as they are produced"""
+
+    async def send_response(self, response, send):
+        content = getattr(response, 'pooled_content', None)
+        if content is None:
+            return await super().send_response(response, send)
+
+        async def send_pooled(message):
+            # Django sends no parts of the emptied streaming_content, then
+            # a closing message
+            if message['type'] == 'http.response.body':
+                async for chunk in content:
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send(message)
+        await super().send_response(response, send_pooled)
+
+
+def get_asgi_application():
+    """Like django.core.asgi.get_asgi_application, with ASGIHandler"""
+    django.setup(set_prefix=False)
+    return ASGIHandler()
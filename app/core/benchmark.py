@@ -0,0 +1,144 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+
+def timeit(func, repeat=20):
+    """Call func repeat times and return the durations in seconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of samples"""
+    ordered = sorted(samples)
+    index = max(int(round(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Return p50/p95/p99/mean of samples in milliseconds"""
+    return {
+        'p50': percentile(samples, 50) * 1000,
+        'p95': percentile(samples, 95) * 1000,
+        'p99': percentile(samples, 99) * 1000,
+        'mean': statistics.mean(samples) * 1000,
+    }
+
+
+def format_summary(label, samples):
+    stats = summarize(samples)
+    return '%-32s p50 %8.2fms  p95 %8.2fms  p99 %8.2fms' % (
+        label, stats['p50'], stats['p95'], stats['p99']
+    )
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_bench_user(email='bench@whbx.io'):
+    """Create a user without paying the password hashing cost"""
+    return get_user_model().objects.create_user(email=email, password=None)
+
+
+_test_environment = False
+
+
+def api_client(user=None):
+    """Return an in-process API client, authenticated as user if given"""
+    global _test_environment
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+
+    if not _test_environment:
+        # Adds the test host to ALLOWED_HOSTS and turns DEBUG off
+        setup_test_environment()
+        _test_environment = True
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def _children(pid):
+    children = []
+    try:
+        for task in os.listdir('/proc/%d/task' % pid):
+            with open('/proc/%d/task/%s/children' % (pid, task)) as f:
+                children += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return children
+
+
+def rss_bytes(pid):
+    """Return the summed RSS of a process and its descendants.
+
+    Reads /proc, so it returns None on systems without it. Pages shared
+    by forked workers are counted once per process.
+    """
+    if not os.path.exists('/proc/%d/status' % pid):
+        return None
+    total, pending = 0, [pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open('/proc/%d/status' % pid) as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            # Exited while being measured
+            continue
+        pending += _children(pid)
+    return total
+
+
+def compare(results, baseline, threshold):
+    """Return the regressions of results against a baseline.
+
+    Both map names to measurements such as the output of
+    `loadgen.run`, plus `queries` per request and `rss_mb`. Throughput,
+    latency and memory may be `threshold` percent worse than the
+    baseline; any extra query or a new error is a regression.
+    """
+    factor = threshold / 100.0
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        result = results.get(name)
+        if result is None:
+            regressions.append('%s: not measured' % name)
+            continue
+        checks = [
+            ('req/s', result.get('rps', 0), base.get('rps'), -1),
+            ('p50', result.get('p50'), base.get('p50'), 1),
+            ('p95', result.get('p95'), base.get('p95'), 1),
+            ('rss_mb', result.get('rss_mb'), base.get('rss_mb'), 1),
+        ]
+        for label, value, expected, sign in checks:
+            if value is None or not expected:
+                continue
+            if sign * (value - expected) > factor * expected:
+                regressions.append('%s: %s %.2f, baseline %.2f' % (
+                    name, label, value, expected
+                ))
+        if result.get('queries', 0) > base.get('queries', 0):
+            regressions.append('%s: %d queries, baseline %d' % (
+                name, result['queries'], base['queries']
+            ))
+        if result.get('errors') and not base.get('errors'):
+            regressions.append('%s: %d errors' % (name, result['errors']))
+    return regressions
@@ -0,0 +1,71 @@
+"""System checks, run by manage.py commands before they start.
+
+Several caches hold state that every worker must agree on. The
+local-memory backend keeps a copy per process, so once more than one
+process serves requests (SHARED_CACHES_REQUIRED) those aliases need a
+shared backend such as memcached. The replica pin cache needs one
+whenever DATABASE_REPLICAS is set, whatever the number of processes.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+def _shared_aliases():
+    """Return {alias: what goes wrong when it is per process}"""
+    # Name suggestions check the version tokens even when lists are not
+    # cached, see recipe.autocomplete
+    aliases = {
+        settings.RECIPE_LIST_VERSION_CACHE_ALIAS:
+            'a write would only invalidate the lists and name suggestions '
+            'of one worker',
+    }
+    if settings.RECIPE_LIST_CACHE_ENABLED:
+        aliases[settings.RECIPE_LIST_CACHE_ALIAS] = \
+            'workers would serve lists other workers have invalidated'
+    if settings.AUTH_TOKEN_CACHE_ALIAS:
+        # The only token cache tier when set, see core.authentication
+        aliases[settings.AUTH_TOKEN_CACHE_ALIAS] = \
+            'a token deleted or a user deactivated through one worker ' \
+            'would keep authenticating in the others for up to ' \
+            'AUTH_TOKEN_CACHE_TTL seconds'
+    return aliases
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if not settings.SHARED_CACHES_REQUIRED:
+        return []
+    return [
+        Error(
+            "The '%s' cache is local to each process, so %s." % (
+                alias, problem
+            ),
+            hint='Set MEMCACHED_LOCATION, see app.settings_production.',
+            obj=alias,
+            id='core.E001',
+        )
+        for alias, problem in _shared_aliases().items()
+        if isinstance(caches[alias], LocMemCache)
+    ]
+
+
+@register(Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    alias = settings.REPLICA_PIN_CACHE_ALIAS
+    if not settings.DATABASE_REPLICAS or \
+            not isinstance(caches[alias], LocMemCache):
+        return []
+    return [
+        Error(
+            "The '%s' cache is local to each process, so users may read "
+            "from a replica right after writing through another worker." % (
+                alias
+            ),
+            hint='Set REPLICA_PIN_CACHE_ALIAS to a shared cache, or '
+                 'MEMCACHED_LOCATION in production.',
+            obj=alias,
+            id='core.E002',
+        )
+    ]
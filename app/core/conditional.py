@@ -0,0 +1,46 @@
+"""Conditional GET support for API views.
+
+Views build an ETag and a Last-Modified timestamp from cheap validators
+and pass them to `respond`, which answers 304 before the view does any
+other work and stamps full responses with the same validators.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Return a strong ETag for the given validator parts"""
+    raw = '\x1f'.join(str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def timestamp(value):
+    """Return a datetime as whole seconds since the epoch, or None"""
+    return int(value.timestamp()) if value is not None else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the request's validators still match"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def respond(request, etag, last_modified, view):
+    """Return a 304 if the validators match, else the result of view()"""
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = view()
+    return set_validators(response, etag, last_modified)
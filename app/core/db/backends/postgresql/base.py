@@ -0,0 +1,166 @@
+"""PostgreSQL backend with connection health checks and an optional pool.
+
+Extra keys in the DATABASES entry:
+
+* CONN_HEALTH_CHECKS: test a persistent connection with `SELECT 1` the
+  first time it is used in a request, and reconnect if that fails,
+  instead of failing the request on a connection the server dropped.
+* POOL_SIZE: when set, connections are borrowed from a pool shared by
+  all threads of the process and returned to it when Django closes
+  them, so with CONN_MAX_AGE = 0 each request reuses an open connection
+  without any thread holding one while idle. At most POOL_SIZE are open
+  at once; a thread waits up to POOL_TIMEOUT seconds for a free one.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg2 import extensions
+
+Database = base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """Open connections shared by the threads of one process"""
+
+    def __init__(self, max_size, timeout, health_checks):
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def get(self, connect):
+        """Borrow an idle connection, or open one with connect()"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                'no database connection free in the pool after %ss'
+                % self.timeout
+            )
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return connect()
+                if not connection.closed and (
+                    not self.health_checks or _is_usable(connection)
+                ):
+                    return connection
+                connection.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def put(self, connection, discard=False):
+        """Return a borrowed connection, closing it if discard is set"""
+        try:
+            if not discard and not connection.closed:
+                status = connection.get_transaction_status()
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            if discard:
+                connection.close()
+            elif not connection.closed:
+                with self._lock:
+                    self._idle.append(connection)
+        except Database.Error:
+            connection.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def get_pool(conn_params, settings_dict):
+    """Return this process's pool for conn_params"""
+    # Forked workers must not share the parent's sockets
+    key = (os.getpid(), repr(sorted(conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                settings_dict['POOL_SIZE'],
+                settings_dict.get('POOL_TIMEOUT', 10),
+                settings_dict.get('CONN_HEALTH_CHECKS', False)
+            )
+    return pool
+
+
+def close_pools():
+    """Close the idle connections of every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.health_check_done = False
+
+    def get_new_connection(self, conn_params):
+        if not self.settings_dict.get('POOL_SIZE'):
+            self.pool = None
+            return super().get_new_connection(conn_params)
+        self.pool = get_pool(conn_params, self.settings_dict)
+        connection = self.pool.get(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def connect(self):
+        # A new connection needs no check, and connect() itself calls
+        # ensure_connection() before autocommit is set
+        self.health_check_done = True
+        super().connect()
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                # A connection closed inside atomic() stays referenced
+                # by this wrapper until the block exits
+                self.pool.put(self.connection, discard=self.in_atomic_block)
+            return
+        super()._close()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Runs when a request starts and finishes
+        self.health_check_done = False
+
+    @async_unsafe
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done and \
+                self.settings_dict.get('CONN_HEALTH_CHECKS') and \
+                not self.in_atomic_block:
+            self.health_check_done = True
+            if not self.is_usable():
+                self.close()
+        super().ensure_connection()
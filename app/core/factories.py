@@ -0,0 +1,100 @@
+"""Build users, tags, ingredients and recipes in bulk for tests.
+
+Every factory inserts its rows with one bulk query, so fixtures of
+hundreds of rows cost a few queries rather than one or more per row.
+bulk_create sends no signals, so the factories then do what the recipe
+signals would: compute the search vectors of new recipes and bump the
+list cache versions of the users whose rows changed.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from rest_framework.authtoken.models import Token
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import cache, search
+
+
+def _created(objs, queryset):
+    """Return the bulk created objs in id order, with their ids"""
+    if objs and objs[0].pk is None:
+        # Backends that cannot return ids from bulk inserts
+        objs = reversed(queryset.order_by('-id')[:len(objs)])
+    return sorted(objs, key=lambda obj: obj.pk)
+
+
+def users(count, email='user%d@whbx.io', password='Password1', **fields):
+    """Create count users sharing one password, hashed once"""
+    model = get_user_model()
+    encoded = make_password(password)
+    created = _created(model.objects.bulk_create(
+        model(email=email % i, password=encoded, **fields)
+        for i in range(count)
+    ), model.objects.all())
+    for user in created:
+        # As the user post_save signal does, in case an id is reused
+        for related in (Tag, Ingredient, Recipe):
+            cache.bump_version(related._meta.label_lower, user.pk)
+    return created
+
+
+def user(email='whafeez21@gmail.com', password='Password1', **fields):
+    """Create one user"""
+    return get_user_model().objects.create_user(email, password, **fields)
+
+
+def tokens(users):
+    """Create an API token for every user"""
+    return Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in users
+    )
+
+
+def _named(model, user, count, name, start):
+    created = _created(model.objects.bulk_create(
+        model(user=user, name=name % i) for i in range(start, start + count)
+    ), model.objects.filter(user=user))
+    cache.bump_version(model._meta.label_lower, user.pk)
+    return created
+
+
+def tags(user, count, name='Tag %d', start=0):
+    """Create count tags named name % n for n from start"""
+    return _named(Tag, user, count, name, start)
+
+
+def ingredients(user, count, name='Ingredient %d', start=0):
+    """Create count ingredients named name % n for n from start"""
+    return _named(Ingredient, user, count, name, start)
+
+
+def recipes(user, count, title='Recipe %d', start=0, tags=(),
+            ingredients=(), per_recipe=None, **fields):
+    """Create count recipes linked to the given tags and ingredients.
+
+    Every recipe gets per_recipe of each, all of them by default, taken
+    in turn, so with count * per_recipe tags no two recipes share one.
+    """
+    fields = dict({'time_minutes': 5, 'price': 5}, **fields)
+    created = _created(Recipe.objects.bulk_create(
+        Recipe(user=user, title=title % i, **fields)
+        for i in range(start, start + count)
+    ), Recipe.objects.filter(user=user))
+    for relation, linked in (('tags', tags), ('ingredients', ingredients)):
+        if not linked:
+            continue
+        through = getattr(Recipe, relation).through
+        column = '%s_id' % linked[0]._meta.model_name
+        links = min(per_recipe or len(linked), len(linked))
+        through.objects.bulk_create(
+            through(recipe_id=recipe.pk, **{
+                column: linked[(n * links + i) % len(linked)].pk
+            })
+            for n, recipe in enumerate(created) for i in range(links)
+        )
+        cache.bump_version(linked[0]._meta.label_lower, user.pk)
+    if created:
+        search.update_vectors(Recipe.objects.filter(
+            user=user, pk__range=(created[0].pk, created[-1].pk)
+        ))
+    cache.bump_version(search.RECIPE_LABEL, user.pk)
+    return created
@@ -0,0 +1,34 @@
+"""JSON encoding with orjson when it is installed, stdlib json otherwise.
+
+orjson is optional; without it every function here behaves like the
+stdlib module with compact separators and unescaped unicode.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def available():
+    return orjson is not None
+
+
+def dumps(value, default=None):
+    """Encode value as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        # Aware UTC datetimes end in Z, as DRF's encoder writes them
+        return orjson.dumps(value, default=default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        value, default=default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
@@ -0,0 +1,70 @@
+import base64
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.crypto import pbkdf2
+
+_pool = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _derive(password, salt, iterations, digest_name):
+    """Run in a pool process; must stay importable at module level"""
+    return pbkdf2(
+        password, salt, iterations, digest=getattr(hashlib, digest_name)
+    )
+
+
+def _executor():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            workers = settings.PASSWORD_HASH_WORKERS
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            # Bound the backlog so a login storm queues in the request
+            # threads instead of piling up work inside the pool.
+            _slots = threading.BoundedSemaphore(workers * 4)
+        return _pool, _slots
+
+
+def shutdown():
+    """Stop the hashing pool; the next hash starts a new one"""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher with a configurable work factor.
+
+    The iteration count comes from PASSWORD_HASH_ITERATIONS; stored hashes
+    with a different count are rehashed on the next successful login. With
+    PASSWORD_HASH_WORKERS set, the key derivation runs in a bounded process
+    pool so request threads do not compete for the CPU it needs.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def encode(self, password, salt, iterations=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        iterations = iterations or self.iterations
+        digest_name = self.digest().name
+        if settings.PASSWORD_HASH_WORKERS:
+            pool, slots = _executor()
+            with slots:
+                hash = pool.submit(
+                    _derive, password, salt, iterations, digest_name
+                ).result()
+        else:
+            hash = _derive(password, salt, iterations, digest_name)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, hash)
@@ -0,0 +1,59 @@
+"""Liveness and readiness checks for the /healthz and /readyz endpoints.
+
+Readiness needs the default database and cache to answer. The result
+is kept in this process for HEALTH_CHECK_TTL seconds, so polling every
+second costs the backing services little.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_results = LRUCache(max_size=1, ttl=settings.HEALTH_CHECK_TTL)
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def check_cache():
+    # Some backends ignore failed writes, so read the value back
+    cache = caches['default']
+    cache.set('health:ready', 1, 60)
+    if cache.get('health:ready') != 1:
+        raise RuntimeError('Cache did not return the value written')
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+}
+
+
+def readiness():
+    """Return (ready, {check: 'ok' or 'unavailable'}), cached briefly"""
+    result = _results.get('ready')
+    if result is None:
+        checks = {}
+        for name, check in CHECKS.items():
+            try:
+                check()
+                checks[name] = 'ok'
+            except Exception:
+                logger.warning('Readiness check %s failed', name,
+                               exc_info=True)
+                checks[name] = 'unavailable'
+        result = (all(value == 'ok' for value in checks.values()), checks)
+        _results.set('ready', result)
+    return result
+
+
+def clear():
+    """Forget the cached result, so the next call checks again"""
+    _results.clear()
@@ -0,0 +1,206 @@
+"""Per-request SQL and timing instrumentation.
+
+InstrumentationMiddleware (core.middleware) starts a RequestStats for
+every request. Queries on any connection are counted and timed by an
+execute wrapper, grouped by SQL shape to spot N+1 patterns, and the
+auth, serialize, view and render phases are timed with `timed`. Finished
+requests are added to per-route histograms kept in this process, which
+the metrics endpoint (core.views) reports.
+"""
+import contextvars
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from rest_framework import serializers
+
+# Upper bounds in milliseconds of the latency histogram buckets
+BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar('request_stats', default=None)
+_numbers = re.compile(r'\b\d+(\.\d+)?\b')
+_strings = re.compile(r"'(?:[^']|'')*'")
+_lists = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def sql_shape(sql):
+    """Return sql with literals and IN lists replaced by placeholders"""
+    sql = _strings.sub('?', sql)
+    sql = _numbers.sub('?', sql)
+    return _lists.sub('(...)', sql)
+
+
+class RequestStats:
+    """Queries and phase timings of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.phases = Counter()
+        self._open = set()
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.shapes[sql_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """Return (shape, count) of queries run more than threshold times"""
+        return [(shape, count) for shape, count in self.shapes.most_common()
+                if count > threshold]
+
+
+def start():
+    """Begin collecting stats for the current request"""
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def finish():
+    # Under ASGI the middleware hooks run in copies of the request's
+    # context, so the variable is cleared rather than reset to a token
+    _current.set(None)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """Add the block's duration to a phase of the current request.
+
+    Nested blocks of the same phase are only counted once.
+    """
+    stats = _current.get()
+    if stats is None or phase in stats._open:
+        yield
+        return
+    stats._open.add(phase)
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[phase] += time.perf_counter() - begin
+        stats._open.discard(phase)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that adds each query to the current request"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    begin = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - begin)
+
+
+def install(connection):
+    """Add record_query to a connection's execute wrappers once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_all():
+    for connection in connections.all():
+        install(connection)
+
+
+class RouteHistogram:
+    """Request count, latency buckets and query totals of one route"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.queries = 0
+        self.db_ms = 0.0
+        self.phases_ms = Counter()
+        self.statuses = Counter()
+        self.n_plus_one = 0
+
+    def add(self, duration_ms, stats, status, repeated):
+        self.count += 1
+        self.total_ms += duration_ms
+        index = 0
+        while index < len(BUCKETS) and duration_ms > BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.queries += stats.queries
+        self.db_ms += stats.db_time * 1000
+        for phase, seconds in stats.phases.items():
+            self.phases_ms[phase] += seconds * 1000
+        self.statuses[str(status)] += 1
+        self.n_plus_one += bool(repeated)
+
+    def as_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(BUCKETS + ('+Inf',), self.buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'buckets_ms': buckets,
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 3),
+            'phases_ms': {phase: round(value, 3)
+                          for phase, value in self.phases_ms.items()},
+            'statuses': dict(self.statuses),
+            'n_plus_one': self.n_plus_one,
+        }
+
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+def observe(route, method, duration_ms, stats, status, repeated):
+    """Add a finished request to its route's histogram"""
+    with _routes_lock:
+        histogram = _routes.get((method, route))
+        if histogram is None:
+            histogram = _routes[(method, route)] = RouteHistogram()
+        histogram.add(duration_ms, stats, status, repeated)
+
+
+def snapshot():
+    """Return the histograms of every route seen by this process"""
+    with _routes_lock:
+        return {
+            '%s %s' % key: histogram.as_dict()
+            for key, histogram in sorted(_routes.items())
+        }
+
+
+def reset():
+    with _routes_lock:
+        _routes.clear()
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Count building `serializer.data` as the serialize phase.
+
+    Serializers used with many=True also need
+    `list_serializer_class = TimedListSerializer` in their Meta.
+    """
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
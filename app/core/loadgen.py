@@ -0,0 +1,161 @@
+"""Closed-loop HTTP load generator for comparing serving modes.
+
+Each of `connections` clients sends a request over its own keep-alive
+connection, waits for the whole response and sends the next one, until
+`duration` seconds have passed. `idle` more connections are opened and
+left silent for the whole run, like slow mobile clients that have not
+finished sending their request. A request still unanswered after
+`timeout` seconds counts as an error. Only plain HTTP/1.1 is spoken, which is
+all the local servers under test need.
+
+Requests are GETs unless `method` says otherwise. `body` is sent as it
+is, or called before every request when it is a function, e.g. to
+create a differently named object each time.
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from core.benchmark import summarize
+
+
+class _Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, raw):
+        """Send raw, read the response and return its status code"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self.writer.write(raw)
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _raw_request(url, headers, method='GET', body=None):
+    parts = urlsplit(url)
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    lines = ['%s %s HTTP/1.1' % (method, target), 'Host: %s' % parts.netloc]
+    lines += ['%s: %s' % item for item in headers.items()]
+    if body is not None:
+        lines.append('Content-Length: %d' % len(body))
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin1')
+    return head + (body or b'')
+
+
+def _requests(url, headers, method, body):
+    """Return a function returning the bytes of the next request"""
+    if callable(body):
+        return lambda: _raw_request(url, headers, method, body())
+    raw = _raw_request(url, headers, method, body)
+    return lambda: raw
+
+
+async def _client(connection, next_request, deadline, timeout, samples,
+                  errors):
+    while time.perf_counter() < deadline:
+        raw = next_request()
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(connection.request(raw), timeout)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError,
+                asyncio.TimeoutError):
+            connection.close()
+            errors.append(None)
+            await asyncio.sleep(0.01)
+            continue
+        samples.append(time.perf_counter() - start)
+        if status >= 400:
+            errors.append(status)
+    connection.close()
+
+
+async def _idle(host, port, ready):
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return None
+    finally:
+        ready.release()
+    # An unfinished request line keeps the server waiting for the rest
+    writer.write(b'GET / HTTP/1.1\r\n')
+    return writer
+
+
+async def _run(url, connections, duration, headers, idle, timeout, method,
+               body):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    ready = asyncio.Semaphore(0)
+    idle_tasks = [
+        asyncio.ensure_future(_idle(host, port, ready)) for _ in range(idle)
+    ]
+    for _ in range(idle):
+        await ready.acquire()
+
+    next_request = _requests(url, headers or {}, method, body)
+    samples, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(_Connection(host, port), next_request, start + duration,
+                timeout, samples, errors)
+        for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+
+    for writer in await asyncio.gather(*idle_tasks):
+        if writer is not None:
+            writer.close()
+    return samples, errors, elapsed
+
+
+def run(url, connections=10, duration=10.0, headers=None, idle=0,
+        timeout=5.0, method='GET', body=None):
+    """Load url and return throughput and latency percentiles in ms"""
+    samples, errors, elapsed = asyncio.run(
+        _run(url, connections, duration, headers, idle, timeout, method,
+             body)
+    )
+    result = {
+        'requests': len(samples),
+        'errors': len(errors),
+        'rps': len(samples) / elapsed,
+    }
+    if samples:
+        result.update(summarize(samples))
+    return result
@@ -0,0 +1,280 @@
+import itertools
+import json
+import platform
+import time
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core import factories, loadgen
+from core.benchmark import api_client, compare, rss_bytes
+from core.db.backends.postgresql.base import close_pools
+from core.management.commands import bench_serving
+from core.models import Ingredient, Recipe, Tag
+
+EMAIL = 'bench-api-%s@whbx.io'
+PASSWORD = 'bench-api-password'
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+
+
+def _json(make):
+    """Return a body function encoding make(n) for n = 0, 1, 2..."""
+    counter = itertools.count()
+    return lambda: json.dumps(make(next(counter))).encode()
+
+
+class Command(bench_serving.Command):
+    """Load every API endpoint and compare the results with a baseline."""
+    help = 'Benchmark the recipe and user APIs over HTTP'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(modes='wsgi', duration=5, recipes=100)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--tags', type=int, default=20,
+                            help='Tags and ingredients per user')
+        parser.add_argument('--only', default='',
+                            help='Comma separated endpoint names to run')
+        parser.add_argument('--output', help='Write the results as JSON')
+        parser.add_argument('--baseline', help='JSON results to compare')
+        parser.add_argument(
+            '--threshold', type=float, default=10,
+            help='Percent slower than the baseline counted as a regression'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        self.cleanup()
+        try:
+            users = self.seed(
+                options['users'], options['tags'], options['recipes']
+            )
+            endpoints = self.endpoints(users[0])
+            if options['only']:
+                names = options['only'].split(',')
+                endpoints = [item for item in endpoints if item[0] in names]
+            # The first user is staff, so its token also reads the metrics
+            token = Token.objects.get(user=users[0]).key
+            results = {
+                'meta': {
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'database': settings.DATABASES['default']['ENGINE'],
+                    'workers': options['workers'],
+                    'connections': options['connections'],
+                    'duration': options['duration'],
+                    'users': options['users'],
+                    'tags': options['tags'],
+                    'recipes': options['recipes'],
+                },
+                'modes': {},
+            }
+            for mode in options['modes'].split(','):
+                results['modes'][mode] = self.bench_endpoints(
+                    mode, endpoints, token, options
+                )
+        finally:
+            self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        if baseline is not None:
+            self.compare(
+                results, baseline, options['threshold'],
+                [item[0] for item in endpoints]
+            )
+
+    def cleanup(self):
+        # Also removes users left behind by an interrupted run
+        get_user_model().objects.filter(
+            email__startswith=EMAIL.split('%')[0]
+        ).delete()
+        # Leave no pooled connection behind in this process
+        close_pools()
+
+    def seed(self, users, tags, recipes):
+        """Bulk insert users, their tokens, tags, ingredients and recipes"""
+        started = time.perf_counter()
+        created = factories.users(users, EMAIL, None)
+        first = created[0]
+        first.set_password(PASSWORD)
+        first.is_staff = True
+        first.save()
+        factories.tokens(created)
+        for user in created:
+            factories.recipes(
+                user, recipes, link='https://whbx.io/recipe',
+                tags=factories.tags(user, tags),
+                ingredients=factories.ingredients(user, tags),
+                per_recipe=2
+            )
+        self.stdout.write('seeded %d users in %.1fs' % (
+            users, time.perf_counter() - started
+        ))
+        return created
+
+    def endpoints(self, user):
+        """Return (name, method, path, body, content type, authenticated)"""
+        tag_ids = list(Tag.objects.filter(user=user).values_list(
+            'id', flat=True
+        )[:2])
+        ingredient_ids = list(Ingredient.objects.filter(
+            user=user
+        ).values_list('id', flat=True)[:2])
+        recipe = Recipe.objects.filter(user=user).order_by('id').first()
+        detail = reverse('recipe:recipe-detail', args=[recipe.id])
+        imported = b''.join(
+            json.dumps({
+                'title': 'Imported %d' % i, 'time_minutes': 10,
+                'price': '2.50', 'tags': ['Tag 0'],
+                'ingredients': ['Ingredient 0', 'Ingredient 1'],
+            }).encode() + b'\n'
+            for i in range(10)
+        )
+        endpoints = []
+        for kind, label in (('tag', 'Tag'), ('ingredient', 'Ingredient')):
+            url = reverse('recipe:%s-list' % kind)
+            endpoints += [
+                ('%s list' % kind, 'GET', url, None, None, True),
+                ('%s create' % kind, 'POST', url, _json(
+                    lambda n, label=label: {'name': 'New %s %d' % (label, n)}
+                ), JSON, True),
+                ('%s bulk' % kind, 'POST',
+                 reverse('recipe:%s-bulk' % kind) + '?on_conflict=ignore',
+                 _json(lambda n, label=label: [
+                     {'name': 'Bulk %s %d %d' % (label, n, i)}
+                     for i in range(20)
+                 ]), JSON, True),
+                ('%s autocomplete' % kind, 'GET',
+                 reverse('recipe:%s-autocomplete' % kind) + '?prefix=%s' % (
+                     label[:3]
+                 ), None, None, True),
+            ]
+        recipes = reverse('recipe:recipe-list')
+        return endpoints + [
+            ('recipe list', 'GET', recipes, None, None, True),
+            ('recipe filter', 'GET', '%s?tags=%s&ingredients=%s' % (
+                recipes, ','.join(map(str, tag_ids)),
+                ','.join(map(str, ingredient_ids))
+            ), None, None, True),
+            ('recipe search', 'GET', reverse('recipe:recipe-search') +
+             '?q=recipe+tag', None, None, True),
+            ('recipe detail', 'GET', detail, None, None, True),
+            ('recipe create', 'POST', recipes, _json(lambda n: {
+                'title': 'Created %d' % n, 'time_minutes': 5,
+                'price': '1.00', 'tags': tag_ids,
+                'ingredients': ingredient_ids,
+            }), JSON, True),
+            ('recipe update', 'PATCH', detail, _json(
+                lambda n: {'title': 'Recipe 0 v%d' % n}
+            ), JSON, True),
+            ('recipe export', 'GET', reverse('recipe:export'), None, None,
+             True),
+            ('recipe import', 'POST', reverse('recipe:import'), imported,
+             NDJSON, True),
+            ('user create', 'POST', reverse('user:create'), _json(
+                lambda n: {'email': EMAIL % ('new-%d' % n),
+                           'password': PASSWORD, 'name': 'New'}
+            ), JSON, False),
+            ('user token', 'POST', reverse('user:token'), json.dumps({
+                'email': user.email, 'password': PASSWORD
+            }).encode(), JSON, False),
+            ('user me', 'GET', reverse('user:me'), None, None, True),
+            ('user update', 'PATCH', reverse('user:me'), _json(
+                lambda n: {'name': 'Bench %d' % n}
+            ), JSON, True),
+            ('metrics', 'GET', reverse('metrics'), None, None, True),
+        ]
+
+    def count_queries(self, method, path, body, content_type, token):
+        """Return the queries of one warm request made in this process"""
+        client = api_client()
+        extra = {}
+        if token:
+            extra['HTTP_AUTHORIZATION'] = 'Token %s' % token
+        # Only the second request is counted, the first fills the caches
+        for _ in range(2):
+            data = body() if callable(body) else body or b''
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connection))
+                    for connection in (
+                        connections[alias] for alias in
+                        [DEFAULT_DB_ALIAS] + settings.DATABASE_REPLICAS
+                    )
+                ]
+                client.generic(
+                    method, path, data, content_type or JSON, **extra
+                )
+        return sum(len(capture.captured_queries) for capture in captured)
+
+    def bench_endpoints(self, mode, endpoints, token, options):
+        port = options['port']
+        results = {}
+        self.stdout.write('%s, %d worker(s), %d connections' % (
+            mode, options['workers'], options['connections']
+        ))
+        with bench_serving.serve(mode, port, options['workers']) as server:
+            for name, method, path, body, content_type, auth in endpoints:
+                headers = {}
+                if auth:
+                    headers['Authorization'] = 'Token %s' % token
+                if content_type:
+                    headers['Content-Type'] = content_type
+                url = 'http://127.0.0.1:%d%s' % (port, path)
+                loadgen.run(url, 4, 1, headers, method=method, body=body)
+                result = loadgen.run(
+                    url, options['connections'], options['duration'],
+                    headers, options['idle'], method=method, body=body
+                )
+                result['queries'] = self.count_queries(
+                    method, path, body, content_type, auth and token
+                )
+                rss = rss_bytes(server.pid)
+                if rss is not None:
+                    result['rss_mb'] = rss / 1024 / 1024
+                results[name] = result
+                self.stdout.write(
+                    '  %-24s %8.1f req/s  p50 %7.2fms  p95 %7.2fms  '
+                    'p99 %7.2fms  %3d queries  %6.1fMB  %d errors' % (
+                        name, result['rps'], result.get('p50', 0),
+                        result.get('p95', 0), result.get('p99', 0),
+                        result['queries'], result.get('rss_mb', 0),
+                        result['errors']
+                    )
+                )
+        return results
+
+    def compare(self, results, baseline, threshold, names):
+        regressions = []
+        for mode, measured in results['modes'].items():
+            expected = baseline['modes'].get(mode)
+            if expected is None:
+                self.stdout.write('no %s baseline' % mode)
+                continue
+            expected = {name: value for name, value in expected.items()
+                        if name in names}
+            regressions += [
+                '%s %s' % (mode, line)
+                for line in compare(measured, expected, threshold)
+            ]
+        for line in regressions:
+            self.stderr.write('regression: %s' % line)
+        if regressions:
+            raise CommandError('%d regressions over %g%%' % (
+                len(regressions), threshold
+            ))
+        self.stdout.write('no regressions over %g%%' % threshold)
@@ -0,0 +1,33 @@
+from rest_framework.authtoken.models import Token
+
+from core.benchmark import create_bench_user
+from core.management.commands import bench_serving
+
+CONFIGURATIONS = {
+    'new connection per request': {'DB_CONN_MAX_AGE': '0'},
+    'persistent connections': {'DB_CONN_MAX_AGE': '60'},
+    'in-process pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL_SIZE': '8'},
+}
+
+
+class Command(bench_serving.Command):
+    """Load the API with database connection reuse off and on."""
+    help = 'Compare requests per second with and without connection reuse'
+
+    def handle(self, *args, **options):
+        user = create_bench_user('bench-serving@whbx.io')
+        try:
+            urls = self.seed(user, options['recipes'])
+            headers = {
+                'Authorization': 'Token %s' % Token.objects.create(
+                    user=user
+                ).key
+            }
+            for mode in options['modes'].split(','):
+                for label, env in CONFIGURATIONS.items():
+                    self.bench(
+                        mode, urls, headers, options, env,
+                        '%s, %s' % (mode, label)
+                    )
+        finally:
+            user.delete()
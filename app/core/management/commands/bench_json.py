@@ -0,0 +1,75 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core import fastjson, middleware
+from core.benchmark import timeit
+from core.renderers import FastJSONRenderer
+
+
+def sample_items(count):
+    """Return recipe list items shaped like RecipeListSerializer output"""
+    return [
+        {
+            'id': i,
+            'title': 'Recipe number %d' % i,
+            'tags': [{'id': i % 50, 'name': 'Tag %d' % (i % 50)}],
+            'ingredients': [
+                {'id': j, 'name': 'Ingredient %d' % j}
+                for j in range(i % 7, i % 7 + 3)
+            ],
+            'time_minutes': i % 90,
+            'price': '%d.%02d' % (i % 40, i % 100),
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    """Compare JSON renderers and response encodings on list payloads."""
+    help = 'Benchmark JSON rendering throughput and compressed sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated items per list'
+        )
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        self.stdout.write('fast JSON encoder: %s' % (
+            'orjson' if fastjson.available() else 'unavailable (stdlib)'
+        ))
+        renderers = {'drf': JSONRenderer(), 'fast': FastJSONRenderer()}
+        encodings = middleware.available_encodings()
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            items = sample_items(size)
+            body = renderers['fast'].render(items)
+            self.stdout.write('%d items, %.1f KB of JSON' % (
+                size, len(body) / 1024
+            ))
+            for name, renderer in renderers.items():
+                seconds = statistics.median(timeit(
+                    lambda: renderer.render(items), options['repeat']
+                ))
+                self.stdout.write(
+                    '  render %-6s %9.2fms %9.1f MB/s' % (
+                        name, seconds * 1000, len(body) / seconds / 2 ** 20
+                    )
+                )
+            for name, compressor in encodings.items():
+                seconds = statistics.median(timeit(
+                    lambda: self.encode(compressor, body), options['repeat']
+                ))
+                encoded = self.encode(compressor, body)
+                self.stdout.write(
+                    '  %-13s %9.2fms %9.1f KB  %5.1f%% of original' % (
+                        name, seconds * 1000, len(encoded) / 1024,
+                        100.0 * len(encoded) / len(body)
+                    )
+                )
+
+    def encode(self, compressor, body):
+        compressor = compressor()
+        return compressor.compress(body) + compressor.finish()
@@ -0,0 +1,133 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core import loadgen
+from core.benchmark import create_bench_user
+from core.models import Ingredient, Recipe, Tag
+
+SERVERS = {
+    'wsgi': [
+        '-m', 'gunicorn', 'app.wsgi:application', '--bind', '127.0.0.1:{port}',
+        '--workers', '{workers}', '--log-level', 'warning',
+    ],
+    'asgi': [
+        '-m', 'uvicorn', 'app.asgi:application', '--host', '127.0.0.1',
+        '--port', '{port}', '--workers', '{workers}', '--log-level',
+        'warning', '--no-access-log',
+    ],
+}
+
+
+@contextmanager
+def serve(mode, port, workers, env=None):
+    """Run the API under the server of mode until the block exits"""
+    command = [sys.executable] + [
+        arg.format(port=port, workers=workers) for arg in SERVERS[mode]
+    ]
+    server = subprocess.Popen(
+        command, cwd=str(settings.BASE_DIR),
+        env=dict(os.environ, **(env or {}))
+    )
+    try:
+        wait_for_port(port)
+        yield server
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError('server on port %d did not start' % port)
+
+
+class Command(BaseCommand):
+    """Load the API served by gunicorn (WSGI) and uvicorn (ASGI)."""
+    help = 'Compare requests per second and tail latency of serving modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default='wsgi,asgi')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--connections', type=int, default=32)
+        parser.add_argument(
+            '--idle', type=int, default=0,
+            help='Extra connections that never finish their request'
+        )
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--recipes', type=int, default=50)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        # The servers are separate processes, so the data is committed
+        user = create_bench_user('bench-serving@whbx.io')
+        try:
+            urls = self.seed(user, options['recipes'])
+            headers = {
+                'Authorization': 'Token %s' % Token.objects.create(
+                    user=user
+                ).key
+            }
+            for mode in options['modes'].split(','):
+                self.bench(mode, urls, headers, options)
+        finally:
+            user.delete()
+
+    def seed(self, user, count):
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name='Tag %d' % i) for i in range(10)
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=user, name='Ingredient %d' % i) for i in range(10)
+        )
+        recipe = None
+        for i in range(count):
+            recipe = Recipe.objects.create(
+                user=user, title='Recipe %d' % i, time_minutes=i % 90,
+                price=i % 40
+            )
+            recipe.tags.add(tags[i % 10])
+            recipe.ingredients.add(*ingredients[i % 7:i % 7 + 3])
+        return [
+            reverse('recipe:tag-list'),
+            reverse('recipe:recipe-list'),
+            reverse('recipe:recipe-detail', args=[recipe.id]),
+            reverse('user:me'),
+        ]
+
+    def bench(self, mode, urls, headers, options, env=None, label=None):
+        port = options['port']
+        with serve(mode, port, options['workers'], env):
+            self.stdout.write('%s, %d worker(s), %d connections, %d idle' % (
+                label or mode, options['workers'], options['connections'],
+                options['idle']
+            ))
+            for path in urls:
+                url = 'http://127.0.0.1:%d%s' % (port, path)
+                loadgen.run(url, 4, 1, headers)
+                result = loadgen.run(
+                    url, options['connections'], options['duration'],
+                    headers, options['idle']
+                )
+                self.stdout.write(
+                    '  %-28s %8.1f req/s  p50 %7.2fms  p95 %7.2fms  '
+                    'p99 %7.2fms  %d errors' % (
+                        path, result['rps'], result.get('p50', 0),
+                        result.get('p95', 0), result.get('p99', 0),
+                        result['errors']
+                    )
+                )
@@ -0,0 +1,85 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Run in a fresh interpreter; prints the seconds spent in each phase of
+# getting from nothing to an application that has loaded every view
+STARTUP = '''
+import json, time
+start = time.perf_counter()
+import django
+from django.core.wsgi import get_wsgi_application
+imported = time.perf_counter()
+application = get_wsgi_application()
+loaded = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.perf_counter()
+print(json.dumps({
+    'import django': imported - start,
+    'setup and middleware': loaded - imported,
+    'url modules and views': routed - loaded,
+    'total': routed - start,
+}))
+'''
+
+PROJECT_PACKAGES = ('app', 'core', 'recipe', 'user')
+
+
+class Command(BaseCommand):
+    """Measure how long a fresh process takes to load the project."""
+    help = 'Benchmark interpreter startup and module import time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=10)
+
+    def run(self, *flags):
+        env = dict(os.environ)
+        env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE
+        return subprocess.run(
+            [sys.executable] + list(flags) + ['-c', STARTUP],
+            cwd=str(settings.BASE_DIR), env=env, check=True,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('settings %s' % settings.SETTINGS_MODULE)
+        runs = [
+            json.loads(self.run().stdout) for _ in range(options['repeat'])
+        ]
+        for phase in runs[0]:
+            self.stdout.write('  %-24s %8.1fms' % (
+                phase, statistics.median(run[phase] for run in runs) * 1000
+            ))
+
+        # -X importtime reports each module's own import time in us
+        packages = defaultdict(int)
+        modules = {}
+        for line in self.run('-X', 'importtime').stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, _, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            packages[name.split('.')[0]] += int(own)
+            modules[name] = int(own)
+
+        self.stdout.write('import time by top-level package')
+        for name, micros in sorted(
+            packages.items(), key=lambda item: -item[1]
+        )[:options['top']]:
+            self.stdout.write('  %-24s %8.1fms' % (name, micros / 1000))
+        self.stdout.write('project modules')
+        for name, micros in sorted(
+            ((name, micros) for name, micros in modules.items()
+             if name.split('.')[0] in PROJECT_PACKAGES),
+            key=lambda item: -item[1]
+        )[:options['top']]:
+            self.stdout.write('  %-24s %8.1fms' % (name, micros / 1000))
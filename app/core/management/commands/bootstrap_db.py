@@ -0,0 +1,73 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from core import snapshot
+
+
+class Command(BaseCommand):
+    """Django command to build a new database from the schema snapshot."""
+    help = (
+        'Create the tables of an empty database from the schema snapshot '
+        'in one transaction; databases with tables are migrated instead'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if the snapshot does not match the migrations'
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Collect the snapshot again from the migrations'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if options['update']:
+            with open(snapshot.path(connection), 'w') as f:
+                f.write(snapshot.generate(connection))
+            self.stdout.write('Wrote %s' % snapshot.path(connection))
+            return
+        if options['check']:
+            if snapshot.read(connection) != snapshot.generate(connection):
+                raise CommandError(
+                    '%s does not match the migrations, run '
+                    'bootstrap_db --update' % snapshot.path(connection)
+                )
+            self.stdout.write('Schema snapshot matches the migrations')
+            return
+
+        schema = snapshot.read(connection)
+        if connection.introspection.table_names() or schema is None:
+            self.stdout.write(
+                'Database has tables or no snapshot, running migrate'
+            )
+            call_command(
+                'migrate', database=connection.alias, interactive=False,
+                verbosity=options['verbosity'], stdout=self.stdout,
+                stderr=self.stderr
+            )
+            return
+        if not snapshot.is_current(schema):
+            raise CommandError(
+                '%s does not match the migrations, run '
+                'bootstrap_db --update' % snapshot.path(connection)
+            )
+
+        started = time.perf_counter()
+        with transaction.atomic(using=connection.alias):
+            applied = snapshot.load(connection, schema)
+            # Content types and permissions, as after migrate
+            emit_post_migrate_signal(
+                options['verbosity'], False, connection.alias
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Loaded the schema snapshot and %d migrations in %.2fs' % (
+                applied, time.perf_counter() - started
+            )
+        ))
@@ -0,0 +1,51 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.importer import RecipeImporter
+
+
+class Command(BaseCommand):
+    """Django command to import recipes for a user from an NDJSON file."""
+    help = 'Import recipes, tags and ingredients from an NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON file, - for stdin')
+        parser.add_argument('--email', required=True,
+                            help='Email of the user to import for')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError('No user with email %s' % options['email'])
+
+        importer = RecipeImporter(
+            user,
+            batch_size=options['batch_size'],
+            progress=self.report
+        )
+        if options['path'] == '-':
+            stats = importer.run(sys.stdin.buffer)
+        else:
+            with open(options['path'], 'rb') as lines:
+                stats = importer.run(lines)
+
+        for error in stats['errors']:
+            self.stderr.write('line %(line)d: %(detail)s' % error)
+        if stats['stopped_at']:
+            raise CommandError(
+                'Stopped at line %(stopped_at)d by a database error after '
+                'importing %(recipes)d recipes' % stats
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Imported %(recipes)d recipes from %(lines)d lines in '
+            '%(seconds).1fs (%(rows_per_second).0f rows/s)' % stats
+        ))
+
+    def report(self, stats):
+        self.stdout.write(
+            '%(recipes)d recipes, %(rows_per_second).0f rows/s' % stats
+        )
@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import cache, search
+
+
+def _keep(model):
+    """Return the oldest id sharing the user and name of the outer row"""
+    return Subquery(model.objects.filter(
+        user_id=OuterRef('user_id'), name=OuterRef('name')
+    ).order_by('id').values('id')[:1])
+
+
+def merge(model, relation):
+    """Fold the rows of model sharing a (user, name) into the oldest one.
+
+    Every statement is set-based. Returns the ids of the users whose rows
+    were merged.
+    """
+    duplicates = model.objects.annotate(keep=_keep(model)).exclude(
+        pk=F('keep')
+    )
+    user_ids = set(
+        duplicates.values_list('user_id', flat=True).distinct()
+    )
+    if not user_ids:
+        return user_ids
+
+    through = relation.through
+    column = relation.field.m2m_reverse_field_name()
+    links = through.objects.filter(
+        **{column + '_id__in': duplicates.values('pk')}
+    )
+    Recipe.objects.filter(pk__in=links.values('recipe_id')).update(
+        updated_at=timezone.now()
+    )
+    # A recipe keeps one link per name, the one to the oldest row
+    shadowing = through.objects.filter(**{
+        'recipe_id': OuterRef('recipe_id'),
+        column + '__user_id': OuterRef(column + '__user_id'),
+        column + '__name': OuterRef(column + '__name'),
+        column + '_id__lt': OuterRef(column + '_id'),
+    })
+    through.objects.filter(Exists(shadowing)).delete()
+    links.update(**{column + '_id': Subquery(
+        model.objects.filter(pk=OuterRef(column + '_id')).annotate(
+            keep=_keep(model)
+        ).values('keep')[:1]
+    )})
+    # Nothing links to them now; skip the per-row delete signals and bump
+    # the versions once per user instead
+    rows = model.objects.filter(pk__in=duplicates.values('pk'))
+    rows._raw_delete(rows.db)
+    for user_id in user_ids:
+        cache.bump_version(model._meta.label_lower, user_id)
+        cache.bump_version(search.RECIPE_LABEL, user_id)
+    return user_ids
+
+
+class Command(BaseCommand):
+    """Django command to merge tags and ingredients sharing a name."""
+    help = (
+        'Fold tags and ingredients sharing a (user, name) into the oldest '
+        'row and relink their recipes, so migration core 0006 can add its '
+        'unique constraints. The merged rows are deleted; this cannot be '
+        'undone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count the rows that would be merged'
+        )
+
+    def handle(self, *args, **options):
+        relations = ((Tag, Recipe.tags), (Ingredient, Recipe.ingredients))
+        for model, relation in relations:
+            name = model._meta.verbose_name_plural
+            if options['dry_run']:
+                count = model.objects.annotate(
+                    keep=_keep(model)
+                ).exclude(pk=F('keep')).count()
+                self.stdout.write('%d %s would be merged' % (count, name))
+                continue
+            with transaction.atomic():
+                users = merge(model, relation)
+            self.stdout.write(
+                'Merged the duplicate %s of %d users' % (name, len(users))
+            )
@@ -1,19 +1,84 @@
+import random
 import time
-from django.db import connections
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
 
 
 class Command(BaseCommand):
-    """Django command to pause connection until database is available."""
+    """Django command to pause until the database accepts queries.
+
+    Retries with jittered exponential backoff, starting at a few
+    milliseconds, until the database answers or the timeout passes.
+    """
+    help = 'Wait until the database answers queries, and is migrated'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Seconds to wait in total')
+        parser.add_argument('--min-delay', type=float, default=0.01)
+        parser.add_argument('--max-delay', type=float, default=2)
+        parser.add_argument(
+            '--migrated', action='store_true',
+            help='Also wait until every migration has been applied'
+        )
 
     def handle(self, *arg, **options):
-        self.stdout.write("waiting for db")
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write('Database unavailable waiting for 1 sec')
-                time.sleep(1)
+        self.options = options
+        self.deadline = time.monotonic() + options['timeout']
+        connection = connections[options['database']]
+        self.stdout.write('waiting for db')
+        self.retry(self.probe, connection, 'Database unavailable')
         self.stdout.write(self.style.SUCCESS('Database available'))
+
+        if options['migrated']:
+            self.retry(self.migrated, connection, 'Database not migrated')
+            self.stdout.write(self.style.SUCCESS('Database migrated'))
+        else:
+            pending = self.pending(connection)
+            if pending:
+                self.stdout.write(self.style.WARNING(
+                    '%d unapplied migrations' % len(pending)
+                ))
+
+    def retry(self, check, connection, message):
+        """Call check until it passes, sleeping longer after each try"""
+        delay = self.options['min_delay']
+        while True:
+            try:
+                check(connection)
+                return
+            except OperationalError as error:
+                remaining = self.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError('%s after %gs: %s' % (
+                        message, self.options['timeout'], error
+                    ))
+                # Jitter spreads out containers started together
+                sleep = min(random.uniform(delay / 2, delay), remaining)
+                self.stdout.write('%s, retrying in %.2fs' % (message, sleep))
+                time.sleep(sleep)
+                delay = min(delay * 2, self.options['max_delay'])
+
+    def probe(self, connection):
+        try:
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except OperationalError:
+            # Reconnect on the next try if the connection broke
+            if not connection.in_atomic_block:
+                connection.close()
+            raise
+
+    def pending(self, connection):
+        executor = MigrationExecutor(connection)
+        return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+    def migrated(self, connection):
+        pending = self.pending(connection)
+        if pending:
+            raise OperationalError('%d unapplied migrations' % len(pending))
@@ -0,0 +1,256 @@
+"""Response compression and request instrumentation middleware.
+
+gzip is always available; brotli ('br') and zstd are used when the
+`brotli` or `zstandard` packages are installed and the client prefers
+them. Responses smaller than COMPRESSION_MIN_SIZE are sent as they are.
+Streaming responses are compressed chunk by chunk.
+"""
+import json
+import logging
+import re
+import time
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from core import instrumentation
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+_accept_encoding = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+_route_group = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+        )
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(
+            level=settings.COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encodings():
+    """Return the usable encodings in order of server preference"""
+    compressors = {'gzip': _Gzip}
+    if brotli is not None:
+        compressors['br'] = _Brotli
+    if zstandard is not None:
+        compressors['zstd'] = _Zstd
+    return {
+        name: compressors[name] for name in settings.COMPRESSION_ENCODINGS
+        if name in compressors
+    }
+
+
+def choose_encoding(header, encodings):
+    """Pick the encoding the client accepts, ranked by q then our order"""
+    accepted = {}
+    for part in header.split(','):
+        match = _accept_encoding.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2) or 1)
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+
+    best, best_quality = None, 0
+    for name in encodings:
+        quality = accepted.get(name, accepted.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with the best encoding the client accepts"""
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or \
+                response.status_code in (204, 304):
+            return response
+        if not response.streaming and \
+                len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = available_encodings()
+        name = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings
+        )
+        if name is None:
+            return response
+        compressor = encodings[name]()
+
+        if response.streaming:
+            response.streaming_content = self._stream(
+                compressor, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            content = compressor.compress(response.content) + \
+                compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The body now differs from the uncompressed one (RFC 7232)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = name
+        return response
+
+    @staticmethod
+    def _stream(compressor, chunks):
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+def route_name(request):
+    """Return the URL pattern that matched, e.g. api/recipe/tags/<pk>/"""
+    match = request.resolver_match
+    if match is None:
+        return '<unmatched>'
+    route = _route_group.sub(r'<\1>', match.route)
+    return route.replace('^', '').replace('$', '').replace('\\', '')
+
+
+class InstrumentationMiddleware(MiddlewareMixin):
+    """Time requests and their queries, see core.instrumentation.
+
+    Adds a Server-Timing header, logs one JSON line per request to the
+    core.instrumentation logger and warns when an SQL shape repeats more
+    than INSTRUMENTATION_N_PLUS_ONE times.
+    """
+
+    def __init__(self, get_response=None):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        # Connections opened later, including those of the async view
+        # threads, are instrumented by core.signals when they connect
+        instrumentation.install_all()
+
+    def process_request(self, request):
+        request._instrumentation = instrumentation.start()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook returns
+        request._view_finished = time.perf_counter()
+        return response
+
+    def process_response(self, request, response):
+        stats = getattr(request, '_instrumentation', None)
+        if stats is None:
+            return response
+        instrumentation.finish()
+
+        now = time.perf_counter()
+        started = getattr(request, '_view_started', None)
+        if started is not None:
+            finished = getattr(request, '_view_finished', now)
+            stats.phases['render'] += now - finished
+            # Time in the view not spent authenticating or serializing
+            stats.phases['view'] += max(
+                finished - started - stats.phases['auth']
+                - stats.phases['serialize'], 0
+            )
+        total = now - stats.started
+        repeated = stats.repeated(settings.INSTRUMENTATION_N_PLUS_ONE)
+        route = route_name(request)
+
+        timings = ['db;dur=%.2f;desc="%d queries"' % (
+            stats.db_time * 1000, stats.queries
+        )]
+        timings += [
+            '%s;dur=%.2f' % (phase, stats.phases[phase] * 1000)
+            for phase in ('auth', 'view', 'serialize', 'render')
+            if phase in stats.phases
+        ]
+        timings.append('total;dur=%.2f' % (total * 1000))
+        response['Server-Timing'] = ', '.join(timings)
+
+        instrumentation.observe(
+            route, request.method, total * 1000, stats,
+            response.status_code, repeated
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'route': route,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            'queries': stats.queries,
+            'db_ms': round(stats.db_time * 1000, 3),
+            'phases_ms': {phase: round(seconds * 1000, 3)
+                          for phase, seconds in stats.phases.items()},
+        }, sort_keys=True))
+        for shape, count in repeated:
+            logger.warning(json.dumps({
+                'event': 'n_plus_one',
+                'route': route,
+                'count': count,
+                'sql': shape,
+            }, sort_keys=True))
+        return response
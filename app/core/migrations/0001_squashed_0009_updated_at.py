@@ -0,0 +1,183 @@
+from django.conf import settings
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+from core.operations import RunPostgresSQL
+
+
+class Migration(migrations.Migration):
+    """Migrations 0001 to 0009 as the tables they end up creating.
+
+    Only new databases apply this migration; the indexes are built in the
+    same transaction as their empty tables, so nothing runs concurrently
+    and no data needs merging or backfilling. The User help texts are
+    written as the model has them, ending the whitespace-only AlterField
+    churn of 0002-0004.
+    """
+
+    replaces = [
+        ('core', '0001_initial'),
+        ('core', '0002_auto_20210612_1222'),
+        ('core', '0003_auto_20210614_1044'),
+        ('core', '0004_auto_20210615_1207'),
+        ('core', '0005_tag_ingredient_user_name_indexes'),
+        ('core', '0006_tag_ingredient_unique_name'),
+        ('core', '0007_recipe_filter_indexes'),
+        ('core', '0008_recipe_search_vector'),
+        ('core', '0009_updated_at'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('password', models.CharField(
+                    max_length=128,
+                    verbose_name='password')),
+                ('last_login', models.DateTimeField(
+                    blank=True,
+                    null=True,
+                    verbose_name='last login')),
+                ('is_superuser', models.BooleanField(
+                    default=False,
+                    help_text='Designates that this user has all permissions '
+                              'without explicitly assigning them.',
+                    verbose_name='superuser status')),
+                ('email', models.EmailField(max_length=255, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_staff', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('groups', models.ManyToManyField(
+                    blank=True,
+                    help_text='The groups this user belongs to. A user will '
+                              'get all permissions granted to each of their '
+                              'groups.',
+                    related_name='user_set',
+                    related_query_name='user',
+                    to='auth.Group',
+                    verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(
+                    blank=True,
+                    help_text='Specific permissions for this user.',
+                    related_name='user_set',
+                    related_query_name='user',
+                    to='auth.Permission',
+                    verbose_name='user permissions')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('time_minutes', models.IntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('link', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('search_vector',
+                 django.contrib.postgres.search.SearchVectorField(
+                     editable=False, null=True)),
+                ('ingredients', models.ManyToManyField(to='core.Ingredient')),
+                ('tags', models.ManyToManyField(to='core.Tag')),
+                ('user', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_tag_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_ingredient_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'name'),
+                name='core_tag_user_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'name'),
+                name='core_ingredient_user_name_uniq'),
+        ),
+        # As AddManyToManyIndex in 0007, without CONCURRENTLY
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_tags_tag_recipe_idx '
+            'ON core_recipe_tags (tag_id, recipe_id)',
+            'DROP INDEX core_recipe_tags_tag_recipe_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_ingredients_ingredient_recipe_idx '
+            'ON core_recipe_ingredients (ingredient_id, recipe_id)',
+            'DROP INDEX core_recipe_ingredients_ingredient_recipe_idx',
+        ),
+        RunPostgresSQL(
+            'CREATE INDEX core_recipe_search_idx '
+            'ON core_recipe USING gin (search_vector)',
+            'DROP INDEX core_recipe_search_idx',
+        ),
+    ]
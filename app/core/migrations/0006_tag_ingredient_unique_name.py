@@ -0,0 +1,62 @@
+"""Make tag and ingredient names unique per user.
+
+A separate step from the 0005 indexes, which only speed up the lists.
+The constraint changes behaviour, and several features rely on it:
+
+- bulk create with on_conflict=ignore and the NDJSON import insert
+  with ON CONFLICT DO NOTHING, which needs the constraint to find
+  names that already exist
+- autocomplete and the serializers assume one row per name
+
+Existing duplicates block the constraint, and this migration stops
+before adding it while any remain. Merge them first with
+`manage.py merge_duplicate_names`, which folds each set into its oldest
+row. The merge cannot be undone; rolling this migration back only drops
+the constraint.
+"""
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+from core.operations import AddUniqueConstraintConcurrently
+
+
+def check_duplicate_names(apps, schema_editor):
+    """Refuse to run while users have tags or ingredients sharing a name"""
+    for model_name in ('Tag', 'Ingredient'):
+        model = apps.get_model('core', model_name)
+        duplicates = model.objects.values('user_id', 'name').annotate(
+            count=Count('id')
+        ).filter(count__gt=1)
+        if duplicates.exists():
+            raise IntegrityError(
+                '%s names are not unique per user; run '
+                'manage.py merge_duplicate_names first' % model_name
+            )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_tag_ingredient_user_name_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_duplicate_names,
+            migrations.RunPython.noop
+        ),
+        AddUniqueConstraintConcurrently(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'name'),
+                name='core_ingredient_user_name_uniq'),
+        ),
+        AddUniqueConstraintConcurrently(
+            model_name='tag',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'name'),
+                name='core_tag_user_name_uniq'),
+        ),
+    ]
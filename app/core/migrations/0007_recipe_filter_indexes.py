@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+from core.operations import AddIndexConcurrently, AddManyToManyIndex
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_tag_ingredient_unique_name'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_idx'),
+        ),
+        # Let EXISTS lookups from the tag or ingredient side be answered
+        # from the index alone
+        AddManyToManyIndex(
+            model_name='recipe',
+            field_name='tags',
+            columns=('tag', 'recipe'),
+            name='core_recipe_tags_tag_recipe_idx',
+        ),
+        AddManyToManyIndex(
+            model_name='recipe',
+            field_name='ingredients',
+            columns=('ingredient', 'recipe'),
+            name='core_recipe_ingredients_ingredient_recipe_idx',
+        ),
+    ]
@@ -0,0 +1,43 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.operations import RunPostgresSQL
+
+BACKFILL = """
+UPDATE core_recipe SET search_vector =
+    setweight(to_tsvector('simple', title), 'A') ||
+    setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(t.name, ' ') FROM core_recipe_tags rt
+        JOIN core_tag t ON t.id = rt.tag_id
+        WHERE rt.recipe_id = core_recipe.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(i.name, ' ') FROM core_recipe_ingredients ri
+        JOIN core_ingredient i ON i.id = ri.ingredient_id
+        WHERE ri.recipe_id = core_recipe.id
+    ), '')), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_recipe_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True),
+        ),
+        RunPostgresSQL(BACKFILL, migrations.RunSQL.noop),
+        RunPostgresSQL(
+            'CREATE INDEX CONCURRENTLY core_recipe_search_idx '
+            'ON core_recipe USING gin (search_vector)',
+            'DROP INDEX CONCURRENTLY IF EXISTS core_recipe_search_idx',
+        ),
+    ]
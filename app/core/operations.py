@@ -0,0 +1,158 @@
+from django.db.migrations.operations import AddConstraint, AddIndex, RunSQL
+from django.db.migrations.operations.base import Operation
+
+
+def _concurrently(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+class AddIndexConcurrently(AddIndex):
+    """Add an index without blocking writes to the table.
+
+    PostgreSQL builds the index with CREATE INDEX CONCURRENTLY, other
+    backends fall back to a plain CREATE INDEX. Migrations using this
+    operation must set `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if not _concurrently(schema_editor):
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if not _concurrently(schema_editor):
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class AddUniqueConstraintConcurrently(AddConstraint):
+    """Add a plain UniqueConstraint without blocking writes to the table.
+
+    On PostgreSQL the unique index is built concurrently first and then
+    attached to the table as the constraint, which only needs a brief
+    lock. Migrations using this operation must set `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if not _concurrently(schema_editor):
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias,
+                                        model):
+            return
+        quote = schema_editor.quote_name
+        table = quote(model._meta.db_table)
+        name = quote(self.constraint.name)
+        columns = ', '.join(
+            quote(model._meta.get_field(field).column)
+            for field in self.constraint.fields
+        )
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY %s ON %s (%s)'
+            % (name, table, columns)
+        )
+        schema_editor.execute(
+            'ALTER TABLE %s ADD CONSTRAINT %s UNIQUE USING INDEX %s'
+            % (table, name, name)
+        )
+
+
+class AddManyToManyIndex(Operation):
+    """Add a composite index to an auto-created many-to-many table.
+
+    Auto-created through tables have no model state to attach Meta.indexes
+    to, so the index is only created in the database. `columns` are field
+    names of the through model, e.g. ('tag', 'recipe').
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field_name, columns, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.columns = columns
+        self.name = name
+
+    def deconstruct(self):
+        return (self.__class__.__name__, [], {
+            'model_name': self.model_name,
+            'field_name': self.field_name,
+            'columns': self.columns,
+            'name': self.name,
+        })
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _through(self, app_label, state):
+        model = state.apps.get_model(app_label, self.model_name)
+        return model._meta.get_field(self.field_name).remote_field.through
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        through = self._through(app_label, to_state)
+        if not self.allow_migrate_model(schema_editor.connection.alias,
+                                        through):
+            return
+        quote = schema_editor.quote_name
+        columns = ', '.join(
+            quote(through._meta.get_field(column).column)
+            for column in self.columns
+        )
+        schema_editor.execute('CREATE INDEX %s%s ON %s (%s)' % (
+            'CONCURRENTLY ' if _concurrently(schema_editor) else '',
+            quote(self.name),
+            quote(through._meta.db_table),
+            columns,
+        ))
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        through = self._through(app_label, from_state)
+        if not self.allow_migrate_model(schema_editor.connection.alias,
+                                        through):
+            return
+        schema_editor.execute('DROP INDEX %sIF EXISTS %s' % (
+            'CONCURRENTLY ' if _concurrently(schema_editor) else '',
+            schema_editor.quote_name(self.name),
+        ))
+
+    def describe(self):
+        return 'Create index %s on %s.%s' % (
+            self.name, self.model_name, self.field_name
+        )
+
+
+class RunPostgresSQL(RunSQL):
+    """RunSQL that does nothing on backends other than PostgreSQL.
+
+    Used for PostgreSQL-only index types; the application uses other code
+    paths on the remaining backends.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
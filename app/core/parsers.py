@@ -0,0 +1,42 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from core import fastjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes UTF-8 bodies with orjson when installed"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not fastjson.available() or encoding.lower() not in (
+            'utf-8', 'utf8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return fastjson.loads(stream.read() if stream else b'')
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % exc)
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline delimited JSON into a list of values"""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(fastjson.loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError('NDJSON parse error on line %d - %s' % (
+                    number, exc
+                ))
+        return items
@@ -0,0 +1,109 @@
+import csv
+import io
+import re
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import fastjson
+
+_encoder = JSONEncoder()
+
+# orjson writes NaN and infinity as null, and floats of 1e16 and above
+# or below 1e-4 in other forms than repr(), as 1e16, 1e-7 or 0.00001
+_EXPONENT = re.compile(rb'e[-1-9]')
+
+
+def _may_have_unusual_float(ret):
+    # Substring searches are far cheaper than one regular expression
+    # with alternatives
+    return b'null' in ret or b'0.0000' in ret or _EXPONENT.search(ret)
+
+
+def _has_unusual_float(data):
+    """Return whether data holds a float orjson may not write as DRF does"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, (float, Decimal)):
+            value = float(value)
+            if not (value == 0 or 1e-4 <= abs(value) < 1e16):
+                return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    Indented output for the browsable API, any value orjson cannot
+    encode, and floats it writes differently, go through DRF's own
+    encoder, so the output is always the same as JSONRenderer's.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not fastjson.available() or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = fastjson.dumps(data, default=_encoder.default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Checking the data is slow, so only when the output hints at it.
+        # DRF then rejects NaN and infinity, or writes them with
+        # STRICT_JSON off.
+        if _may_have_unusual_float(ret) and _has_unusual_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escape the line separators JavaScript treats as newlines, as DRF
+        # does
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render a list as newline delimited JSON, anything else as one line"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(encode_ndjson(row) for row in rows).encode('utf-8')
+
+
+class CSVRenderer(BaseRenderer):
+    """Render a list of flat dicts as CSV with a header row"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        lines = [encode_csv(fields)]
+        lines.extend(encode_csv([row.get(f) for f in fields]) for row in rows)
+        return ''.join(lines).encode('utf-8')
+
+
+def encode_ndjson(row):
+    """Return row as one line of NDJSON"""
+    return fastjson.dumps(row).decode('utf-8') + '\n'
+
+
+def encode_csv(values):
+    """Return values as one line of CSV"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
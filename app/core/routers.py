@@ -0,0 +1,138 @@
+"""Route reads to replicas of the default database.
+
+Writes always go to the primary. Reads go to a random reachable alias
+of DATABASE_REPLICAS, except:
+
+* inside `primary()`, or in a transaction on the primary, so a request
+  sees its own writes;
+* for API requests that write, and for every API request of a user who
+  wrote less than REPLICA_PIN_SECONDS ago, see ReplicaRoutingMixin.
+
+A replica that cannot be connected to is skipped for
+REPLICA_RETRY_SECONDS; with none left, reads go to the primary.
+"""
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_use_primary = contextvars.ContextVar('use_primary', default=False)
+_down_until = {}
+
+
+@contextmanager
+def primary():
+    """Send the reads of the block to the primary"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def _pin_key(user):
+    return 'db-pin:%s' % user.pk
+
+
+def pin_user(user):
+    """Read the user's data from the primary for the next few seconds"""
+    caches[settings.REPLICA_PIN_CACHE_ALIAS].set(
+        _pin_key(user), True, settings.REPLICA_PIN_SECONDS
+    )
+
+
+def user_pinned(user):
+    return caches[settings.REPLICA_PIN_CACHE_ALIAS].get(
+        _pin_key(user), False
+    )
+
+
+def replicas_enabled():
+    return bool(settings.DATABASE_REPLICAS)
+
+
+def _reachable(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except OperationalError:
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        return False
+    _down_until.pop(alias, None)
+    return True
+
+
+class ReplicaRouter:
+    """Send writes to the primary and reads to a replica"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or _use_primary.get() or \
+                connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        for alias in random.sample(replicas, len(replicas)):
+            if _reachable(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _on_primary(content):
+    with primary():
+        yield from content
+
+
+class ReplicaRoutingMixin:
+    """Keep API requests that need fresh data on the primary.
+
+    Requests that write, and requests of a user who wrote recently, read
+    from the primary; successful writes pin their user. The choice lasts
+    until the response is finalized, or for a streamed response until
+    its body has been read.
+    """
+    _primary_token = None
+
+    def initial(self, request, *args, **kwargs):
+        write = request.method not in SAFE_METHODS
+        self._primary_token = _use_primary.set(write)
+        super().initial(request, *args, **kwargs)
+        if not write and replicas_enabled() and \
+                request.user.is_authenticated and user_pinned(request.user):
+            _use_primary.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if request.method not in SAFE_METHODS and replicas_enabled() and \
+                response.status_code < 400 and \
+                request.user.is_authenticated:
+            pin_user(request.user)
+        if response.streaming and _use_primary.get():
+            # The body is generated after the view has returned
+            response.streaming_content = _on_primary(
+                response.streaming_content
+            )
+        if self._primary_token is not None:
+            # Leave the next request of this thread to choose afresh
+            _use_primary.reset(self._primary_token)
+            self._primary_token = None
+        return response
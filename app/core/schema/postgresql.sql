@@ -0,0 +1,220 @@
+-- Generated by manage.py bootstrap_db --update, do not edit
+-- migration: contenttypes.0001_initial
+-- migration: contenttypes.0002_remove_content_type_name
+-- migration: auth.0001_initial
+-- migration: auth.0002_alter_permission_name_max_length
+-- migration: auth.0003_alter_user_email_max_length
+-- migration: auth.0004_alter_user_username_opts
+-- migration: auth.0005_alter_user_last_login_null
+-- migration: auth.0006_require_contenttypes_0002
+-- migration: auth.0007_alter_validators_add_error_messages
+-- migration: auth.0008_alter_user_username_max_length
+-- migration: auth.0009_alter_user_last_name_max_length
+-- migration: auth.0010_alter_group_name_max_length
+-- migration: auth.0011_update_proxy_permissions
+-- migration: auth.0012_alter_user_first_name_max_length
+-- migration: core.0001_squashed_0009_updated_at
+-- migration: admin.0001_initial
+-- migration: admin.0002_logentry_remove_auto_add
+-- migration: admin.0003_logentry_add_action_flag_choices
+-- migration: authtoken.0001_initial
+-- migration: authtoken.0002_auto_20160226_1747
+-- migration: authtoken.0003_tokenproxy
+-- migration: sessions.0001_initial
+--
+-- Create model ContentType
+--
+CREATE TABLE "django_content_type" ("id" serial NOT NULL PRIMARY KEY, "name" varchar(100) NOT NULL, "app_label" varchar(100) NOT NULL, "model" varchar(100) NOT NULL);
+--
+-- Alter unique_together for contenttype (1 constraint(s))
+--
+ALTER TABLE "django_content_type" ADD CONSTRAINT "django_content_type_app_label_model_76bd3d3b_uniq" UNIQUE ("app_label", "model");
+--
+-- Change Meta options on contenttype
+--
+--
+-- Alter field name on contenttype
+--
+ALTER TABLE "django_content_type" ALTER COLUMN "name" DROP NOT NULL;
+--
+-- MIGRATION NOW PERFORMS OPERATION THAT CANNOT BE WRITTEN AS SQL:
+-- Raw Python operation
+--
+--
+-- Remove field name from contenttype
+--
+ALTER TABLE "django_content_type" DROP COLUMN "name" CASCADE;
+--
+-- Create model Permission
+--
+CREATE TABLE "auth_permission" ("id" serial NOT NULL PRIMARY KEY, "name" varchar(50) NOT NULL, "content_type_id" integer NOT NULL, "codename" varchar(100) NOT NULL);
+--
+-- Create model Group
+--
+CREATE TABLE "auth_group" ("id" serial NOT NULL PRIMARY KEY, "name" varchar(80) NOT NULL UNIQUE);
+CREATE TABLE "auth_group_permissions" ("id" bigserial NOT NULL PRIMARY KEY, "group_id" integer NOT NULL, "permission_id" integer NOT NULL);
+--
+-- Create model User
+--
+ALTER TABLE "auth_permission" ADD CONSTRAINT "auth_permission_content_type_id_codename_01ab375a_uniq" UNIQUE ("content_type_id", "codename");
+ALTER TABLE "auth_permission" ADD CONSTRAINT "auth_permission_content_type_id_2f476e4b_fk_django_co" FOREIGN KEY ("content_type_id") REFERENCES "django_content_type" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "auth_permission_content_type_id_2f476e4b" ON "auth_permission" ("content_type_id");
+CREATE INDEX "auth_group_name_a6ea08ec_like" ON "auth_group" ("name" varchar_pattern_ops);
+ALTER TABLE "auth_group_permissions" ADD CONSTRAINT "auth_group_permissions_group_id_permission_id_0cd325b0_uniq" UNIQUE ("group_id", "permission_id");
+ALTER TABLE "auth_group_permissions" ADD CONSTRAINT "auth_group_permissions_group_id_b120cbf9_fk_auth_group_id" FOREIGN KEY ("group_id") REFERENCES "auth_group" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "auth_group_permissions" ADD CONSTRAINT "auth_group_permissio_permission_id_84c5c92e_fk_auth_perm" FOREIGN KEY ("permission_id") REFERENCES "auth_permission" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "auth_group_permissions_group_id_b120cbf9" ON "auth_group_permissions" ("group_id");
+CREATE INDEX "auth_group_permissions_permission_id_84c5c92e" ON "auth_group_permissions" ("permission_id");
+--
+-- Alter field name on permission
+--
+ALTER TABLE "auth_permission" ALTER COLUMN "name" TYPE varchar(255);
+--
+-- Alter field email on user
+--
+--
+-- Alter field username on user
+--
+--
+-- Alter field last_login on user
+--
+--
+-- Alter field username on user
+--
+--
+-- Alter field username on user
+--
+--
+-- Alter field last_name on user
+--
+--
+-- Alter field name on group
+--
+ALTER TABLE "auth_group" ALTER COLUMN "name" TYPE varchar(150);
+--
+-- MIGRATION NOW PERFORMS OPERATION THAT CANNOT BE WRITTEN AS SQL:
+-- Raw Python operation
+--
+--
+-- Alter field first_name on user
+--
+--
+-- Create model User
+--
+CREATE TABLE "core_user" ("id" bigserial NOT NULL PRIMARY KEY, "password" varchar(128) NOT NULL, "last_login" timestamp with time zone NULL, "is_superuser" boolean NOT NULL, "email" varchar(255) NOT NULL UNIQUE, "name" varchar(255) NOT NULL, "is_active" boolean NOT NULL, "is_staff" boolean NOT NULL, "updated_at" timestamp with time zone NOT NULL);
+CREATE TABLE "core_user_groups" ("id" bigserial NOT NULL PRIMARY KEY, "user_id" bigint NOT NULL, "group_id" integer NOT NULL);
+CREATE TABLE "core_user_user_permissions" ("id" bigserial NOT NULL PRIMARY KEY, "user_id" bigint NOT NULL, "permission_id" integer NOT NULL);
+--
+-- Create model Tag
+--
+CREATE TABLE "core_tag" ("id" bigserial NOT NULL PRIMARY KEY, "name" varchar(255) NOT NULL, "updated_at" timestamp with time zone NOT NULL, "user_id" bigint NOT NULL);
+--
+-- Create model Ingredient
+--
+CREATE TABLE "core_ingredient" ("id" bigserial NOT NULL PRIMARY KEY, "name" varchar(255) NOT NULL, "updated_at" timestamp with time zone NOT NULL, "user_id" bigint NOT NULL);
+--
+-- Create model Recipe
+--
+CREATE TABLE "core_recipe" ("id" bigserial NOT NULL PRIMARY KEY, "title" varchar(255) NOT NULL, "time_minutes" integer NOT NULL, "price" numeric(5, 2) NOT NULL, "link" varchar(255) NOT NULL, "updated_at" timestamp with time zone NOT NULL, "search_vector" tsvector NULL, "user_id" bigint NOT NULL);
+CREATE TABLE "core_recipe_ingredients" ("id" bigserial NOT NULL PRIMARY KEY, "recipe_id" bigint NOT NULL, "ingredient_id" bigint NOT NULL);
+CREATE TABLE "core_recipe_tags" ("id" bigserial NOT NULL PRIMARY KEY, "recipe_id" bigint NOT NULL, "tag_id" bigint NOT NULL);
+--
+-- Create index core_tag_user_name_idx on field(s) user, -name, id of model tag
+--
+CREATE INDEX "core_tag_user_name_idx" ON "core_tag" ("user_id", "name" DESC, "id");
+--
+-- Create index core_ingredient_user_name_idx on field(s) user, -name, id of model ingredient
+--
+CREATE INDEX "core_ingredient_user_name_idx" ON "core_ingredient" ("user_id", "name" DESC, "id");
+--
+-- Create index core_recipe_user_id_idx on field(s) user, -id of model recipe
+--
+CREATE INDEX "core_recipe_user_id_idx" ON "core_recipe" ("user_id", "id" DESC);
+--
+-- Create constraint core_tag_user_name_uniq on model tag
+--
+ALTER TABLE "core_tag" ADD CONSTRAINT "core_tag_user_name_uniq" UNIQUE ("user_id", "name");
+--
+-- Create constraint core_ingredient_user_name_uniq on model ingredient
+--
+ALTER TABLE "core_ingredient" ADD CONSTRAINT "core_ingredient_user_name_uniq" UNIQUE ("user_id", "name");
+--
+-- Raw SQL operation
+--
+CREATE INDEX core_recipe_tags_tag_recipe_idx ON core_recipe_tags (tag_id, recipe_id);
+--
+-- Raw SQL operation
+--
+CREATE INDEX core_recipe_ingredients_ingredient_recipe_idx ON core_recipe_ingredients (ingredient_id, recipe_id);
+--
+-- Raw SQL operation
+--
+CREATE INDEX core_recipe_search_idx ON core_recipe USING gin (search_vector);
+CREATE INDEX "core_user_email_92a71487_like" ON "core_user" ("email" varchar_pattern_ops);
+ALTER TABLE "core_user_groups" ADD CONSTRAINT "core_user_groups_user_id_group_id_c82fcad1_uniq" UNIQUE ("user_id", "group_id");
+ALTER TABLE "core_user_groups" ADD CONSTRAINT "core_user_groups_user_id_70b4d9b8_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "core_user_groups" ADD CONSTRAINT "core_user_groups_group_id_fe8c697f_fk_auth_group_id" FOREIGN KEY ("group_id") REFERENCES "auth_group" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_user_groups_user_id_70b4d9b8" ON "core_user_groups" ("user_id");
+CREATE INDEX "core_user_groups_group_id_fe8c697f" ON "core_user_groups" ("group_id");
+ALTER TABLE "core_user_user_permissions" ADD CONSTRAINT "core_user_user_permissions_user_id_permission_id_73ea0daa_uniq" UNIQUE ("user_id", "permission_id");
+ALTER TABLE "core_user_user_permissions" ADD CONSTRAINT "core_user_user_permissions_user_id_085123d3_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "core_user_user_permissions" ADD CONSTRAINT "core_user_user_permi_permission_id_35ccf601_fk_auth_perm" FOREIGN KEY ("permission_id") REFERENCES "auth_permission" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_user_user_permissions_user_id_085123d3" ON "core_user_user_permissions" ("user_id");
+CREATE INDEX "core_user_user_permissions_permission_id_35ccf601" ON "core_user_user_permissions" ("permission_id");
+ALTER TABLE "core_tag" ADD CONSTRAINT "core_tag_user_id_1b670500_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_tag_user_id_1b670500" ON "core_tag" ("user_id");
+ALTER TABLE "core_ingredient" ADD CONSTRAINT "core_ingredient_user_id_73e97fe3_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_ingredient_user_id_73e97fe3" ON "core_ingredient" ("user_id");
+ALTER TABLE "core_recipe" ADD CONSTRAINT "core_recipe_user_id_04234149_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_recipe_user_id_04234149" ON "core_recipe" ("user_id");
+ALTER TABLE "core_recipe_ingredients" ADD CONSTRAINT "core_recipe_ingredients_recipe_id_ingredient_id_c9de55ee_uniq" UNIQUE ("recipe_id", "ingredient_id");
+ALTER TABLE "core_recipe_ingredients" ADD CONSTRAINT "core_recipe_ingredients_recipe_id_eeb7255a_fk_core_recipe_id" FOREIGN KEY ("recipe_id") REFERENCES "core_recipe" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "core_recipe_ingredients" ADD CONSTRAINT "core_recipe_ingredie_ingredient_id_a8fec9ee_fk_core_ingr" FOREIGN KEY ("ingredient_id") REFERENCES "core_ingredient" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_recipe_ingredients_recipe_id_eeb7255a" ON "core_recipe_ingredients" ("recipe_id");
+CREATE INDEX "core_recipe_ingredients_ingredient_id_a8fec9ee" ON "core_recipe_ingredients" ("ingredient_id");
+ALTER TABLE "core_recipe_tags" ADD CONSTRAINT "core_recipe_tags_recipe_id_tag_id_f51d05f6_uniq" UNIQUE ("recipe_id", "tag_id");
+ALTER TABLE "core_recipe_tags" ADD CONSTRAINT "core_recipe_tags_recipe_id_7754231e_fk_core_recipe_id" FOREIGN KEY ("recipe_id") REFERENCES "core_recipe" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "core_recipe_tags" ADD CONSTRAINT "core_recipe_tags_tag_id_10c0ffea_fk_core_tag_id" FOREIGN KEY ("tag_id") REFERENCES "core_tag" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "core_recipe_tags_recipe_id_7754231e" ON "core_recipe_tags" ("recipe_id");
+CREATE INDEX "core_recipe_tags_tag_id_10c0ffea" ON "core_recipe_tags" ("tag_id");
+--
+-- Create model LogEntry
+--
+CREATE TABLE "django_admin_log" ("id" serial NOT NULL PRIMARY KEY, "action_time" timestamp with time zone NOT NULL, "object_id" text NULL, "object_repr" varchar(200) NOT NULL, "action_flag" smallint NOT NULL CHECK ("action_flag" >= 0), "change_message" text NOT NULL, "content_type_id" integer NULL, "user_id" bigint NOT NULL);
+ALTER TABLE "django_admin_log" ADD CONSTRAINT "django_admin_log_content_type_id_c4bce8eb_fk_django_co" FOREIGN KEY ("content_type_id") REFERENCES "django_content_type" ("id") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "django_admin_log" ADD CONSTRAINT "django_admin_log_user_id_c564eba6_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "django_admin_log_content_type_id_c4bce8eb" ON "django_admin_log" ("content_type_id");
+CREATE INDEX "django_admin_log_user_id_c564eba6" ON "django_admin_log" ("user_id");
+--
+-- Alter field action_time on logentry
+--
+--
+-- Alter field action_flag on logentry
+--
+--
+-- Create model Token
+--
+CREATE TABLE "authtoken_token" ("key" varchar(40) NOT NULL PRIMARY KEY, "created" timestamp with time zone NOT NULL, "user_id" bigint NOT NULL UNIQUE);
+ALTER TABLE "authtoken_token" ADD CONSTRAINT "authtoken_token_user_id_35299eff_fk_core_user_id" FOREIGN KEY ("user_id") REFERENCES "core_user" ("id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "authtoken_token_key_10f0b77e_like" ON "authtoken_token" ("key" varchar_pattern_ops);
+--
+-- Change Meta options on token
+--
+--
+-- Alter field created on token
+--
+--
+-- Alter field key on token
+--
+--
+-- Alter field user on token
+--
+--
+-- Create proxy model TokenProxy
+--
+--
+-- Create model Session
+--
+CREATE TABLE "django_session" ("session_key" varchar(40) NOT NULL PRIMARY KEY, "session_data" text NOT NULL, "expire_date" timestamp with time zone NOT NULL);
+CREATE INDEX "django_session_session_key_c0390e0f_like" ON "django_session" ("session_key" varchar_pattern_ops);
+CREATE INDEX "django_session_expire_date_a5c62663" ON "django_session" ("expire_date");
@@ -0,0 +1,103 @@
+"""Schema snapshots: the SQL of every migration, collected ahead of time.
+
+A new database is normally built by replaying every migration one after
+another, rebuilding the project state in between. The snapshot is the
+SQL those migrations send to an empty database, collected once like
+`sqlmigrate` does and committed as core/schema/<vendor>.sql. Loading it
+runs that SQL and records the migrations as applied.
+
+The snapshot lists the migrations it was collected from, so one that no
+longer matches the migrations on disk is refused rather than loaded.
+"""
+import os
+
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.migrations.state import ProjectState
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'schema')
+HEADER = '-- Generated by manage.py bootstrap_db --update, do not edit\n'
+MIGRATION = '-- migration: %s.%s\n'
+
+
+def path(connection):
+    """Return the snapshot file for the connection's database vendor"""
+    return os.path.join(SNAPSHOT_DIR, '%s.sql' % connection.vendor)
+
+
+def _loader():
+    # Without a connection nothing counts as applied, so squashed
+    # migrations are used in place of the ones they replace
+    return MigrationLoader(None, ignore_no_migrations=True)
+
+
+def migration_plan(loader=None):
+    """Return the migrations that build an empty database, in order"""
+    graph = (loader or _loader()).graph
+    plan = []
+    for leaf in sorted(graph.leaf_nodes()):
+        for key in graph.forwards_plan(leaf):
+            if key not in plan:
+                plan.append(key)
+    return [graph.nodes[key] for key in plan]
+
+
+def _migration_lines(plan):
+    return ''.join(
+        MIGRATION % (migration.app_label, migration.name)
+        for migration in plan
+    )
+
+
+def generate(connection):
+    """Return the snapshot of the migrations on disk"""
+    loader = _loader()
+    plan = migration_plan(loader)
+    state = ProjectState(real_apps=list(loader.unmigrated_apps))
+    statements = []
+    for migration in plan:
+        with connection.schema_editor(collect_sql=True,
+                                      atomic=False) as editor:
+            state = migration.apply(state, editor, collect_sql=True)
+        statements += editor.collected_sql
+    return HEADER + _migration_lines(plan) + '\n'.join(statements) + '\n'
+
+
+def read(connection):
+    """Return the committed snapshot, None if the vendor has none"""
+    try:
+        with open(path(connection)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def is_current(snapshot):
+    """Return whether snapshot was collected from the current migrations"""
+    recorded = ''.join(
+        line for line in snapshot.splitlines(True)
+        if line.startswith(MIGRATION.split('%')[0])
+    )
+    return recorded == _migration_lines(migration_plan())
+
+
+def load(connection, snapshot):
+    """Run the snapshot and record its migrations as applied.
+
+    Call it in a transaction on an empty database.
+    """
+    with connection.cursor() as cursor:
+        for statement in connection.ops.prepare_sql_script(snapshot):
+            cursor.execute(statement)
+
+    recorder = MigrationRecorder(connection)
+    recorder.ensure_schema()
+    applied = []
+    for migration in migration_plan():
+        # As migrate records a squashed migration applied to a new database
+        applied += migration.replaces
+        applied.append((migration.app_label, migration.name))
+    recorder.migration_qs.bulk_create(
+        recorder.Migration(app=app, name=name) for app, name in applied
+    )
+    return len(applied)
@@ -0,0 +1,21 @@
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class FastTestRunner(DiscoverRunner):
+    """Run the tests on every core and skip slow ones unless tagged.
+
+    `--parallel 1` runs them in one process and `--tag slow` runs the
+    slow tests only.
+    """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if not tags and not exclude_tags:
+            exclude_tags = ['slow']
+        super().__init__(
+            *args, tags=tags, exclude_tags=exclude_tags, **kwargs
+        )
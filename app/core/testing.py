@@ -0,0 +1,190 @@
+"""Query budgets for tests.
+
+`query_budget(n)` fails the block, or the decorated function, when it
+runs more than n queries, with a report of the SQL grouped by shape so
+N+1 patterns stand out. `BudgetedAPIClient` applies the budget that
+QUERY_BUDGETS declares for the endpoint of every request it makes;
+requests to endpoints without a budget fail, so new endpoints get one.
+Queries run while a streamed response is read count towards the budget
+of its request.
+
+Budgets count every statement a request sends, including the SAVEPOINT
+and RELEASE of atomic blocks nested in the test's transaction.
+"""
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+from rest_framework.test import APIClient
+
+from core.instrumentation import sql_shape
+
+# Queries that recur in the budgets below
+AUTH = 1  # token lookup; none when cached or forced by the test
+SAVEPOINT = 2  # SAVEPOINT and RELEASE of an atomic block
+NAMES = 3  # bulk name resolution: look up, insert missing, look up again
+LINKS = 3  # replacing one relation's links: current ids, delete, insert
+NESTED = 2  # tags and ingredients of the recipes serialized, one query each
+
+# Most queries a request to (URL name, method) may run, added up from the
+# queries the endpoint is expected to send
+QUERY_BUDGETS = {
+    ('healthz', 'GET'): 0,
+    ('metrics', 'GET'): 0,
+    # Tag, ingredient and recipe cursors, then the names of each chunk of
+    # RECIPE_EXPORT_CHUNK_SIZE recipes; one chunk
+    ('recipe:export', 'GET'): AUTH + 3 + NESTED,
+    # One batch: names of both models, recipes, both link tables and
+    # search vectors. SQLite inserts recipes one by one.
+    ('recipe:import', 'POST'): AUTH + SAVEPOINT + 2 * NAMES + 1 + 2 + 1,
+    # The user's names, then the names shared by many users
+    ('recipe:ingredient-autocomplete', 'GET'): AUTH + 2,
+    ('recipe:ingredient-bulk', 'POST'): AUTH + SAVEPOINT + NAMES,
+    # Newest updated_at for Last-Modified, then the rows
+    ('recipe:ingredient-list', 'GET'): AUTH + 2,
+    # Unique name check, then the insert guarded against a racing one
+    ('recipe:ingredient-list', 'POST'): AUTH + 1 + SAVEPOINT + 1,
+    # updated_at for the ETag, then the recipe
+    ('recipe:recipe-detail', 'GET'): AUTH + 2 + NESTED,
+    # The recipe, its tags and ingredients validated, update and search
+    # vector, both relations replaced and the recipe touched once
+    ('recipe:recipe-detail', 'PATCH'): AUTH + 1 + 2 + 2 + 2 * LINKS + 1 +
+    NESTED,
+    ('recipe:recipe-detail', 'PUT'): AUTH + 1 + 2 + 2 + 2 * LINKS + 1 +
+    NESTED,
+    # Newest updated_at for Last-Modified, then a page
+    ('recipe:recipe-list', 'GET'): AUTH + 2 + NESTED,
+    # Tags and ingredients validated, insert and search vector, one
+    # insert per link table and the recipe touched once
+    ('recipe:recipe-list', 'POST'): AUTH + 2 + 2 + 2 + 1 + NESTED,
+    # Python backend: recipes and both name tables for the index, then the
+    # page; Postgres counts the matches and fetches their ids instead
+    ('recipe:recipe-search', 'GET'): AUTH + 3 + 1 + NESTED,
+    ('recipe:tag-autocomplete', 'GET'): AUTH + 2,
+    ('recipe:tag-bulk', 'POST'): AUTH + SAVEPOINT + NAMES,
+    ('recipe:tag-list', 'GET'): AUTH + 2,
+    ('recipe:tag-list', 'POST'): AUTH + 1 + SAVEPOINT + 1,
+    ('readyz', 'GET'): 1,
+    # Unique email check and insert
+    ('user:create', 'POST'): 2,
+    ('user:me', 'GET'): AUTH,
+    # The update, then saving the new password
+    ('user:me', 'PATCH'): AUTH + 2,
+    ('user:me', 'POST'): 0,
+    ('user:me', 'PUT'): AUTH + 2,
+    # The user, rehashing an outdated password hash, then get_or_create
+    # of the token
+    ('user:token', 'POST'): 1 + 1 + 1 + SAVEPOINT + 1,
+}
+
+
+def _databases():
+    return [DEFAULT_DB_ALIAS] + list(settings.DATABASE_REPLICAS)
+
+
+class QueryCapture:
+    """Capture the queries sent to every database the router uses"""
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        self._captures = [
+            self._stack.enter_context(
+                CaptureQueriesContext(connections[alias])
+            )
+            for alias in _databases()
+        ]
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def queries(self):
+        return [query['sql'] for capture in self._captures
+                for query in capture.captured_queries]
+
+
+def report(queries):
+    """Return the queries grouped by shape, most repeated first"""
+    lines = []
+    for shape, count in Counter(map(sql_shape, queries)).most_common():
+        lines.append('%4dx %s' % (count, shape))
+    return '\n'.join(lines)
+
+
+class query_budget(ContextDecorator):
+    """Fail when the block runs more than `budget` queries.
+
+    Entering the same budget again adds to the queries already counted.
+    """
+
+    def __init__(self, budget, label='block'):
+        self.budget = budget
+        self.label = label
+        self.queries = []
+
+    def _recreate_cm(self):
+        # Every call of a decorated function gets a fresh budget
+        return type(self)(self.budget, self.label)
+
+    def __enter__(self):
+        self._capture = QueryCapture().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._capture.__exit__(exc_type, exc_value, traceback)
+        self.queries += self._capture.queries
+        if exc_type is None and len(self.queries) > self.budget:
+            raise AssertionError(
+                '%s ran %d queries, budget %d:\n%s' % (
+                    self.label, len(self.queries), self.budget,
+                    report(self.queries)
+                )
+            )
+
+
+def _stream(budget, content):
+    with budget:
+        yield from content
+
+
+def count_queries(func, *args, **kwargs):
+    """Call func and return the SQL of the queries it ran"""
+    with QueryCapture() as capture:
+        func(*args, **kwargs)
+    return capture.queries
+
+
+class BudgetedAPIClient(APIClient):
+    """API client holding every request to its endpoint's query budget.
+
+    `budgets` maps (URL name, method) to budgets replacing those of
+    QUERY_BUDGETS, for tests that deliberately make an endpoint work
+    harder, e.g. export in many small chunks.
+    """
+
+    def __init__(self, *args, budgets=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budgets = dict(QUERY_BUDGETS)
+        self.budgets.update(budgets or {})
+
+    def request(self, **request):
+        try:
+            match = resolve(request['PATH_INFO'])
+        except Resolver404:
+            return super().request(**request)
+        key = (match.view_name, request['REQUEST_METHOD'])
+        if key not in self.budgets:
+            raise AssertionError('No query budget for %s %s' % key[::-1])
+        budget = query_budget(self.budgets[key], '%s %s' % key[::-1])
+        with budget:
+            response = super().request(**request)
+        if response.streaming:
+            # Streamed bodies run their queries as they are read
+            response.streaming_content = _stream(
+                budget, response.streaming_content
+            )
+        return response
@@ -0,0 +1,198 @@
+import asyncio
+import contextvars
+import json
+import threading
+
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, \
+    TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core import async_views
+from core.models import Recipe, Tag
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+class RunSyncTests(SimpleTestCase):
+    """Test running blocking work in the shared pool"""
+
+    def test_runs_in_pool_with_context(self):
+        """Test that work runs on a pool thread and sees context vars"""
+        def work(value):
+            return value, request_id.get(), threading.current_thread().name
+
+        async def main():
+            request_id.set('abc')
+            return await async_views.run_sync(work, 1)
+
+        value, context_value, thread = asyncio.run(main())
+
+        self.assertEqual(value, 1)
+        self.assertEqual(context_value, 'abc')
+        self.assertTrue(thread.startswith('async-view'))
+
+
+class StreamingTests(SimpleTestCase):
+    """Test sending streamed bodies produced in the pool"""
+
+    def test_first_chunk_sent_before_body_ends(self):
+        """Test chunks are sent while the rest is still being produced"""
+        first_sent = threading.Event()
+        threads = set()
+
+        def body():
+            threads.add(threading.current_thread().name)
+            yield b'first'
+            threads.add(threading.current_thread().name)
+            yield b'waited' if first_sent.wait(5) else b'buffered'
+
+        view = async_views.async_view(
+            lambda request: StreamingHttpResponse(body())
+        )
+        bodies = []
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                bodies.append(message.get('body', b''))
+                if bodies == [b'first']:
+                    first_sent.set()
+
+        async def main():
+            response = await view(RequestFactory().get('/'))
+            await async_views.ASGIHandler().send_response(response, send)
+        asyncio.run(main())
+
+        self.assertEqual(bodies, [b'first', b'waited', b''])
+        self.assertEqual(len(threads), 1)
+
+    def test_stopped_body_closed(self):
+        """Test a body the client stops reading is closed in the pool"""
+        closed = []
+
+        def body():
+            try:
+                yield b'first'
+                yield b'second'
+            finally:
+                closed.append(threading.current_thread().name)
+
+        view = async_views.async_view(
+            lambda request: StreamingHttpResponse(body())
+        )
+
+        async def main():
+            response = await view(RequestFactory().get('/'))
+            async for chunk in response.pooled_content:
+                break
+            await response.pooled_content.aclose()
+        asyncio.run(main())
+
+        self.assertEqual(len(closed), 1)
+        self.assertTrue(closed[0].startswith('async-view'))
+
+
+@override_settings(ROOT_URLCONF='app.asgi_urls')
+class AsyncApiTests(TransactionTestCase):
+    """Test the API served by the ASGI URL configuration"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+        # AsyncClient sends extra keyword arguments as request headers
+        self.auth = {'authorization': 'Token %s' % token.key}
+
+    @classmethod
+    def tearDownClass(cls):
+        # Pool threads keep their connections to the test database
+        async_views.shutdown()
+        super().tearDownClass()
+
+    def test_urls_match_sync_configuration(self):
+        """Test that API URLs keep their names and resolve to coroutines"""
+        match = resolve(reverse('recipe:tag-list'))
+
+        self.assertEqual(reverse('recipe:tag-list'), '/api/recipe/tags/')
+        self.assertEqual(match.namespace, 'recipe')
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+
+    async def test_list_tags(self):
+        """Test listing tags through an async view"""
+        await async_views.run_sync(
+            Tag.objects.create, user=self.user, name='Vegan'
+        )
+
+        res = await self.client.get(
+            reverse('recipe:tag-list'), **self.auth
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in res.json()], ['Vegan'])
+
+    async def test_create_recipe(self):
+        """Test creating a recipe through an async view"""
+        payload = {
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': '5.00',
+            'tags': [],
+            'ingredients': [],
+        }
+
+        res = await self.client.post(
+            reverse('recipe:recipe-list'), json.dumps(payload),
+            content_type='application/json', **self.auth
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        exists = await async_views.run_sync(
+            Recipe.objects.filter(user=self.user, title='Curry').exists
+        )
+        self.assertTrue(exists)
+
+    async def test_authentication_required(self):
+        """Test that the async views still authenticate requests"""
+        res = await AsyncClient().get(reverse('user:me'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_retrieve_profile(self):
+        """Test retrieving the profile through an async view"""
+        res = await self.client.get(reverse('user:me'), **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['email'], self.user.email)
+
+    async def test_export_streams_from_pool(self):
+        """Test that streamed exports are produced off the event loop"""
+        await async_views.run_sync(
+            Recipe.objects.create,
+            user=self.user, title='Curry', time_minutes=30, price=5.00
+        )
+
+        res = await self.client.get(
+            reverse('recipe:export'), **self.auth
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = b''.join([chunk async for chunk in res.pooled_content])
+        lines = body.decode().splitlines()
+        self.assertEqual(json.loads(lines[-1])['title'], 'Curry')
+
+    @override_settings(INSTRUMENTATION_ENABLED=True)
+    async def test_instrumentation_counts_pool_queries(self):
+        """Test queries run on pool threads are added to the request"""
+        res = await self.client.get(
+            reverse('recipe:tag-list'), **self.auth
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(res['Server-Timing'], r'desc="[1-9]\d* queries"')
+        self.assertIn('auth;dur=', res['Server-Timing'])
@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core import authentication
+from core.lru import LRUCache
+from core.testing import BudgetedAPIClient
+
+ME_URL = reverse('user:me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication backend"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='whafeez21@gmail.com',
+            password='Password1',
+            name='Waqas'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = BudgetedAPIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_steady_state_runs_no_queries(self):
+        """Test a repeated authenticated request issues no auth queries"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating immediately"""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates the cached entry"""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_visible(self):
+        """Test the cached user is refreshed after an update"""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'Vicky'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Vicky')
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is not authenticated"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hit_rate_reported(self):
+        """Test cache hits are counted"""
+        hits = authentication.stats()['hits']
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        self.assertEqual(authentication.stats()['hits'], hits + 1)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS='default')
+    def test_revoked_in_every_worker(self):
+        """Test a token deleted in one worker is rejected by another"""
+        backend = authentication.CachedTokenAuthentication()
+        workers = [LRUCache(), LRUCache()]
+        for worker in workers:
+            with patch.object(authentication, '_local', worker):
+                backend.authenticate_credentials(self.token.key)
+
+        with patch.object(authentication, '_local', workers[0]):
+            self.token.delete()
+        with patch.object(authentication, '_local', workers[1]):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS='default')
+    def test_deactivated_in_every_worker(self):
+        """Test a user deactivated in one worker is rejected by another"""
+        workers = [LRUCache(), LRUCache()]
+        for worker in workers:
+            with patch.object(authentication, '_local', worker):
+                self.client.get(ME_URL)
+
+        with patch.object(authentication, '_local', workers[0]):
+            self.user.is_active = False
+            self.user.save()
+        with patch.object(authentication, '_local', workers[1]):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LRUCacheTests(TestCase):
+    """Test the bounded in-process cache"""
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest unread entry is dropped when full"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_expired_entry_missing(self):
+        """Test entries past their time to live are not returned"""
+        cache = LRUCache(ttl=-1)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
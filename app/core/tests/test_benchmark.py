@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from core.benchmark import compare
+
+BASELINE = {
+    'tag list': {'rps': 400, 'p50': 10, 'p95': 20, 'queries': 2,
+                 'rss_mb': 100, 'errors': 0},
+}
+
+
+class CompareTests(SimpleTestCase):
+    """Test benchmark results are checked against a baseline"""
+
+    def test_within_threshold(self):
+        """Test results slightly worse than the baseline pass"""
+        results = {'tag list': {'rps': 380, 'p50': 10.5, 'p95': 21,
+                                'queries': 2, 'rss_mb': 105, 'errors': 0}}
+
+        self.assertEqual(compare(results, BASELINE, 10), [])
+
+    def test_regressions_reported(self):
+        """Test slower, bigger or chattier endpoints are regressions"""
+        results = {'tag list': {'rps': 300, 'p50': 10, 'p95': 30,
+                                'queries': 3, 'rss_mb': 100, 'errors': 4}}
+
+        regressions = compare(results, BASELINE, 10)
+
+        self.assertEqual(len(regressions), 4)
+        self.assertIn('tag list: req/s 300.00, baseline 400.00', regressions)
+        self.assertIn('tag list: 3 queries, baseline 2', regressions)
+
+    def test_missing_endpoint(self):
+        """Test endpoints of the baseline must be measured"""
+        self.assertEqual(
+            compare({}, BASELINE, 10), ['tag list: not measured']
+        )
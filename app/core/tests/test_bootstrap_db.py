@@ -0,0 +1,61 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase
+
+from core import snapshot
+
+
+class MigrationPlanTests(SimpleTestCase):
+    """Test the snapshot is collected from the squashed migrations"""
+
+    def test_squashed_migration_used(self):
+        """Test new databases skip the migrations squashed into one"""
+        names = [(migration.app_label, migration.name)
+                 for migration in snapshot.migration_plan()]
+
+        self.assertIn(('core', '0001_squashed_0009_updated_at'), names)
+        self.assertNotIn(('core', '0001_initial'), names)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Snapshot is for Postgres')
+class BootstrapDbTests(TestCase):
+    """Test building a database from the schema snapshot"""
+
+    def test_snapshot_matches_migrations(self):
+        """Test the committed snapshot is up to date"""
+        out = StringIO()
+
+        call_command('bootstrap_db', '--check', stdout=out)
+
+        self.assertIn('matches', out.getvalue())
+
+    def test_bootstrap_empty_database(self):
+        """Test the snapshot leaves no migration to apply"""
+        # An empty schema first on the search path is an empty database
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA bootstrap')
+            cursor.execute('SET LOCAL search_path TO bootstrap')
+        # Content types get new ids in the new schema
+        self.addCleanup(ContentType.objects.clear_cache)
+
+        call_command('bootstrap_db', stdout=StringIO())
+
+        executor = MigrationExecutor(connection)
+        self.assertEqual(
+            executor.migration_plan(executor.loader.graph.leaf_nodes()), []
+        )
+        self.assertIn('core_recipe', connection.introspection.table_names())
+        self.assertTrue(ContentType.objects.filter(model='recipe').exists())
+
+    def test_existing_database_migrated(self):
+        """Test a database with tables is migrated instead"""
+        out = StringIO()
+
+        call_command('bootstrap_db', stdout=out)
+
+        self.assertIn('running migrate', out.getvalue())
@@ -0,0 +1,68 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_replica_pin_cache, check_shared_caches
+
+SHARED = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_%s' % alias,
+    }
+    for alias in ('default', 'lists', 'versions')
+}
+
+
+class SharedCachesCheckTests(SimpleTestCase):
+    """Test caches every worker relies on must be shared"""
+
+    def errors(self):
+        return sorted(error.obj for error in check_shared_caches(None))
+
+    @override_settings(SHARED_CACHES_REQUIRED=False)
+    def test_single_process(self):
+        """Test local-memory caches pass when one process serves"""
+        self.assertEqual(self.errors(), [])
+
+    @override_settings(SHARED_CACHES_REQUIRED=True)
+    def test_local_memory_refused(self):
+        """Test the list caches may not be local to each worker"""
+        self.assertEqual(self.errors(), ['lists', 'versions'])
+
+    @override_settings(SHARED_CACHES_REQUIRED=True,
+                       AUTH_TOKEN_CACHE_ALIAS='default')
+    def test_token_cache_refused(self):
+        """Test the token cache tier may not be local to each worker"""
+        self.assertEqual(self.errors(), ['default', 'lists', 'versions'])
+
+    @override_settings(SHARED_CACHES_REQUIRED=True, CACHES=SHARED,
+                       AUTH_TOKEN_CACHE_ALIAS='default')
+    def test_shared(self):
+        """Test shared backends pass"""
+        self.assertEqual(self.errors(), [])
+
+    @override_settings(SHARED_CACHES_REQUIRED=True,
+                       RECIPE_LIST_CACHE_ENABLED=False)
+    def test_list_cache_disabled(self):
+        """Test name suggestions still need shared version tokens"""
+        self.assertEqual(self.errors(), ['versions'])
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+    """Test replica pins must be kept in a shared cache"""
+
+    def errors(self):
+        return [error.id for error in check_replica_pin_cache(None)]
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Test any cache will do while reads are not routed"""
+        self.assertEqual(self.errors(), [])
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_local_memory_refused(self):
+        """Test pins may not be local to each process"""
+        self.assertEqual(self.errors(), ['core.E002'])
+
+    @override_settings(DATABASE_REPLICAS=['replica1'], CACHES=SHARED)
+    def test_shared(self):
+        """Test a shared pin cache passes"""
+        self.assertEqual(self.errors(), [])
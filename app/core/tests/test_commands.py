@@ -1,23 +1,136 @@
+from io import StringIO
+from unittest import skipUnless
 from unittest.mock import patch
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
 from django.test import TestCase
 
+from core.models import Ingredient, Recipe, Tag
+
+ENSURE_CONNECTION = \
+    'django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection'
+PENDING = 'core.management.commands.wait_for_db.Command.pending'
+
+
+def fail_times(count):
+    """Return an ensure_connection that fails count times, then connects"""
+    errors = iter([OperationalError('down')] * count)
+
+    def ensure_connection(*args):
+        error = next(errors, None)
+        if error:
+            raise error
+    return ensure_connection
+
 
 class CommandTests(TestCase):
     """docstring for CommandTests."""
 
-    def test_wait_for_db_ready(self):
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_ready(self, ts):
         """Testing wait for db is readhy if db available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        with patch(ENSURE_CONNECTION, side_effect=fail_times(0)):
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ts.call_count, 0)
 
     @patch('time.sleep', return_value=None)
     def test_wait_for_db(self, ts):
         """Test wait for db"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+        with patch(ENSURE_CONNECTION, side_effect=fail_times(5)):
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ts.call_count, 5)
+
+    @patch('random.uniform', side_effect=lambda low, high: high)
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_backoff(self, ts, ru):
+        """Test the delay doubles from milliseconds up to the maximum"""
+        with patch(ENSURE_CONNECTION, side_effect=fail_times(6)):
+            call_command('wait_for_db', '--max-delay', '0.2',
+                         stdout=StringIO())
+
+        delays = [call.args[0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.01, 0.02, 0.04, 0.08, 0.16, 0.2])
+
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_timeout(self, ts):
+        """Test giving up once the timeout has passed"""
+        with patch(ENSURE_CONNECTION, side_effect=OperationalError('down')):
+            with self.assertRaisesMessage(CommandError, 'after 0s: down'):
+                call_command('wait_for_db', '--timeout', '0',
+                             stdout=StringIO())
+
+    @patch('time.sleep', return_value=None)
+    def test_wait_for_db_migrated(self, ts):
+        """Test waiting until another process has applied migrations"""
+        out = StringIO()
+        with patch(PENDING, side_effect=[['0002_tags'], []]):
+            call_command('wait_for_db', '--migrated', stdout=out)
+
+        self.assertEqual(ts.call_count, 1)
+        self.assertIn('Database migrated', out.getvalue())
+
+    def test_wait_for_db_warns_unapplied(self):
+        """Test unapplied migrations are reported without --migrated"""
+        out = StringIO()
+        with patch(PENDING, return_value=['0002_tags']):
+            call_command('wait_for_db', stdout=out)
+
+        self.assertIn('1 unapplied migrations', out.getvalue())
+
+
+@skipUnless(connection.vendor == 'postgresql',
+            'Only Postgres drops the constraint in a transaction')
+class MergeDuplicateNamesTests(TestCase):
+    """Test folding tags sharing a name into the oldest one"""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            for table in ('core_tag', 'core_ingredient'):
+                cursor.execute(
+                    'ALTER TABLE %s DROP CONSTRAINT %s_user_name_uniq'
+                    % (table, table)
+                )
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com', 'Password1'
+        )
+
+    def recipe(self, *tags):
+        recipe = Recipe.objects.create(
+            user=self.user, title='Curry', time_minutes=10, price=5
+        )
+        recipe.tags.add(*tags)
+        return recipe
+
+    def test_merge_duplicate_names(self):
+        """Test links move to the oldest tag and duplicates are deleted"""
+        keep, first, second = [
+            Tag.objects.create(user=self.user, name='Vegan')
+            for _ in range(3)
+        ]
+        other = Tag.objects.create(user=self.user, name='Dessert')
+        both = self.recipe(keep, first, other)
+        moved = self.recipe(first, second)
+        Ingredient.objects.create(user=self.user, name='Salt')
+
+        call_command('merge_duplicate_names', stdout=StringIO())
+
+        self.assertEqual(
+            list(Tag.objects.order_by('id')), [keep, other]
+        )
+        self.assertEqual(set(both.tags.all()), {keep, other})
+        self.assertEqual(list(moved.tags.all()), [keep])
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+    def test_dry_run(self):
+        """Test --dry-run counts the duplicates without merging"""
+        for _ in range(2):
+            Tag.objects.create(user=self.user, name='Vegan')
+        out = StringIO()
+
+        call_command('merge_duplicate_names', '--dry-run', stdout=out)
+
+        self.assertIn('1 tags would be merged', out.getvalue())
+        self.assertEqual(Tag.objects.count(), 2)
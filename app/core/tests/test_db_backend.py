@@ -0,0 +1,72 @@
+from unittest import skipUnless
+
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+from core.db.backends.postgresql.base import DatabaseWrapper, close_pools
+
+
+def backend_pid(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Backend needs Postgres')
+class DatabaseBackendTests(TestCase):
+    """Test connection health checks and pooling"""
+
+    def setUp(self):
+        # Cleanups run last to first, so this runs after the wrappers close
+        self.addCleanup(close_pools)
+
+    def wrapper(self, **settings):
+        wrapper = DatabaseWrapper(
+            dict(connection.settings_dict, **settings), connection.alias
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def terminate(self, pid):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+    def test_health_check_reconnects(self):
+        """Test a dropped persistent connection is replaced"""
+        wrapper = self.wrapper(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+        pid = backend_pid(wrapper)
+        self.terminate(pid)
+
+        wrapper.close_if_unusable_or_obsolete()
+
+        self.assertNotEqual(backend_pid(wrapper), pid)
+
+    def test_pool_reuses_connections(self):
+        """Test closing returns the connection to the pool for reuse"""
+        first = self.wrapper(CONN_MAX_AGE=0, POOL_SIZE=2)
+        pid = backend_pid(first)
+        first.close()
+
+        second = self.wrapper(CONN_MAX_AGE=0, POOL_SIZE=2)
+
+        self.assertEqual(backend_pid(second), pid)
+
+    def test_pool_size_limit(self):
+        """Test borrowing past POOL_SIZE times out"""
+        settings = {'CONN_MAX_AGE': 0, 'POOL_SIZE': 1, 'POOL_TIMEOUT': 0.01}
+        backend_pid(self.wrapper(**settings))
+
+        with self.assertRaises(OperationalError):
+            backend_pid(self.wrapper(**settings))
+
+    def test_pool_replaces_dropped_connections(self):
+        """Test a pooled connection the server dropped is not handed out"""
+        settings = {
+            'CONN_MAX_AGE': 0, 'POOL_SIZE': 1, 'CONN_HEALTH_CHECKS': True
+        }
+        first = self.wrapper(**settings)
+        pid = backend_pid(first)
+        first.close()
+        self.terminate(pid)
+
+        self.assertNotEqual(backend_pid(self.wrapper(**settings)), pid)
@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from core import factories
+from core.models import Recipe
+from recipe import cache, search
+
+
+class FactoryTests(TestCase):
+    """Test the bulk factories build complete fixtures"""
+
+    def setUp(self):
+        self.user = factories.user()
+
+    def test_users_share_password(self):
+        """Test bulk users get ids and a usable password"""
+        users = factories.users(3)
+
+        self.assertEqual(len({user.pk for user in users}), 3)
+        self.assertTrue(all(user.check_password('Password1')
+                            for user in users))
+        self.assertEqual(len(factories.tokens(users)), 3)
+
+    def test_recipes_linked_in_turn(self):
+        """Test each recipe gets its own tags and ingredients"""
+        tags = factories.tags(self.user, 4)
+        ingredients = factories.ingredients(self.user, 2)
+
+        recipes = factories.recipes(
+            self.user, 2, tags=tags, ingredients=ingredients, per_recipe=2
+        )
+
+        first, second = (Recipe.objects.get(pk=recipe.pk)
+                         for recipe in recipes)
+        self.assertEqual(list(first.tags.all()), tags[:2])
+        self.assertEqual(list(second.tags.all()), tags[2:])
+        self.assertEqual(first.ingredients.count(), 2)
+
+    def test_recipes_invalidate_caches(self):
+        """Test bulk recipes bump the list versions like saves do"""
+        version = cache.get_version(search.RECIPE_LABEL, self.user.pk)
+
+        factories.recipes(self.user, 2)
+
+        self.assertNotEqual(
+            cache.get_version(search.RECIPE_LABEL, self.user.pk), version
+        )
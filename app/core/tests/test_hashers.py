@@ -0,0 +1,61 @@
+import multiprocessing
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from core import hashers
+from core.testing import BudgetedAPIClient
+
+TOKEN_URL = reverse('user:token')
+
+
+@override_settings(
+    PASSWORD_HASH_ITERATIONS=1000,
+    PASSWORD_HASHERS=['core.hashers.ConfigurablePBKDF2PasswordHasher']
+)
+class ConfigurableHasherTests(TestCase):
+    """Test the configurable PBKDF2 password hasher"""
+
+    def test_iterations_from_settings(self):
+        """Test new hashes use the configured work factor"""
+        user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('Password1'))
+
+    def test_hash_upgraded_on_login(self):
+        """Test logging in rehashes a password with an old work factor"""
+        user = get_user_model().objects.create_user('whafeez21@gmail.com')
+        with override_settings(PASSWORD_HASH_ITERATIONS=500):
+            user.password = make_password('Password1')
+        user.save()
+
+        res = BudgetedAPIClient().post(TOKEN_URL, {
+            'email': 'whafeez21@gmail.com',
+            'password': 'Password1'
+        })
+
+        user.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    def test_offloaded_hash_matches_inline(self):
+        """Test hashing in the process pool gives the same result"""
+        if multiprocessing.current_process().daemon:
+            self.skipTest('Parallel test workers cannot start processes')
+        hasher = hashers.ConfigurablePBKDF2PasswordHasher()
+        try:
+            offloaded = hasher.encode('Password1', 'salt')
+        finally:
+            hashers.shutdown()
+
+        with override_settings(PASSWORD_HASH_WORKERS=0):
+            self.assertEqual(offloaded, hasher.encode('Password1', 'salt'))
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+
+from core import health
+from core.testing import BudgetedAPIClient, count_queries
+
+HEALTHZ_URL = reverse('healthz')
+READYZ_URL = reverse('readyz')
+
+
+def fail():
+    raise ConnectionError('Connection refused')
+
+
+class HealthApiTests(TestCase):
+    """Test the liveness and readiness endpoints"""
+
+    def setUp(self):
+        self.client = BudgetedAPIClient()
+        health.clear()
+        self.addCleanup(health.clear)
+
+    def test_healthz(self):
+        """Test liveness needs no authentication or services"""
+        res = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {'status': 'ok'})
+
+    def test_readyz(self):
+        """Test readiness reports every check"""
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {
+            'status': 'ok',
+            'checks': {'database': 'ok', 'cache': 'ok'},
+        })
+
+    def test_readyz_cached(self):
+        """Test polling again within the TTL runs no queries"""
+        self.client.get(READYZ_URL)
+
+        self.assertEqual(count_queries(self.client.get, READYZ_URL), [])
+
+    def test_readyz_unavailable(self):
+        """Test a failing service makes the endpoint return 503"""
+        with patch.dict(health.CHECKS, cache=fail), \
+                self.assertLogs('core.health', 'WARNING'):
+            res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()['checks'], {
+            'database': 'ok', 'cache': 'unavailable',
+        })
@@ -0,0 +1,135 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core import instrumentation
+from core.middleware import InstrumentationMiddleware
+from core.models import Recipe, Tag
+from core.testing import BudgetedAPIClient
+
+TAGS_URL = reverse('recipe:tag-list')
+METRICS_URL = reverse('metrics')
+
+
+def timings(response):
+    """Return the Server-Timing header as {name: duration}"""
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, duration = entry.split(';')[:2]
+        entries[name] = float(duration[len('dur='):])
+    return entries
+
+
+class SqlShapeTests(TestCase):
+    """Test queries are grouped by shape"""
+
+    def test_literals_replaced(self):
+        """Test queries differing only in literals share a shape"""
+        self.assertEqual(
+            instrumentation.sql_shape(
+                "SELECT * FROM t WHERE id = 12 AND name = 'it''s'"
+            ),
+            instrumentation.sql_shape(
+                "SELECT * FROM t WHERE id = 7 AND name = 'x'"
+            )
+        )
+        self.assertEqual(
+            instrumentation.sql_shape('WHERE id IN (%s, %s, %s)'),
+            'WHERE id IN (...)'
+        )
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationMiddlewareTests(TestCase):
+    """Test the per-request timings, logs and histograms"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Token %s' % Token.objects.create(
+                user=self.user
+            ).key
+        )
+        instrumentation.reset()
+        self.addCleanup(instrumentation.reset)
+
+    def test_server_timing_header(self):
+        """Test responses report query count and phase durations"""
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5, price=2
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        with self.assertLogs('core.instrumentation', 'INFO') as logs:
+            response = self.client.get(
+                reverse('recipe:recipe-detail', args=[recipe.id])
+            )
+
+        entries = timings(response)
+        for name in ('db', 'auth', 'view', 'serialize', 'render', 'total'):
+            self.assertIn(name, entries)
+        self.assertGreaterEqual(entries['total'], entries['db'])
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['route'], 'api/recipe/recipes/<pk>/')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['queries'], 0)
+
+    @override_settings(INSTRUMENTATION_N_PLUS_ONE=5)
+    def test_n_plus_one_logged(self):
+        """Test a query shape repeated past the threshold is reported"""
+        def view(request):
+            for pk in range(8):
+                Tag.objects.filter(pk=pk).exists()
+            return HttpResponse()
+
+        middleware = InstrumentationMiddleware(view)
+        with self.assertLogs('core.instrumentation', 'INFO') as logs:
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertIn('desc="8 queries"', response['Server-Timing'])
+        warnings = [json.loads(record.getMessage()) for record in logs.records
+                    if record.levelname == 'WARNING']
+        self.assertEqual(len(warnings), 1)
+        self.assertEqual(warnings[0]['event'], 'n_plus_one')
+        self.assertEqual(warnings[0]['count'], 8)
+        self.assertEqual(
+            instrumentation.snapshot()['GET <unmatched>']['n_plus_one'], 1
+        )
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is added unless instrumentation is switched on"""
+        response = self.client.get(TAGS_URL)
+
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_metrics_endpoint(self):
+        """Test admins can read the per-route histograms"""
+        for _ in range(3):
+            self.client.get(TAGS_URL)
+
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        admin = BudgetedAPIClient()
+        admin.force_authenticate(self.user)
+        res = admin.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        tags = res.data['GET api/recipe/tags/']
+        self.assertEqual(tags['count'], 3)
+        self.assertEqual(tags['statuses'], {'200': 3})
+        self.assertEqual(tags['buckets_ms']['+Inf'], 3)
+        self.assertGreater(tags['queries'], 0)
@@ -0,0 +1,68 @@
+import gzip
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.middleware import CompressionMiddleware, choose_encoding
+
+BODY = b'{"name": "Salt"}' * 200
+
+
+def compress(response, accept='gzip'):
+    """Run response through the middleware for a request accepting accept"""
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Test Accept-Encoding negotiated response compression"""
+
+    def test_large_response_gzipped(self):
+        """Test bodies over the threshold are compressed"""
+        response = HttpResponse(BODY, content_type='application/json')
+        response['ETag'] = '"abc"'
+
+        response = compress(response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content))
+        )
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @override_settings(COMPRESSION_MIN_SIZE=len(BODY) + 1)
+    def test_small_response_untouched(self):
+        """Test bodies under the threshold are sent as they are"""
+        response = compress(HttpResponse(BODY))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+
+    def test_not_accepted(self):
+        """Test nothing is compressed for clients that refuse gzip"""
+        for accept in ('', 'identity', 'gzip;q=0'):
+            response = compress(HttpResponse(BODY), accept)
+
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response(self):
+        """Test streamed chunks are compressed as one gzip stream"""
+        chunks = [b'{"name": "Salt %d"}\n' % i for i in range(1000)]
+        response = compress(StreamingHttpResponse(iter(chunks)))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(chunks)
+        )
+
+    def test_choose_encoding(self):
+        """Test client quality values win over server preference"""
+        encodings = ['zstd', 'br', 'gzip']
+
+        self.assertEqual(choose_encoding('gzip, br', encodings), 'br')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip', encodings), 'gzip')
+        self.assertEqual(choose_encoding('*', encodings), 'zstd')
+        self.assertIsNone(choose_encoding('deflate', encodings))
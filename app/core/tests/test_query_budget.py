@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Tag
+from core.testing import BudgetedAPIClient, query_budget
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class QueryBudgetTests(TestCase):
+    """Test query budgets fail tests that run too many queries"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+
+    def test_over_budget_reports_shapes(self):
+        """Test exceeding the budget lists the repeated queries first"""
+        with self.assertRaises(AssertionError) as error:
+            with query_budget(2, 'lookups'):
+                Tag.objects.count()
+                for pk in range(3):
+                    Tag.objects.filter(pk=pk).exists()
+
+        message = str(error.exception)
+        self.assertTrue(message.startswith(
+            'lookups ran 4 queries, budget 2:\n   3x SELECT'
+        ))
+
+    def test_decorator(self):
+        """Test a decorated function gets a fresh budget every call"""
+        @query_budget(1)
+        def count():
+            return Tag.objects.count()
+
+        count()
+        count()
+
+    def test_client_budgets(self):
+        """Test the client applies the endpoint's budget"""
+        client = BudgetedAPIClient(budgets={('recipe:tag-list', 'GET'): 0})
+        client.force_authenticate(self.user)
+
+        with self.assertRaisesMessage(AssertionError, 'GET recipe:tag-list'):
+            client.get(TAGS_URL)
+
+        del client.budgets[('recipe:tag-list', 'GET')]
+        with self.assertRaisesMessage(AssertionError, 'No query budget'):
+            client.get(TAGS_URL)
@@ -0,0 +1,70 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import filters
+from recipe.pagination import KeysetPagination
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans need Postgres')
+class ListQueryPlanTests(TestCase):
+    """Test the list queries are served by the (user, name, id) index"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        with connection.cursor() as cursor:
+            # With so few rows the costs are close; a Sort left in the
+            # plan then means no index can produce the order.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+
+    def assertOrderedIndexScan(self, queryset):
+        plan = queryset.explain()
+        self.assertIn('Index', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_list_queries_use_index(self):
+        """Test first and following pages need no sort step"""
+        paginator = KeysetPagination()
+        for model in (Tag, Ingredient):
+            model.objects.bulk_create(
+                model(user=self.user, name='name %03d' % i)
+                for i in range(200)
+            )
+            queryset = model.objects.filter(user=self.user).order_by(
+                *KeysetPagination.ordering
+            )
+            last = queryset[99]
+
+            self.assertOrderedIndexScan(queryset[:101])
+            self.assertOrderedIndexScan(
+                paginator.seek(queryset, paginator.get_position(last))[:101]
+            )
+
+    def test_recipe_filters_use_semi_join(self):
+        """Test tag filters need no sort or de-duplication step"""
+        tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name='tag %d' % i) for i in range(3)
+        )
+        queryset = Recipe.objects.filter(user=self.user).order_by('-id')
+        for match in ('any', 'all'):
+            plan = filters.filter_recipes(
+                queryset, 'tags', [tag.pk for tag in tags], match
+            )[:101].explain()
+            self.assertIn('Index', plan)
+            self.assertNotIn('Sort', plan)
+            self.assertNotIn('Unique', plan)
+
+    def test_assigned_only_uses_semi_join(self):
+        """Test assigned_only keeps the ordered index scan"""
+        queryset = filters.assigned_only(
+            Tag.objects.filter(user=self.user), 'tags'
+        ).order_by(*KeysetPagination.ordering)
+
+        self.assertOrderedIndexScan(queryset[:101])
@@ -0,0 +1,87 @@
+import datetime
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core import fastjson
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONTests(TestCase):
+    """Test the fast JSON renderer and parser match DRF's"""
+
+    data = {
+        'name': 'Crème brûlée\u2028',
+        'price': Decimal('5.50'),
+        'tags': [{'id': 1, 'name': 'Dessert'}],
+        'link': None,
+    }
+
+    def test_render_matches_drf(self):
+        """Test output is byte for byte the same as JSONRenderer"""
+        self.assertEqual(
+            FastJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data)
+        )
+
+    def test_render_without_orjson(self):
+        """Test the stdlib fallback produces the same output"""
+        with mock.patch.object(fastjson, 'orjson', None):
+            self.assertEqual(
+                FastJSONRenderer().render(self.data),
+                JSONRenderer().render(self.data)
+            )
+
+    def assertSameAsDRF(self, data, **attrs):
+        fast, drf = FastJSONRenderer(), JSONRenderer()
+        for renderer in (fast, drf):
+            renderer.__dict__.update(attrs)
+        self.assertEqual(fast.render(data), drf.render(data))
+
+    def test_render_datetimes_match_drf(self):
+        """Test dates and times are written as DRF's encoder writes them"""
+        moment = datetime.datetime(2021, 6, 12, 12, 22, 5, 123456)
+        self.assertSameAsDRF({
+            'utc': moment.replace(tzinfo=timezone.utc),
+            'utc_whole': moment.replace(microsecond=0, tzinfo=timezone.utc),
+            'offset': moment.replace(
+                tzinfo=datetime.timezone(datetime.timedelta(hours=5))
+            ),
+            'naive': moment,
+            'date': moment.date(),
+            'time': moment.time(),
+            'duration': datetime.timedelta(minutes=90),
+        })
+
+    def test_render_floats_match_drf(self):
+        """Test floats are written as repr() writes them"""
+        for value in (0.0, -0.0, 0.1, 5.5, 1e-4, 1e-5, 1.5e-7, 1e-10,
+                      9999999999999998.0, 1e16, 1.5e17, 1e300,
+                      Decimal('1E+20')):
+            with self.subTest(value=value):
+                self.assertSameAsDRF({'value': value, 'link': None})
+
+    def test_render_non_finite_floats_match_drf(self):
+        """Test NaN and infinity are rejected, or written without strict"""
+        for value in (float('nan'), float('inf'), -float('inf')):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render([value])
+                self.assertSameAsDRF([value], strict=False)
+
+    def test_parse(self):
+        """Test bodies are decoded and invalid JSON is rejected"""
+        parser = FastJSONParser()
+
+        self.assertEqual(
+            parser.parse(io.BytesIO('{"name": "Pâte"}'.encode('utf-8'))),
+            {'name': 'Pâte'}
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"name": '))
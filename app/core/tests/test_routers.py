@@ -0,0 +1,117 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import OperationalError, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import routers
+from core.models import Tag
+from core.testing import BudgetedAPIClient
+
+TAGS_URL = reverse('recipe:tag-list')
+EXPORT_URL = reverse('recipe:export')
+
+
+# A mirror of default, see app.settings_test
+HAS_REPLICA = 'replica1' in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, 'Needs the replica1 alias of app.settings_test')
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=60)
+class ReplicaRouterTests(TransactionTestCase):
+    """Test reads are routed to the replica and writes to the primary"""
+    databases = {'default', 'replica1'} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+        caches['default'].clear()
+        routers._down_until.clear()
+
+    def assertQueriesOn(self, alias, func):
+        """Assert func queries the alias and no other database"""
+        other = 'replica1' if alias == 'default' else 'default'
+        with CaptureQueriesContext(connections[alias]) as used, \
+                CaptureQueriesContext(connections[other]) as unused:
+            func()
+        self.assertTrue(used.captured_queries)
+        self.assertEqual(unused.captured_queries, [])
+
+    def test_reads_use_replica(self):
+        """Test reads go to the replica and writes to the primary"""
+        self.assertQueriesOn('replica1', lambda: list(Tag.objects.all()))
+        self.assertQueriesOn(
+            'default', lambda: Tag.objects.create(user=self.user, name='A')
+        )
+
+    def test_primary_block_and_transactions(self):
+        """Test reads stay on the primary when asked to or in atomic()"""
+        def read_in_primary_block():
+            with routers.primary():
+                list(Tag.objects.all())
+
+        def read_in_transaction():
+            with transaction.atomic():
+                list(Tag.objects.all())
+
+        self.assertQueriesOn('default', read_in_primary_block)
+        self.assertQueriesOn('default', read_in_transaction)
+
+    def test_unreachable_replica_falls_back(self):
+        """Test reads go to the primary while the replica is down"""
+        with patch.object(connections['replica1'], 'ensure_connection',
+                          side_effect=OperationalError) as connect, \
+                CaptureQueriesContext(connections['default']) as queries:
+            list(Tag.objects.all())
+            list(Tag.objects.all())
+
+        self.assertEqual(len(queries.captured_queries), 2)
+        # Not retried until REPLICA_RETRY_SECONDS pass
+        self.assertEqual(connect.call_count, 1)
+
+    def test_user_pinned_after_write(self):
+        """Test a user reads from the primary after creating something"""
+        other = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        other_client = BudgetedAPIClient()
+        other_client.force_authenticate(other)
+        self.assertQueriesOn('replica1', lambda: self.client.get(TAGS_URL))
+
+        self.assertQueriesOn(
+            'default', lambda: self.client.post(TAGS_URL, {'name': 'Vegan'})
+        )
+
+        self.assertQueriesOn('default', lambda: self.client.get(TAGS_URL))
+        self.assertQueriesOn('replica1', lambda: other_client.get(TAGS_URL))
+
+    def test_request_choice_does_not_outlive_it(self):
+        """Test reads after a request are routed afresh"""
+        self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertQueriesOn('replica1', lambda: list(Tag.objects.all()))
+
+    def test_pinned_stream_reads_primary(self):
+        """Test a streamed body is read where its request was routed"""
+        self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertQueriesOn('default', lambda: b''.join(
+            self.client.get(EXPORT_URL).streaming_content
+        ))
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        """Test reads return to the replica once the pin expires"""
+        self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertQueriesOn('replica1', lambda: self.client.get(TAGS_URL))
@@ -0,0 +1,54 @@
+import importlib
+import sys
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+
+def load_production_settings():
+    sys.modules.pop('app.settings_production', None)
+    return importlib.import_module('app.settings_production')
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    """Test the production settings module"""
+
+    def tearDown(self):
+        sys.modules.pop('app.settings_production', None)
+
+    def test_debug_off(self):
+        """Test that production settings turn DEBUG off"""
+        with patch.dict('os.environ', {
+            'DJANGO_SECRET_KEY': 'secret',
+            'DJANGO_ALLOWED_HOSTS': 'api.whbx.io,localhost',
+        }):
+            production = load_production_settings()
+
+        self.assertFalse(production.DEBUG)
+        self.assertEqual(production.SECRET_KEY, 'secret')
+        self.assertEqual(production.ALLOWED_HOSTS,
+                         ['api.whbx.io', 'localhost'])
+
+    def test_secret_key_required(self):
+        """Test that production settings refuse to load without a key"""
+        with patch.dict('os.environ', {'DJANGO_SECRET_KEY': ''}):
+            with self.assertRaises(ImproperlyConfigured):
+                load_production_settings()
+
+    def test_memcached(self):
+        """Test MEMCACHED_LOCATION moves every cache to memcached"""
+        with patch.dict('os.environ', {
+            'DJANGO_SECRET_KEY': 'secret',
+            'MEMCACHED_LOCATION': 'cache1:11211,cache2:11211',
+        }):
+            production = load_production_settings()
+
+        self.assertTrue(production.SHARED_CACHES_REQUIRED)
+        for alias, cache in production.CACHES.items():
+            self.assertEqual(cache['BACKEND'], 'django.core.cache.backends.'
+                             'memcached.PyMemcacheCache')
+            self.assertEqual(cache['LOCATION'],
+                             ['cache1:11211', 'cache2:11211'])
+            self.assertEqual(cache['KEY_PREFIX'], alias)
+        self.assertEqual(production.AUTH_TOKEN_CACHE_ALIAS, 'default')
@@ -0,0 +1,30 @@
+from django.http import JsonResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import health, instrumentation
+from core.authentication import CachedTokenAuthentication
+
+
+class MetricsView(APIView):
+    """Report the per-route histograms of this process"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(instrumentation.snapshot())
+
+
+def healthz(request):
+    """Report the process is alive, without touching any service"""
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz(request):
+    """Report whether the database and cache answer"""
+    ready, checks = health.readiness()
+    return JsonResponse(
+        {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503
+    )
@@ -0,0 +1,63 @@
+"""gunicorn settings for the production profile, see app.settings_production
+
+Run with `gunicorn -c gunicorn.conf.py` from this directory. The
+application is imported once in the master process and workers are
+forked from it, so they share its memory pages copy-on-write.
+GUNICORN_APP=app.asgi:application with
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker serves ASGI instead.
+"""
+import gc
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get('GUNICORN_APP', 'app.wsgi:application')
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = True
+
+# Sync workers spend most of a request waiting on the database, hence
+# more workers than cores
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1
+))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# Recycle workers to bound slow memory growth; the jitter keeps them
+# from restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Worker heartbeats are file writes; keep them off the container's
+# overlay filesystem
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    """Finish loading the project before the first worker is forked"""
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from core.db.backends.postgresql.base import close_pools
+
+    # URL modules import every view; load them once here instead of on
+    # the first request of every worker
+    get_resolver().url_patterns
+    # Forked workers must not share the master's sockets, including the
+    # idle ones a DB_POOL_SIZE pool keeps after close_all()
+    connections.close_all()
+    close_pools()
+    # Objects that survive to here live as long as the process. Moving
+    # them out of the collector's reach stops collections in the workers
+    # from touching, and so copying, the shared pages
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,104 @@
+"""In-memory prefix indexes for tag and ingredient name suggestions.
+
+Every user gets a sorted array of their names per model, built on first
+use and kept in a bounded LRU in each process. An index is tagged with
+the collection version from recipe.cache; writes bump that version, so
+a stale index is rebuilt on its next lookup. Versions are read from the
+shared cache on every lookup, so this holds in every worker as long as
+that cache is shared, which core.checks requires in production.
+
+Names shared by enough users are served from one global index per model
+that is refreshed on a TTL. Writes do not invalidate it, so a name can
+be suggested to everyone for up to RECIPE_AUTOCOMPLETE_SHARED_TTL
+seconds after it stops being shared, or join it that much later.
+"""
+import bisect
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.lru import LRUCache
+from recipe import cache
+
+_user_indexes = LRUCache(max_size=settings.RECIPE_AUTOCOMPLETE_USERS)
+_shared_indexes = LRUCache(
+    max_size=16, ttl=settings.RECIPE_AUTOCOMPLETE_SHARED_TTL
+)
+
+
+class PrefixIndex:
+    """Case-insensitive prefix lookups over a fixed list of names"""
+
+    def __init__(self, rows):
+        rows = sorted((name.lower(), name, pk) for name, pk in rows)
+        self.keys = [key for key, _, _ in rows]
+        self.entries = [(name, pk) for _, name, pk in rows]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, prefix, limit):
+        """Return up to limit (name, id) pairs starting with prefix"""
+        prefix = prefix.lower()
+        keys = self.keys
+        index = bisect.bisect_left(keys, prefix)
+        end = min(index + limit, len(keys))
+        results = []
+        while index < end and keys[index].startswith(prefix):
+            results.append(self.entries[index])
+            index += 1
+        return results
+
+
+def user_index(model, user):
+    """Return the user's index of model names, rebuilding it when stale"""
+    label = model._meta.label_lower
+    version = cache.get_version(label, user.pk)
+    cached = _user_indexes.get((label, user.pk))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = PrefixIndex(
+        model.objects.filter(user=user).values_list('name', 'id')
+    )
+    _user_indexes.set((label, user.pk), (version, index))
+    return index
+
+
+def shared_index(model):
+    """Return the index of names used by many users"""
+    label = model._meta.label_lower
+    index = _shared_indexes.get(label)
+    if index is None:
+        names = model.objects.values('name').annotate(
+            users=Count('user')
+        ).filter(
+            users__gte=settings.RECIPE_AUTOCOMPLETE_SHARED_MIN_USERS
+        ).order_by('-users').values_list('name', flat=True)[
+            :settings.RECIPE_AUTOCOMPLETE_SHARED_MAX_NAMES
+        ]
+        index = PrefixIndex((name, None) for name in names)
+        _shared_indexes.set(label, index)
+    return index
+
+
+def suggest(model, user, prefix, limit):
+    """Return the user's matching names, then shared ones they lack"""
+    results = [
+        {'id': pk, 'name': name}
+        for name, pk in user_index(model, user).lookup(prefix, limit)
+    ]
+    if len(results) < limit:
+        # Names differing only in case are the same suggestion. The
+        # user's matches are all in results, so at most that many shared
+        # names are skipped, besides case variants among the shared ones
+        seen = {item['name'].lower() for item in results}
+        for name, _ in shared_index(model).lookup(prefix, limit):
+            if name.lower() not in seen and len(results) < limit:
+                seen.add(name.lower())
+                results.append({'id': None, 'name': name})
+    return results
+
+
+def clear():
+    _user_indexes.clear()
+    _shared_indexes.clear()
@@ -0,0 +1,128 @@
+"""Versioned per-user cache of rendered tag and ingredient lists.
+
+Every user has a version token per model. Cache keys embed the token, so
+bumping it on a write makes all older entries unreachable without having
+to find and delete them; the backend evicts them in its own time.
+
+Tokens live in their own cache alias, RECIPE_LIST_VERSION_CACHE_ALIAS,
+so list payloads never push them out. Every process must see the same
+tokens, so with more than one worker that alias, like the list alias,
+needs a shared backend; see app.settings_production.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def enabled():
+    return settings.RECIPE_LIST_CACHE_ENABLED
+
+
+def _cache():
+    return caches[settings.RECIPE_LIST_CACHE_ALIAS]
+
+
+def _versions():
+    return caches[settings.RECIPE_LIST_VERSION_CACHE_ALIAS]
+
+
+def _version_key(label, user_id):
+    return 'recipe-list:version:%s:%s' % (label, user_id)
+
+
+def _new_version(written_at):
+    # Tokens start with the time of the write that created them
+    return '%d.%s' % (written_at, uuid.uuid4().hex)
+
+
+def version_time(version):
+    """Return the timestamp of the write that created version, or 0"""
+    try:
+        return int(version.split('.', 1)[0])
+    except (AttributeError, ValueError):
+        return 0
+
+
+def get_version(label, user_id):
+    """Return the current version token for a user's collection"""
+    cache = _versions()
+    key = _version_key(label, user_id)
+    version = cache.get(key)
+    if version is None:
+        # An evicted token may have recorded a recent write, so its
+        # replacement counts as a write made now; Last-Modified then never
+        # moves backwards. Another worker may set it first, in which case
+        # theirs wins.
+        cache.add(key, _new_version(time.time()), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(label, user_id):
+    """Invalidate every cached list of a user's collection"""
+    _versions().set(
+        _version_key(label, user_id), _new_version(time.time()), None
+    )
+
+
+def last_modified(label, user_id, newest):
+    """Return the Last-Modified timestamp of a user's collection.
+
+    `newest` is called to fetch the latest updated_at once per version.
+    The result is never earlier than the write that created the version,
+    so deletes move it forward too.
+    """
+    version = get_version(label, user_id)
+    key = 'recipe-list:modified:%s:%s:%s' % (label, user_id, version)
+    timestamp = _cache().get(key)
+    if timestamp is None:
+        updated_at = newest()
+        timestamp = max(
+            int(updated_at.timestamp()) if updated_at else 0,
+            version_time(version)
+        )
+        _cache().set(key, timestamp, settings.RECIPE_LIST_CACHE_TIMEOUT)
+    return timestamp
+
+
+def make_key(label, user_id, path):
+    """Return the cache key for a list request path"""
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    return 'recipe-list:%s:%s:%s:%s' % (
+        label, user_id, get_version(label, user_id), digest
+    )
+
+
+def get(key):
+    """Return cached content for key or None, counting hits and misses"""
+    content = _cache().get(key)
+    with _lock:
+        _counters['hits' if content is not None else 'misses'] += 1
+    return content
+
+
+def set(key, content):
+    """Store rendered content unless it is over the size limit"""
+    if len(content) <= settings.RECIPE_LIST_CACHE_MAX_BYTES:
+        _cache().set(key, content, settings.RECIPE_LIST_CACHE_TIMEOUT)
+
+
+def stats():
+    """Return hit and miss counters for this process"""
+    with _lock:
+        counters = dict(_counters)
+    lookups = counters['hits'] + counters['misses']
+    counters['hit_rate'] = counters['hits'] / lookups if lookups else 0.0
+    return counters
+
+
+def reset_stats():
+    with _lock:
+        _counters.update(hits=0, misses=0)
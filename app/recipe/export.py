@@ -0,0 +1,130 @@
+"""Stream a user's recipe library without loading it into memory.
+
+Rows are read through `.iterator(chunk_size=...)`, which uses a
+server-side cursor where the database supports one. When the connection
+has DISABLE_SERVER_SIDE_CURSORS set, e.g. behind a transaction pooler,
+rows are read in keyset pages of chunk_size instead. The tag and
+ingredient names of each chunk of recipes are fetched in one query per
+relation.
+"""
+from collections import defaultdict
+from itertools import islice
+
+from django.db import connections
+from django.db.models import Q
+
+from core.models import Ingredient, Recipe, Tag
+from core.renderers import encode_csv, encode_ndjson
+
+RECIPE_FIELDS = ('id', 'title', 'time_minutes', 'price', 'link')
+CSV_FIELDS = RECIPE_FIELDS + ('tags', 'ingredients')
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _after(order, values):
+    """Return a filter for rows sorted after values by the order fields"""
+    condition = Q(**{order[-1] + '__gt': values[-1]})
+    for field, value in zip(reversed(order[:-1]), reversed(values[:-1])):
+        condition = Q(**{field + '__gt': value}) | \
+            Q(**{field: value}) & condition
+    return condition
+
+
+def iter_rows(queryset, fields, order, chunk_size):
+    """Yield values_list(*fields) rows of queryset sorted by order.
+
+    The order fields must identify a row, e.g. end with 'id'.
+    """
+    queryset = queryset.order_by(*order)
+    settings_dict = connections[queryset.db].settings_dict
+    if not settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.values_list(*fields).iterator(
+            chunk_size=chunk_size
+        )
+        return
+
+    columns = list(fields) + [field for field in order if field not in fields]
+    positions = [columns.index(field) for field in order]
+    page = queryset
+    while True:
+        rows = list(page.values_list(*columns)[:chunk_size])
+        for row in rows:
+            yield row[:len(fields)]
+        if len(rows) < chunk_size:
+            return
+        page = queryset.filter(
+            _after(order, [rows[-1][position] for position in positions])
+        )
+
+
+def _names(relation, column, recipe_ids):
+    """Return {recipe_id: [name, ...]} for one M2M relation"""
+    names = defaultdict(list)
+    rows = relation.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list('recipe_id', column + '__name').order_by(
+        'recipe_id', column + '__name'
+    )
+    for recipe_id, name in rows:
+        names[recipe_id].append(name)
+    return names
+
+
+def iter_recipes(user, chunk_size):
+    """Yield lists of recipe dicts with tag and ingredient names"""
+    rows = iter_rows(
+        Recipe.objects.filter(user=user), RECIPE_FIELDS, ('id',), chunk_size
+    )
+    for chunk in chunked(rows, chunk_size):
+        ids = [row[0] for row in chunk]
+        tags = _names(Recipe.tags, 'tag', ids)
+        ingredients = _names(Recipe.ingredients, 'ingredient', ids)
+        recipes = []
+        for row in chunk:
+            recipe = dict(zip(RECIPE_FIELDS, row))
+            recipe['price'] = str(recipe['price'])
+            recipe['tags'] = tags.get(recipe['id'], [])
+            recipe['ingredients'] = ingredients.get(recipe['id'], [])
+            recipes.append(recipe)
+        yield recipes
+
+
+def iter_names(model, user, chunk_size):
+    rows = iter_rows(
+        model.objects.filter(user=user), ('name',), ('name', 'id'), chunk_size
+    )
+    return chunked((name for name, in rows), chunk_size)
+
+
+def stream_ndjson(user, chunk_size):
+    """Yield NDJSON text: tags, then ingredients, then recipes"""
+    for kind, model in (('tag', Tag), ('ingredient', Ingredient)):
+        for chunk in iter_names(model, user, chunk_size):
+            yield ''.join(
+                encode_ndjson({'type': kind, 'name': name}) for name in chunk
+            )
+    for chunk in iter_recipes(user, chunk_size):
+        yield ''.join(
+            encode_ndjson(dict(recipe, type='recipe')) for recipe in chunk
+        )
+
+
+def stream_csv(user, chunk_size):
+    """Yield CSV text with one recipe per row"""
+    yield encode_csv(CSV_FIELDS)
+    for chunk in iter_recipes(user, chunk_size):
+        lines = []
+        for recipe in chunk:
+            recipe['tags'] = '|'.join(recipe['tags'])
+            recipe['ingredients'] = '|'.join(recipe['ingredients'])
+            lines.append(encode_csv([recipe[f] for f in CSV_FIELDS]))
+        yield ''.join(lines)
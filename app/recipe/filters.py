@@ -0,0 +1,65 @@
+"""Semi-join filters for recipes and their tags and ingredients.
+
+Filtering through the many-to-many join returns a recipe once per
+matching row, which then needs a DISTINCT sort. Every filter here is an
+EXISTS subquery against the through table instead, so each row of the
+outer query is tested once and the ordering index can still be used to
+stop after a page.
+"""
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+
+RELATIONS = {'tags': 'tag', 'ingredients': 'ingredient'}
+MATCH_MODES = ('any', 'all')
+
+
+MAX_ID = 2 ** 63 - 1
+
+
+def _id(item):
+    # Ids past the bigint range fail in the database instead of matching
+    # nothing
+    pk = int(item)
+    if not 1 <= pk <= MAX_ID:
+        raise ValueError(item)
+    return pk
+
+
+def parse_ids(value, param):
+    """Convert a comma separated string of ids to a list of integers"""
+    try:
+        ids = [_id(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise ValidationError({param: 'Expected comma separated ids.'})
+    return list(dict.fromkeys(ids))
+
+
+def _through(relation):
+    return getattr(Recipe, relation).through.objects
+
+
+def filter_recipes(queryset, relation, ids, match='any'):
+    """Keep recipes linked to any or all of `ids` through `relation`.
+
+    All-match adds one EXISTS per id, so callers bound the number of ids.
+    """
+    column = '%s_id' % RELATIONS[relation]
+    if match == 'any':
+        return queryset.filter(Exists(_through(relation).filter(
+            recipe_id=OuterRef('pk'), **{'%s__in' % column: ids}
+        )))
+    for pk in ids:
+        queryset = queryset.filter(Exists(_through(relation).filter(
+            recipe_id=OuterRef('pk'), **{column: pk}
+        )))
+    return queryset
+
+
+def assigned_only(queryset, relation):
+    """Keep tags or ingredients that are linked to at least one recipe"""
+    column = '%s_id' % RELATIONS[relation]
+    return queryset.filter(Exists(_through(relation).filter(
+        **{column: OuterRef('pk')}
+    )))
@@ -0,0 +1,211 @@
+"""Import recipes from NDJSON in fixed-size batches.
+
+Lines use the format written by the export endpoint: objects with
+`"type": "recipe"` (the default when `type` is missing), `"tag"` or
+`"ingredient"`. Tag and ingredient names are resolved through a per-user
+name to id map that only ever holds the names seen in the input, and every
+batch is committed in its own transaction. A database error stops the
+import; the batches before it stay committed and the report gives the
+first line that was not imported as `stopped_at`.
+"""
+import logging
+import time
+
+from django.db import DatabaseError, connection, transaction
+from rest_framework import serializers
+
+from core import fastjson
+from core.models import Ingredient, Recipe, Tag
+from recipe import cache, search
+from recipe.export import chunked
+
+logger = logging.getLogger(__name__)
+
+MAX_ERRORS = 100
+
+
+class RecipeLineSerializer(serializers.Serializer):
+    """Validate one recipe line of an import"""
+    title = serializers.CharField(max_length=255)
+    time_minutes = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=5, decimal_places=2)
+    link = serializers.CharField(
+        max_length=255, allow_blank=True, required=False, default=''
+    )
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=255), required=False,
+        default=list
+    )
+    ingredients = serializers.ListField(
+        child=serializers.CharField(max_length=255), required=False,
+        default=list
+    )
+
+
+class RecipeImporter:
+    """Import NDJSON lines for one user"""
+
+    def __init__(self, user, batch_size=1000, progress=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.progress = progress
+        self.ids = {Tag: {}, Ingredient: {}}
+        self.stats = {
+            'lines': 0, 'recipes': 0, 'errors': [], 'stopped_at': None,
+        }
+        self.started = None
+        # One instance validates every line; building the fields is the
+        # expensive part of a DRF serializer.
+        self.validator = RecipeLineSerializer()
+        self.name_field = serializers.CharField(max_length=255)
+
+    def run(self, lines):
+        """Import every line and return the stats"""
+        self.started = time.perf_counter()
+        committed = 0
+        try:
+            for batch in chunked(self.parse(lines), self.batch_size):
+                try:
+                    with transaction.atomic():
+                        recipes = self.import_batch(batch)
+                except DatabaseError:
+                    logger.exception(
+                        'Import for user %s stopped', self.user.pk
+                    )
+                    self.stats['stopped_at'] = committed + 1
+                    self.error(
+                        committed + 1, 'A database error stopped the import '
+                        'here; later lines were not imported.'
+                    )
+                    break
+                self.stats['recipes'] += recipes
+                committed = self.stats['lines']
+                if self.progress is not None:
+                    self.progress(self.report())
+        finally:
+            # Rows were written without signals, so drop cached lists
+            for model in (Tag, Ingredient, Recipe):
+                cache.bump_version(model._meta.label_lower, self.user.pk)
+        return self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'lines': self.stats['lines'],
+            'recipes': self.stats['recipes'],
+            'errors': self.stats['errors'],
+            'stopped_at': self.stats['stopped_at'],
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(
+                self.stats['recipes'] / elapsed if elapsed else 0.0, 1
+            ),
+        }
+
+    def parse(self, lines):
+        """Yield validated items, recording errors for bad lines"""
+        for number, line in enumerate(lines, start=1):
+            self.stats['lines'] = number
+            if not line.strip():
+                continue
+            try:
+                item = fastjson.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError('Expected an object.')
+            except ValueError as exc:
+                self.error(number, str(exc))
+                continue
+
+            kind = item.get('type', 'recipe')
+            if kind in ('tag', 'ingredient'):
+                # Strips the name, as the tag and ingredient APIs do
+                try:
+                    name = self.name_field.run_validation(item.get('name'))
+                except serializers.ValidationError as exc:
+                    self.error(number, exc.detail)
+                    continue
+                yield kind, name
+            elif kind == 'recipe':
+                try:
+                    data = self.validator.run_validation(item)
+                except serializers.ValidationError as exc:
+                    self.error(number, exc.detail)
+                    continue
+                yield kind, data
+            else:
+                self.error(number, 'Unknown type %r.' % kind)
+
+    def error(self, number, detail):
+        if len(self.stats['errors']) < MAX_ERRORS:
+            self.stats['errors'].append({'line': number, 'detail': detail})
+
+    def import_batch(self, batch):
+        """Write a batch and return the number of recipes created"""
+        names = {Tag: set(), Ingredient: set()}
+        recipes = []
+        for kind, data in batch:
+            if kind == 'tag':
+                names[Tag].add(data)
+            elif kind == 'ingredient':
+                names[Ingredient].add(data)
+            else:
+                names[Tag].update(data['tags'])
+                names[Ingredient].update(data['ingredients'])
+                recipes.append(data)
+
+        for model, batch_names in names.items():
+            self.resolve(model, batch_names)
+        if not recipes:
+            return 0
+
+        objs = [
+            Recipe(
+                user=self.user,
+                title=data['title'],
+                time_minutes=data['time_minutes'],
+                price=data['price'],
+                link=data['link'],
+            )
+            for data in recipes
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(objs)
+        else:
+            for obj in objs:
+                obj.save(force_insert=True)
+
+        tag_ids, ingredient_ids = self.ids[Tag], self.ids[Ingredient]
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe_id=obj.pk, tag_id=tag_ids[name])
+            for obj, data in zip(objs, recipes)
+            for name in set(data['tags'])
+        )
+        Recipe.ingredients.through.objects.bulk_create(
+            Recipe.ingredients.through(
+                recipe_id=obj.pk, ingredient_id=ingredient_ids[name]
+            )
+            for obj, data in zip(objs, recipes)
+            for name in set(data['ingredients'])
+        )
+        search.update_vectors(
+            Recipe.objects.filter(pk__in=[obj.pk for obj in objs])
+        )
+        return len(objs)
+
+    def resolve(self, model, names):
+        """Make sure every name has an id, creating missing rows"""
+        known = self.ids[model]
+        missing = [name for name in names if name not in known]
+        for chunk in chunked(missing, 500):
+            known.update(model.objects.filter(
+                user=self.user, name__in=chunk
+            ).values_list('name', 'id'))
+            new = [name for name in chunk if name not in known]
+            if not new:
+                continue
+            model.objects.bulk_create(
+                (model(user=self.user, name=name) for name in new),
+                ignore_conflicts=True
+            )
+            known.update(model.objects.filter(
+                user=self.user, name__in=new
+            ).values_list('name', 'id'))
@@ -0,0 +1,79 @@
+import random
+import string
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from core.benchmark import api_client, create_bench_user, format_summary, \
+    rolled_back, summarize, timeit
+from core.models import Ingredient
+from recipe import autocomplete
+
+
+class Command(BaseCommand):
+    """Measure prefix index build time, memory and lookup latency."""
+    help = 'Benchmark ingredient name autocomplete'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated ingredients per user'
+        )
+        parser.add_argument('--repeat', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        url = reverse('recipe:ingredient-autocomplete')
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            names = sorted({
+                ''.join(rng.choice(string.ascii_lowercase)
+                        for _ in range(rng.randint(4, 14)))
+                for _ in range(size)
+            })
+            rows = [(name, pk) for pk, name in enumerate(names)]
+            prefixes = [
+                rng.choice(names)[:rng.randint(1, 4)]
+                for _ in range(options['repeat'])
+            ]
+            self.stdout.write('%d names' % len(names))
+
+            tracemalloc.start()
+            index = autocomplete.PrefixIndex(rows)
+            size_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            self.stdout.write('  memory   %8.2f MB per 10k names' % (
+                size_bytes / len(names) * 10000 / 1024 / 1024
+            ))
+            self.stdout.write(format_summary(
+                '  build', timeit(lambda: autocomplete.PrefixIndex(rows), 5)
+            ))
+
+            queries = iter(prefixes * 2)
+            stats = summarize(timeit(
+                lambda: index.lookup(next(queries), 10), len(prefixes)
+            ))
+            self.stdout.write('  lookup   p50 %6.1fus  p95 %6.1fus' % (
+                stats['p50'] * 1000, stats['p95'] * 1000
+            ))
+
+            with rolled_back():
+                user = create_bench_user()
+                Ingredient.objects.bulk_create(
+                    Ingredient(user=user, name=name) for name in names
+                )
+                autocomplete.clear()
+                self.stdout.write(format_summary(
+                    '  build from database',
+                    timeit(lambda: autocomplete.user_index(Ingredient, user),
+                           1)
+                ))
+                client = api_client(user)
+                queries = iter(prefixes * 2)
+                self.stdout.write(format_summary(
+                    '  api request',
+                    timeit(lambda: client.get(url, {
+                        'prefix': next(queries)
+                    }), min(len(prefixes), 200))
+                ))
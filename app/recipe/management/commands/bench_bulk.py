@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from core.benchmark import api_client, create_bench_user, rolled_back
+
+
+class Command(BaseCommand):
+    """Compare creating ingredients one POST at a time and in bulk."""
+    help = 'Benchmark single POSTs against one bulk call'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        items = options['items']
+        for label, run in (('single POSTs', self.single),
+                           ('bulk call', self.bulk)):
+            with rolled_back():
+                client = api_client(create_bench_user())
+                start = time.perf_counter()
+                run(client, items)
+                elapsed = time.perf_counter() - start
+            self.stdout.write('%-14s %6d items  %8.1fms  %9.0f items/s' % (
+                label, items, elapsed * 1000, items / elapsed
+            ))
+
+    def single(self, client, items):
+        url = reverse('recipe:ingredient-list')
+        for i in range(items):
+            client.post(url, {'name': 'ingredient %05d' % i})
+
+    def bulk(self, client, items):
+        url = reverse('recipe:ingredient-bulk')
+        payload = [{'name': 'ingredient %05d' % i} for i in range(items)]
+        client.post(url, payload, format='json')
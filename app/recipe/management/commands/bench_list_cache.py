@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.benchmark import api_client, create_bench_user, format_summary, \
+    rolled_back, timeit
+from core.models import Ingredient
+from recipe import cache
+
+
+class Command(BaseCommand):
+    """Compare ingredient list latency with the list cache on and off."""
+    help = 'Benchmark the per-user list cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10,1000,10000',
+            help='Comma separated ingredients per user'
+        )
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        url = reverse('recipe:ingredient-list')
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            with rolled_back():
+                user = create_bench_user()
+                Ingredient.objects.bulk_create(
+                    Ingredient(user=user, name='ingredient %07d' % i)
+                    for i in range(size)
+                )
+                client = api_client(user)
+                self.stdout.write('%d ingredients' % size)
+                for enabled in (False, True):
+                    cache.reset_stats()
+                    with override_settings(RECIPE_LIST_CACHE_ENABLED=enabled):
+                        samples = timeit(
+                            lambda: client.get(url), options['repeat']
+                        )
+                    label = '  cache %s' % ('on' if enabled else 'off')
+                    self.stdout.write(format_summary(label, samples))
+                self.stdout.write('  %s' % cache.stats())
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import create_bench_user, format_summary, rolled_back, \
+    timeit
+from core.models import Ingredient
+from recipe.pagination import KeysetPagination
+
+
+class Command(BaseCommand):
+    """Compare offset and keyset paging of a user's ingredient list."""
+    help = 'Benchmark OFFSET against keyset pagination at several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10000,100000,1000000',
+            help='Comma separated rows per user'
+        )
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        for size in sizes:
+            with rolled_back():
+                self.run_size(size, options['page_size'], options['repeat'])
+
+    def run_size(self, size, page_size, repeat):
+        user = create_bench_user()
+        self.seed(user, size)
+        queryset = Ingredient.objects.filter(user=user).order_by(
+            *KeysetPagination.ordering
+        )
+        paginator = KeysetPagination()
+
+        self.stdout.write('%d rows, page size %d' % (size, page_size))
+        for depth in (0.0, 0.5, 0.99):
+            offset = int(size * depth)
+            last = queryset[offset:offset + 1].get() if offset else None
+
+            def offset_page():
+                list(queryset[offset:offset + page_size])
+
+            def keyset_page():
+                page = queryset
+                if last is not None:
+                    page = paginator.seek(
+                        page, paginator.get_position(last)
+                    )
+                list(page[:page_size])
+
+            self.stdout.write(format_summary(
+                '  offset  @ %3d%%' % (depth * 100),
+                timeit(offset_page, repeat)
+            ))
+            self.stdout.write(format_summary(
+                '  keyset  @ %3d%%' % (depth * 100),
+                timeit(keyset_page, repeat)
+            ))
+
+    def seed(self, user, size, batch_size=10000):
+        for start in range(0, size, batch_size):
+            Ingredient.objects.bulk_create(
+                Ingredient(user=user, name='ingredient %07d' % i)
+                for i in range(start, min(start + batch_size, size))
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE core_ingredient')
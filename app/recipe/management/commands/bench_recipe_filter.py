@@ -0,0 +1,87 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import create_bench_user, format_summary, rolled_back, \
+    timeit
+from core.models import Recipe, Tag
+from recipe import filters
+
+
+class Command(BaseCommand):
+    """Time filtered recipe pages as the library grows."""
+    help = 'Benchmark tag filtering of recipes at several library sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated recipes per user'
+        )
+        parser.add_argument('--tags', type=int, default=20)
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        for size in sizes:
+            with rolled_back():
+                self.run_size(size, options)
+
+    def run_size(self, size, options):
+        user = create_bench_user()
+        tags = self.seed(user, size, options)
+        ids = [tags[0].pk, tags[1].pk]
+        queryset = Recipe.objects.filter(user=user).order_by('-id')
+        page_size = options['page_size']
+
+        cases = {
+            'join + distinct': queryset.filter(tags__in=ids).distinct(),
+            'exists any': filters.filter_recipes(queryset, 'tags', ids),
+            'exists all': filters.filter_recipes(
+                queryset, 'tags', ids, 'all'
+            ),
+            'assigned_only tags': filters.assigned_only(
+                Tag.objects.filter(user=user), 'tags'
+            ).order_by('-name', 'id'),
+        }
+        self.stdout.write('%d recipes, %d tags, page size %d' % (
+            size, len(tags), page_size
+        ))
+        for label, case in cases.items():
+            self.stdout.write(format_summary(
+                '  %s' % label,
+                timeit(lambda: list(case[:page_size]), options['repeat'])
+            ))
+
+    def seed(self, user, size, options, batch_size=10000):
+        rng = random.Random(options['seed'])
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name='tag %03d' % i)
+            for i in range(options['tags'])
+        )
+        if tags[0].pk is None:
+            tags = list(Tag.objects.filter(user=user).order_by('name'))
+        per_recipe = min(options['tags_per_recipe'], len(tags))
+        for start in range(0, size, batch_size):
+            count = min(batch_size, size - start)
+            Recipe.objects.bulk_create(
+                Recipe(user=user, title='recipe %07d' % i,
+                       time_minutes=10, price=5)
+                for i in range(start, start + count)
+            )
+            recipe_ids = Recipe.objects.filter(user=user).order_by(
+                '-id'
+            ).values_list('id', flat=True)[:count]
+            Recipe.tags.through.objects.bulk_create(
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.pk)
+                for recipe_id in recipe_ids
+                for tag in rng.sample(tags, per_recipe)
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE core_recipe')
+                cursor.execute('ANALYZE core_recipe_tags')
+        return tags
@@ -0,0 +1,81 @@
+import random
+import string
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from core.benchmark import create_bench_user, format_summary, rolled_back, \
+    summarize, timeit
+from core.models import Recipe
+from recipe import search
+
+
+class Command(BaseCommand):
+    """Time ranked prefix searches over a large recipe library."""
+    help = 'Benchmark recipe search with the postgres and python backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000000)
+        parser.add_argument('--words', type=int, default=20000,
+                            help='Vocabulary size for generated titles')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--backends', default='postgres,python',
+            help='Comma separated backends to time'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = sorted({
+            ''.join(rng.choice(string.ascii_lowercase)
+                    for _ in range(rng.randint(4, 9)))
+            for _ in range(options['words'])
+        })
+        with rolled_back():
+            user = create_bench_user()
+            self.seed(user, options['size'], vocabulary, rng)
+            prefixes = [
+                word[:rng.randint(3, 5)]
+                for word in rng.sample(vocabulary, options['repeat'])
+            ]
+            for name in options['backends'].split(','):
+                if name == 'postgres' and connection.vendor != 'postgresql':
+                    self.stdout.write('  %s: needs PostgreSQL' % name)
+                    continue
+                self.run_backend(name, user, prefixes, options['page_size'])
+
+    def run_backend(self, name, user, prefixes, page_size):
+        with override_settings(RECIPE_SEARCH_BACKEND=name):
+            if name == 'python':
+                build = timeit(lambda: search.get_index(user), 1)
+                self.stdout.write('  python index built in %.0fms' % (
+                    build[0] * 1000
+                ))
+            queries = iter(prefixes * 2)
+
+            def query():
+                results = search.search(user, next(queries))
+                list(results[:page_size])
+
+            samples = timeit(query, len(prefixes))
+        self.stdout.write(format_summary('  %s prefix' % name, samples))
+        if summarize(samples)['p95'] > 50:
+            self.stdout.write(self.style.WARNING(
+                '  %s p95 is above 50ms' % name
+            ))
+
+    def seed(self, user, size, vocabulary, rng, batch_size=10000):
+        self.stdout.write('Seeding %d recipes...' % size)
+        for start in range(0, size, batch_size):
+            Recipe.objects.bulk_create(
+                Recipe(user=user, title=' '.join(rng.sample(vocabulary, 3)),
+                       time_minutes=10, price=5)
+                for _ in range(min(batch_size, size - start))
+            )
+        search.update_vectors(Recipe.objects.filter(user=user))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE core_recipe')
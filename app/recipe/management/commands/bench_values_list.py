@@ -0,0 +1,57 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from core.benchmark import create_bench_user, rolled_back, timeit
+from core.models import Ingredient
+from core.renderers import FastJSONRenderer
+from recipe.serializers import IngredientSerializer
+from recipe.views import BaseRecipeAttrViewSet
+
+
+class Command(BaseCommand):
+    """Compare per-item cost of serializer and values() list payloads."""
+    help = 'Benchmark the values() fast path of the ingredient list'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated ingredients per user'
+        )
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        renderer = FastJSONRenderer()
+        fields = BaseRecipeAttrViewSet.values_fields
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            with rolled_back():
+                user = create_bench_user()
+                Ingredient.objects.bulk_create(
+                    Ingredient(user=user, name='ingredient %07d' % i)
+                    for i in range(size)
+                )
+                queryset = Ingredient.objects.filter(user=user).order_by(
+                    '-name', 'id'
+                )
+
+                def serializer():
+                    data = IngredientSerializer(queryset.all(), many=True)
+                    return renderer.render(data.data)
+
+                def values():
+                    return renderer.render(list(
+                        queryset.values(*fields)
+                    ))
+
+                assert serializer() == values()
+                self.stdout.write('%d ingredients' % size)
+                for label, func in (('serializer', serializer),
+                                    ('values', values)):
+                    seconds = statistics.median(
+                        timeit(func, options['repeat'])
+                    )
+                    self.stdout.write(
+                        '  %-10s %9.2fms total %7.2fus per item' % (
+                            label, seconds * 1000, seconds / size * 1e6
+                        )
+                    )
@@ -0,0 +1,142 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import DataError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Seek (keyset) pagination over an ordering ending in a unique field.
+
+    Pagination is opt-in: a list is only paged when the client sends
+    `page_size` or `cursor`, so existing clients keep the plain list.
+    """
+    ordering = ('-name', 'id')
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of objects seeking past the cursor position"""
+        params = request.query_params
+        if not (self.page_size_query_param in params or
+                self.cursor_query_param in params):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = params.get(self.cursor_query_param)
+        try:
+            if encoded:
+                queryset = self.seek(queryset, self.clean_position(
+                    queryset.model, self.decode_cursor(encoded)
+                ))
+            rows = list(queryset[:self.page_size + 1])
+        except (ValueError, TypeError, DataError):
+            # Values the database refuses to compare with the column
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def clean_position(self, model, position):
+        """Check the cursor holds one value of each ordering field's type"""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        for field, value in zip(self.ordering, position):
+            field = model._meta.get_field(field.lstrip('-'))
+            try:
+                valid = value is not None and field.to_python(value) == value
+            except (ValidationError, TypeError, ValueError):
+                valid = False
+            if not valid:
+                raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def seek(self, queryset, position):
+        """Filter the queryset to rows strictly after `position`"""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        seek = Q()
+        for index, field in enumerate(self.ordering):
+            term = Q(**{self._lookup(field, strict=True): position[index]})
+            for prev, value in zip(self.ordering[:index], position[:index]):
+                term &= Q(**{prev.lstrip('-'): value})
+            seek |= term
+
+        # Bounding the leading column gives the planner an index range
+        # to scan instead of evaluating the OR over every row.
+        leading = Q(**{self._lookup(self.ordering[0]): position[0]})
+        return queryset.filter(leading & seek)
+
+    def get_position(self, row):
+        """Return the ordering values of a model instance or values() dict"""
+        if isinstance(row, dict):
+            return [row[field.lstrip('-')] for field in self.ordering]
+        return [getattr(row, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            position = json.loads(raw.decode('utf-8'))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def _lookup(self, field, strict=False):
+        name = field.lstrip('-')
+        op = 'lt' if field.startswith('-') else 'gt'
+        return '%s__%s%s' % (name, op, '' if strict else 'e')
+
+
+class SearchPagination(PageNumberPagination):
+    """Numbered pages of ranked search results"""
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
@@ -0,0 +1,176 @@
+"""Ranked prefix search over recipe titles, tags and ingredients.
+
+On PostgreSQL every recipe keeps a weighted `search_vector` (title A, tag
+names B, ingredient names C) covered by a GIN index. The signals in
+recipe.signals rewrite it whenever a title, a link or a linked name
+changes. Other databases use an in-process inverted index per user that
+is rebuilt when the user's recipe version changes.
+
+Both backends use the 'simple' text configuration: words are lowercased
+but not stemmed, so a query term matches every word it is a prefix of and
+all query terms must match.
+"""
+import bisect
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+    SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.lru import LRUCache
+from core.models import Recipe
+from recipe import cache
+
+CONFIG = 'simple'
+MAX_TERMS = 8
+# PostgreSQL's default weights for A, B and C
+WEIGHTS = (1.0, 0.4, 0.2)
+RECIPE_LABEL = Recipe._meta.label_lower
+
+_word = re.compile(r'\w+')
+_indexes = LRUCache(max_size=settings.RECIPE_SEARCH_INDEX_SIZE)
+
+
+def terms(text):
+    """Split a query into lowercase words"""
+    return _word.findall(text.lower())[:MAX_TERMS]
+
+
+def backend():
+    name = settings.RECIPE_SEARCH_BACKEND
+    if name == 'auto':
+        return 'postgres' if connection.vendor == 'postgresql' else 'python'
+    return name
+
+
+def search(user, text):
+    """Return the ids of the user's matching recipes, best match first"""
+    words = terms(text)
+    if not words:
+        return []
+    if backend() == 'postgres':
+        return _postgres_search(user, words)
+    return get_index(user).search(words)
+
+
+def _postgres_search(user, words):
+    query = SearchQuery(
+        ' & '.join('%s:*' % word for word in words),
+        search_type='raw', config=CONFIG
+    )
+    return Recipe.objects.filter(
+        user=user, search_vector=query
+    ).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', '-id').values_list('id', flat=True)
+
+
+def _names(relation, field):
+    through = getattr(Recipe, relation).through
+    names = through.objects.filter(
+        recipe_id=OuterRef('pk')
+    ).values('recipe_id').annotate(
+        names=StringAgg('%s__name' % field, ' ')
+    ).values('names')
+    return Coalesce(Subquery(names), Value(''))
+
+
+def vector():
+    """Return the expression computing a recipe's search vector"""
+    return (
+        SearchVector('title', weight='A', config=CONFIG) +
+        SearchVector(_names('tags', 'tag'), weight='B', config=CONFIG) +
+        SearchVector(
+            _names('ingredients', 'ingredient'), weight='C', config=CONFIG
+        )
+    )
+
+
+def vectors_enabled():
+    """Return whether the database maintains search vectors"""
+    return connection.vendor == 'postgresql'
+
+
+def update_vectors(queryset):
+    """Recompute the search vector of every recipe in queryset"""
+    if vectors_enabled():
+        queryset.update(search_vector=vector())
+
+
+def _link_names(relation, field, user):
+    names = defaultdict(list)
+    rows = getattr(Recipe, relation).through.objects.filter(
+        recipe__user=user
+    ).values_list('recipe_id', '%s__name' % field)
+    for recipe_id, name in rows:
+        names[recipe_id].append(name)
+    return names
+
+
+def get_index(user):
+    """Return the user's inverted index, rebuilding it when stale"""
+    version = cache.get_version(RECIPE_LABEL, user.pk)
+    cached = _indexes.get(user.pk)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    tags = _link_names('tags', 'tag', user)
+    ingredients = _link_names('ingredients', 'ingredient', user)
+    index = InvertedIndex(
+        (pk, title, tags.get(pk, ()), ingredients.get(pk, ()))
+        for pk, title in Recipe.objects.filter(
+            user=user
+        ).values_list('id', 'title')
+    )
+    _indexes.set(user.pk, (version, index))
+    return index
+
+
+class InvertedIndex:
+    """Word to recipe postings for one user, searchable by prefix"""
+
+    def __init__(self, rows):
+        postings = defaultdict(dict)
+        for pk, title, tags, ingredients in rows:
+            fields = (title, ' '.join(tags), ' '.join(ingredients))
+            for weight, text in zip(WEIGHTS, fields):
+                for word in _word.findall(text.lower()):
+                    scores = postings[word]
+                    scores[pk] = scores.get(pk, 0.0) + weight
+        self.postings = dict(postings)
+        self.words = sorted(postings)
+
+    def __len__(self):
+        return len(self.words)
+
+    def match(self, prefix):
+        """Return {recipe id: score} for words starting with prefix"""
+        scores = {}
+        words = self.words
+        index = bisect.bisect_left(words, prefix)
+        while index < len(words) and words[index].startswith(prefix):
+            for pk, weight in self.postings[words[index]].items():
+                scores[pk] = scores.get(pk, 0.0) + weight
+            index += 1
+        return scores
+
+    def search(self, words):
+        """Return ids matching every prefix, highest score first"""
+        scores = None
+        for word in words:
+            matched = self.match(word)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {
+                    pk: score + matched[pk]
+                    for pk, score in scores.items() if pk in matched
+                }
+            if not scores:
+                return []
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
@@ -1,20 +1,201 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from core.models import Tag, Ingredient
+from rest_framework.relations import MANY_RELATION_KWARGS
+from core.instrumentation import TimedListSerializer, TimedSerializerMixin
+from core.models import Tag, Ingredient, Recipe
+from recipe import signals
 
 
-class TagSerializer(serializers.ModelSerializer):
+class UniqueNameMixin:
+    """Reject names the requesting user already has.
+
+    Bulk writes resolve duplicates themselves and switch the per-item
+    query off with the `skip_unique_check` context flag.
+    """
+    duplicate_message = 'You already have an entry with this name.'
+
+    def save(self, **kwargs):
+        # A concurrent request can insert the name after validate_name
+        # looked; the unique constraint then decides
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'name': [self.duplicate_message]}
+            )
+
+    def validate_name(self, value):
+        if self.context.get('skip_unique_check'):
+            return value
+        user = self.context['request'].user
+        existing = self.Meta.model.objects.filter(user=user, name=value)
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError(self.duplicate_message)
+        return value
+
+
+class TagSerializer(TimedSerializerMixin, UniqueNameMixin,
+                    serializers.ModelSerializer):
     """Serializer for Tag object"""
 
     class Meta:
         model = Tag
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = TimedListSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, UniqueNameMixin,
+                           serializers.ModelSerializer):
     """Serializer for Ingredient"""
 
     class Meta:
         model = Ingredient
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = TimedListSerializer
+
+
+class PrimaryKeyListField(serializers.ManyRelatedField):
+    """Look up a list of primary keys with one query instead of one each"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = []
+        for item in data:
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(queryset.model._meta.pk.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+        found = queryset.in_bulk(pks)
+        for pk, item in zip(pks, data):
+            if pk not in found:
+                child.fail('does_not_exist', pk_value=item)
+        return [found[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField using PrimaryKeyListField for many=True"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PrimaryKeyListField(**list_kwargs)
+
+
+class RecipeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for creating and updating recipes"""
+    tags = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Tag.objects.all()
+    )
+    ingredients = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Ingredient.objects.all()
+    )
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id', 'title', 'tags', 'ingredients', 'time_minutes', 'price',
+            'link',
+        )
+        read_only_fields = ('id',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            # Only allow linking the requesting user's own tags/ingredients
+            for name in ('tags', 'ingredients'):
+                relation = self.fields[name].child_relation
+                relation.queryset = relation.queryset.filter(
+                    user=request.user
+                )
+
+    def create(self, validated_data):
+        links = self.pop_links(validated_data)
+        with transaction.atomic(savepoint=False):
+            recipe = super().create(validated_data)
+            self.write_links(recipe, links, created=True)
+        return recipe
+
+    def update(self, instance, validated_data):
+        links = self.pop_links(validated_data)
+        with transaction.atomic(savepoint=False):
+            recipe = super().update(instance, validated_data)
+            self.write_links(recipe, links)
+        return recipe
+
+    def pop_links(self, validated_data):
+        return {
+            name: validated_data.pop(name)
+            for name in ('tags', 'ingredients') if name in validated_data
+        }
+
+    def write_links(self, recipe, links, created=False):
+        """Replace the recipe's links with one query per change.
+
+        RelatedManager.set() runs up to four queries per relation, and
+        its m2m_changed receivers touch the recipe after each; the
+        receivers' work is done once here instead.
+        """
+        changed = []
+        for name, objs in links.items():
+            field = Recipe._meta.get_field(name)
+            through = field.remote_field.through
+            column = '%s_id' % field.m2m_reverse_field_name()
+            rows = through.objects.filter(recipe_id=recipe.pk)
+            wanted = {obj.pk for obj in objs}
+            current = set() if created else set(
+                rows.values_list(column, flat=True)
+            )
+            if current - wanted:
+                rows.filter(**{'%s__in' % column: current - wanted}).delete()
+            if wanted - current:
+                through.objects.bulk_create(
+                    through(recipe_id=recipe.pk, **{column: pk})
+                    for pk in wanted - current
+                )
+            if wanted != current:
+                changed.append(field.related_model)
+        if changed:
+            signals.links_written(recipe, changed)
+
+
+class RecipeListSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """Serializer for listing recipes with nested tags and ingredients"""
+    tags = TagSerializer(many=True, read_only=True)
+    ingredients = IngredientSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id', 'title', 'tags', 'ingredients', 'time_minutes', 'price',
+        )
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+
+class RecipeDetailSerializer(RecipeListSerializer):
+    """Serializer for a single recipe"""
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + ('link',)
+        read_only_fields = fields
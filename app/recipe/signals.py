@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, \
+    post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import cache, search
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_list_cache(sender, instance, **kwargs):
+    """Drop cached lists when a tag or ingredient changes"""
+    cache.bump_version(sender._meta.label_lower, instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_assigned_lists(sender, instance, action, model, **kwargs):
+    """Drop cached lists when links change what `assigned_only` returns"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # `instance` is the tag or ingredient for reverse changes
+        linked = model if isinstance(instance, Recipe) else type(instance)
+        cache.bump_version(linked._meta.label_lower, instance.user_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_on_recipe_delete(sender, instance, **kwargs):
+    """Links are removed without signals when a recipe is deleted"""
+    for model in (Tag, Ingredient):
+        cache.bump_version(model._meta.label_lower, instance.user_id)
+
+
+def _touch(recipes):
+    """Mark recipes modified and recompute their search vectors"""
+    fields = {'updated_at': timezone.now()}
+    if search.vectors_enabled():
+        fields['search_vector'] = search.vector()
+    recipes.update(**fields)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search(sender, instance, raw=False, **kwargs):
+    """Recompute the search vector of a saved recipe"""
+    if not raw:
+        search.update_vectors(Recipe.objects.filter(pk=instance.pk))
+    cache.bump_version(search.RECIPE_LABEL, instance.user_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_search_index(sender, instance, **kwargs):
+    cache.bump_version(search.RECIPE_LABEL, instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_linked_search(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Touch the recipes whose links changed"""
+    if reverse and action == 'pre_clear':
+        # The recipes cannot be found once the links are gone
+        instance._search_recipe_ids = list(
+            instance.recipe_set.values_list('id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recipe_ids = [instance.pk]
+    elif action == 'post_clear':
+        recipe_ids = instance.__dict__.pop('_search_recipe_ids', [])
+    else:
+        recipe_ids = pk_set
+    _touch(Recipe.objects.filter(pk__in=recipe_ids))
+    cache.bump_version(search.RECIPE_LABEL, instance.user_id)
+
+
+def links_written(recipe, models):
+    """Do the m2m_changed receivers' work for links written in bulk"""
+    for model in models:
+        cache.bump_version(model._meta.label_lower, recipe.user_id)
+    _touch(Recipe.objects.filter(pk=recipe.pk))
+    cache.bump_version(search.RECIPE_LABEL, recipe.user_id)
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_linked_recipes(sender, instance, **kwargs):
+    """Links are removed without signals, so note them before deleting"""
+    instance._search_recipe_ids = list(
+        instance.recipe_set.values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def update_renamed_search(sender, instance, created=False, **kwargs):
+    """Touch the recipes linked to a renamed or deleted name"""
+    if created or kwargs.get('raw'):
+        return
+    cache.bump_version(search.RECIPE_LABEL, instance.user_id)
+    if '_search_recipe_ids' in instance.__dict__:
+        recipes = Recipe.objects.filter(
+            pk__in=instance.__dict__.pop('_search_recipe_ids')
+        )
+    else:
+        recipes = instance.recipe_set.all()
+    _touch(recipes)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reset_user_lists(sender, instance, created, **kwargs):
+    """Start new users with fresh versions in case an id is reused"""
+    if created:
+        for model in (Tag, Ingredient, Recipe):
+            cache.bump_version(model._meta.label_lower, instance.pk)
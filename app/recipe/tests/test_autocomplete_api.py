@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient
+from recipe import autocomplete, cache
+
+INGREDIENT_AUTOCOMPLETE_URL = reverse('recipe:ingredient-autocomplete')
+TAG_AUTOCOMPLETE_URL = reverse('recipe:tag-autocomplete')
+
+
+class AutocompleteApiTests(TestCase):
+    """Test name suggestions for tags and ingredients"""
+
+    def setUp(self):
+        autocomplete.clear()
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def suggest(self, url, prefix, **params):
+        res = self.client.get(url, dict(params, prefix=prefix))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_prefix_case_insensitive(self):
+        """Test names are matched ignoring case and sorted"""
+        for name in ('Chilli', 'cheddar', 'Salt', 'Chives'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+        data = self.suggest(INGREDIENT_AUTOCOMPLETE_URL, 'CH')
+
+        self.assertEqual(
+            [item['name'] for item in data], ['cheddar', 'Chilli', 'Chives']
+        )
+        self.assertTrue(all(item['id'] for item in data))
+
+    def test_limit(self):
+        """Test at most limit names are returned"""
+        for i in range(5):
+            Tag.objects.create(user=self.user, name='Tag %d' % i)
+
+        data = self.suggest(TAG_AUTOCOMPLETE_URL, 'tag', limit=2)
+
+        self.assertEqual([item['name'] for item in data], ['Tag 0', 'Tag 1'])
+
+    def test_repeat_lookup_runs_no_queries(self):
+        """Test lookups are served from memory until a write"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.suggest(TAG_AUTOCOMPLETE_URL, 've')
+
+        with self.assertNumQueries(0):
+            data = self.suggest(TAG_AUTOCOMPLETE_URL, 'veg')
+        self.assertEqual([item['name'] for item in data], ['Vegan'])
+
+        self.client.post(reverse('recipe:tag-list'), {'name': 'Vegetarian'})
+        data = self.suggest(TAG_AUTOCOMPLETE_URL, 'veg')
+        self.assertEqual(
+            [item['name'] for item in data], ['Vegan', 'Vegetarian']
+        )
+
+    def test_write_in_another_worker(self):
+        """Test a version bumped in the shared cache rebuilds the index"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.suggest(TAG_AUTOCOMPLETE_URL, 've')
+
+        # Another worker's write: new rows, then a bump of the shared token
+        Tag.objects.bulk_create([Tag(user=self.user, name='Vegetarian')])
+        cache.bump_version(Tag._meta.label_lower, self.user.pk)
+
+        data = self.suggest(TAG_AUTOCOMPLETE_URL, 'veg')
+        self.assertEqual(
+            [item['name'] for item in data], ['Vegan', 'Vegetarian']
+        )
+
+    @override_settings(RECIPE_AUTOCOMPLETE_SHARED_MIN_USERS=2)
+    def test_shared_names(self):
+        """Test names used by enough other users are suggested"""
+        Ingredient.objects.create(user=self.user, name='Basil')
+        for i in range(2):
+            user = get_user_model().objects.create_user(
+                'user%d@whbx.io' % i, 'Password1'
+            )
+            for name in ('Basil', 'Bay leaf'):
+                Ingredient.objects.create(user=user, name=name)
+        Ingredient.objects.create(user=user, name='Bacon')
+
+        data = self.suggest(INGREDIENT_AUTOCOMPLETE_URL, 'ba')
+
+        self.assertEqual(data, [
+            {'id': Ingredient.objects.get(user=self.user).id,
+             'name': 'Basil'},
+            {'id': None, 'name': 'Bay leaf'},
+        ])
+
+    def test_shared_names_case_insensitive(self):
+        """Test shared names the user has in another case are skipped"""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        for i in range(3):
+            user = get_user_model().objects.create_user(
+                'user%d@whbx.io' % i, 'Password1'
+            )
+            Ingredient.objects.create(user=user, name='salt')
+
+        data = self.suggest(INGREDIENT_AUTOCOMPLETE_URL, 'sa')
+
+        self.assertEqual(data, [{'id': salt.id, 'name': 'Salt'}])
+
+    def test_prefix_required(self):
+        """Test a missing prefix is rejected"""
+        res = self.client.get(TAG_AUTOCOMPLETE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PrefixIndexTests(TestCase):
+    """Test the sorted array prefix index"""
+
+    def test_lookup_bounds(self):
+        """Test lookups stop at the end of the matching range"""
+        index = autocomplete.PrefixIndex(
+            [('b', 1), ('ab', 2), ('abc', 3), ('a', 4)]
+        )
+
+        self.assertEqual(index.lookup('ab', 10), [('ab', 2), ('abc', 3)])
+        self.assertEqual(index.lookup('c', 10), [])
+        self.assertEqual(index.lookup('', 2), [('a', 4), ('ab', 2)])
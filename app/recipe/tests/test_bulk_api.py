@@ -0,0 +1,154 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient
+
+INGREDIENT_BULK_URL = reverse('recipe:ingredient-bulk')
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+TAGS_BULK_URL = reverse('recipe:tag-bulk')
+
+
+class BulkCreateApiTests(TestCase):
+    """Test creating tags and ingredients in bulk"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_json(self):
+        """Test creating ingredients from a JSON array"""
+        payload = [{'name': 'Salt'}, {'name': 'Pepper'}]
+
+        res = self.client.post(INGREDIENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(item['name'], item['status']) for item in res.data],
+            [('Salt', 'created'), ('Pepper', 'created')]
+        )
+        self.assertEqual(
+            Ingredient.objects.get(name='Salt').id, res.data[0]['id']
+        )
+
+    def test_bulk_create_ndjson(self):
+        """Test creating tags from an NDJSON body"""
+        body = '\n'.join(json.dumps({'name': name})
+                         for name in ('Vegan', 'Dessert', 'Quick'))
+
+        res = self.client.post(
+            TAGS_BULK_URL, body, content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 3)
+
+    def test_bulk_invalid_item(self):
+        """Test nothing is created when one item is invalid"""
+        payload = [{'name': 'Salt'}, {'name': ''}]
+
+        res = self.client.post(INGREDIENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_bulk_conflict_rejected(self):
+        """Test duplicates are rejected by default"""
+        Ingredient.objects.create(user=self.user, name='Salt')
+        payload = [{'name': 'Salt'}, {'name': 'Pepper'}]
+
+        res = self.client.post(INGREDIENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['duplicates'], ['Salt'])
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+    def test_bulk_conflict_raced(self):
+        """Test a name inserted after the duplicate check is rejected"""
+        bulk_create = Ingredient.objects.bulk_create
+
+        def race(objs, **kwargs):
+            Ingredient.objects.create(user=self.user, name='Salt')
+            return bulk_create(objs, **kwargs)
+        payload = [{'name': 'Salt'}, {'name': 'Pepper'}]
+        # The racing insert is counted with the request
+        self.client.budgets['recipe:ingredient-bulk', 'POST'] += 1
+
+        with patch.object(Ingredient.objects, 'bulk_create', race):
+            res = self.client.post(
+                INGREDIENT_BULK_URL, payload, format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(
+            Ingredient.objects.filter(name='Pepper').exists()
+        )
+
+    def test_bulk_ignore_duplicates(self):
+        """Test ignore mode skips existing and repeated names"""
+        Ingredient.objects.create(user=self.user, name='Salt')
+        payload = [{'name': 'Salt'}, {'name': 'Pepper'}, {'name': 'Pepper'}]
+
+        res = self.client.post(
+            INGREDIENT_BULK_URL + '?on_conflict=ignore',
+            payload,
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item['status'] for item in res.data],
+            ['ignored', 'created', 'ignored']
+        )
+        self.assertEqual(Ingredient.objects.count(), 2)
+
+    def test_bulk_merge_duplicates(self):
+        """Test merge mode returns the existing row for known names"""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        payload = [{'name': 'Salt'}]
+
+        res = self.client.post(
+            INGREDIENT_BULK_URL + '?on_conflict=merge',
+            payload,
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, [{'id': salt.id, 'name': 'Salt', 'status': 'merged'}]
+        )
+
+    def test_bulk_names_are_per_user(self):
+        """Test another user's names do not count as duplicates"""
+        user2 = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        Ingredient.objects.create(user=user2, name='Salt')
+
+        res = self.client.post(
+            INGREDIENT_BULK_URL, [{'name': 'Salt'}], format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_invalidates_list_cache(self):
+        """Test the cached list shows rows created in bulk"""
+        self.client.get(INGREDIENT_URL)
+        self.client.post(
+            INGREDIENT_BULK_URL, [{'name': 'Salt'}], format='json'
+        )
+
+        res = self.client.get(INGREDIENT_URL)
+
+        self.assertEqual([item['name'] for item in res.json()], ['Salt'])
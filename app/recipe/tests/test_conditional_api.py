@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+
+from core.models import Recipe, Tag
+from core.testing import BudgetedAPIClient
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL"""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class ConditionalGetApiTests(TestCase):
+    """Test ETag and Last-Modified handling of the recipe API"""
+
+    def setUp(self):
+        caches[settings.RECIPE_LIST_CACHE_ALIAS].clear()
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Curry', time_minutes=10, price=5.00
+        )
+
+    def assertNotModified(self, url, max_queries=1, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, **headers)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertLessEqual(len(queries), max_queries)
+        self.assertEqual(res.content, b'')
+
+    def test_list_not_modified_costs_one_query(self):
+        """Test a matching If-None-Match returns 304 cheaply"""
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', res)
+
+        self.assertNotModified(TAGS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertNotModified(
+            TAGS_URL, HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+
+    def test_compressed_list_not_modified(self):
+        """Test the weak ETag of a compressed list still matches"""
+        Tag.objects.bulk_create(
+            Tag(user=self.user, name='Tag %03d' % i) for i in range(100)
+        )
+        res = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertTrue(res['ETag'].startswith('W/'))
+
+        self.assertNotModified(
+            TAGS_URL, HTTP_IF_NONE_MATCH=res['ETag'],
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+    def test_list_etag_changes_on_create(self):
+        """Test creating a tag through the API changes the ETag"""
+        etag = self.client.get(TAGS_URL)['ETag']
+        self.client.post(TAGS_URL, {'name': 'Quick'})
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+    def test_list_etag_varies_with_query(self):
+        """Test different query strings get different ETags"""
+        first = self.client.get(RECIPES_URL)['ETag']
+        second = self.client.get(RECIPES_URL, {'page_size': 1})['ETag']
+
+        self.assertNotEqual(first, second)
+
+    def test_detail_not_modified(self):
+        """Test a recipe detail 304 runs a single query"""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        with self.assertNumQueries(1):
+            self.assertNotModified(
+                detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=res['ETag']
+            )
+
+    def test_detail_changes_with_links_and_names(self):
+        """Test linking and renaming tags invalidates the recipe ETag"""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.recipe.tags.add(self.tag)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.tag.name = 'Plant based'
+        self.tag.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['tags'][0]['name'], 'Plant based')
+
+    def test_update_changes_list_etag(self):
+        """Test a serializer update changes the recipe list ETag"""
+        etag = self.client.get(RECIPES_URL)['ETag']
+        self.client.patch(detail_url(self.recipe.id), {'title': 'Dal'})
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['title'], 'Dal')
+
+    def test_lost_version_does_not_move_last_modified_back(self):
+        """Test a delete stays visible after its version token is lost"""
+        past = timezone.now() - timedelta(days=1)
+        Tag.objects.update(updated_at=past)
+        seen = http_date(past.timestamp())
+        Tag.objects.create(user=self.user, name='Quick').delete()
+        caches[settings.RECIPE_LIST_VERSION_CACHE_ALIAS].clear()
+
+        res = self.client.get(TAGS_URL, HTTP_IF_MODIFIED_SINCE=seen)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_missing_recipe(self):
+        """Test conditional handling keeps 404s for unknown recipes"""
+        res = self.client.get(detail_url(self.recipe.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
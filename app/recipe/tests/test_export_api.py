@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import tracemalloc
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase, override_settings, tag
+from django.utils import timezone
+
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from core.testing import BudgetedAPIClient
+
+EXPORT_URL = reverse('recipe:export')
+
+
+class RecipeExportApiTests(TestCase):
+    """Test streaming export of a user's recipe library"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def sample_library(self):
+        recipe = Recipe.objects.create(
+            user=self.user, title='Curry', time_minutes=30, price=5.00
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Spicy'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Chilli'),
+            Ingredient.objects.create(user=self.user, name='Rice')
+        )
+        return recipe
+
+    def test_login_required(self):
+        """Test that authentication is required"""
+        res = BudgetedAPIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson(self):
+        """Test exporting tags, ingredients and recipes as NDJSON"""
+        recipe = self.sample_library()
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in
+                 b''.join(res.streaming_content).decode().splitlines()]
+        self.assertEqual([line['type'] for line in lines],
+                         ['tag', 'ingredient', 'ingredient', 'recipe'])
+        self.assertEqual(lines[-1], {
+            'type': 'recipe',
+            'id': recipe.id,
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': '5.00',
+            'link': '',
+            'tags': ['Spicy'],
+            'ingredients': ['Chilli', 'Rice'],
+        })
+
+    def test_export_csv(self):
+        """Test exporting recipes as CSV"""
+        self.sample_library()
+
+        res = self.client.get(EXPORT_URL, {'format': 'csv'})
+
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(
+            io.StringIO(b''.join(res.streaming_content).decode())
+        ))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['ingredients'], 'Chilli|Rice')
+
+    def test_export_limited_to_user(self):
+        """Test other users' recipes are not exported"""
+        user2 = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        Recipe.objects.create(
+            user=user2, title='Toast', time_minutes=2, price=1.00
+        )
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(b''.join(res.streaming_content), b'')
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_without_server_side_cursors(self):
+        """Test exporting in keyset pages when cursors are disabled"""
+        for name in ('Beans', 'Apple', 'Egg', 'Carrot', 'Dill'):
+            Ingredient.objects.create(user=self.user, name=name)
+        for i in range(5):
+            Recipe.objects.create(
+                user=self.user, title='Recipe %d' % i, time_minutes=5,
+                price=1.00
+            )
+        # Every chunk of two rows takes its own queries
+        self.client.budgets[('recipe:export', 'GET')] = 13
+        expected = b''.join(self.client.get(EXPORT_URL).streaming_content)
+
+        with patch.dict(connection.settings_dict,
+                        {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            res = self.client.get(EXPORT_URL)
+            body = b''.join(res.streaming_content)
+
+        self.assertEqual(body, expected)
+        names = [json.loads(line)['name'] for line in body.splitlines()
+                 if json.loads(line)['type'] == 'ingredient']
+        self.assertEqual(names, ['Apple', 'Beans', 'Carrot', 'Dill', 'Egg'])
+
+    @tag('slow')
+    def test_export_memory_bounded(self):
+        """Test exporting 200k recipes keeps peak memory bounded"""
+        count = 200000
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO core_recipe '
+                '(user_id, title, time_minutes, price, link, updated_at) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                ((self.user.id, 'Recipe %d' % i, 5, '5.00', '', now)
+                 for i in range(count))
+            )
+        # Tags and ingredients of each chunk of recipes are one query each
+        self.client.budgets[('recipe:export', 'GET')] = \
+            3 + 2 * count // settings.RECIPE_EXPORT_CHUNK_SIZE
+
+        res = self.client.get(EXPORT_URL)
+        tracemalloc.start()
+        try:
+            lines = sum(chunk.count(b'\n') for chunk in res.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, count)
+        self.assertLess(peak, 16 * 1024 * 1024)
@@ -0,0 +1,170 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from core.testing import BudgetedAPIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+
+
+def sample_recipe(user, title, tags=(), ingredients=()):
+    """Create and return a recipe linked to tags and ingredients"""
+    recipe = Recipe.objects.create(
+        user=user, title=title, time_minutes=10, price=5.00
+    )
+    recipe.tags.add(*tags)
+    recipe.ingredients.add(*ingredients)
+    return recipe
+
+
+class RecipeFilterApiTests(TestCase):
+    """Test filtering recipes by tags and ingredients"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.quick = Tag.objects.create(user=self.user, name='Quick')
+        self.tofu = Ingredient.objects.create(user=self.user, name='Tofu')
+        self.curry = sample_recipe(
+            self.user, 'Curry', tags=[self.vegan, self.quick],
+            ingredients=[self.tofu]
+        )
+        self.salad = sample_recipe(self.user, 'Salad', tags=[self.vegan])
+        self.steak = sample_recipe(self.user, 'Steak', tags=[self.quick])
+        sample_recipe(self.user, 'Toast')
+
+    def titles(self, params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['title'] for recipe in res.data]
+
+    def test_filter_tags_any(self):
+        """Test recipes with any of the tags are returned once each"""
+        titles = self.titles({
+            'tags': '%d,%d' % (self.vegan.id, self.quick.id)
+        })
+
+        self.assertEqual(titles, ['Steak', 'Salad', 'Curry'])
+
+    def test_filter_tags_all(self):
+        """Test match=all only returns recipes with every tag"""
+        titles = self.titles({
+            'tags': '%d,%d' % (self.vegan.id, self.quick.id),
+            'match': 'all',
+        })
+
+        self.assertEqual(titles, ['Curry'])
+
+    def test_filter_tags_and_ingredients(self):
+        """Test tag and ingredient filters must both match"""
+        titles = self.titles({
+            'tags': str(self.vegan.id),
+            'ingredients': str(self.tofu.id),
+        })
+
+        self.assertEqual(titles, ['Curry'])
+
+    def test_filter_other_users_tag(self):
+        """Test filtering by another user's tag matches nothing"""
+        user2 = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        tag = Tag.objects.create(user=user2, name='Vegan')
+        sample_recipe(user2, 'Stew', tags=[tag])
+
+        self.assertEqual(self.titles({'tags': str(tag.id)}), [])
+
+    def test_filter_invalid_params(self):
+        """Test malformed ids and unknown match modes are rejected"""
+        res = self.client.get(RECIPES_URL, {'tags': 'vegan'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(RECIPES_URL, {'tags': '1', 'match': 'some'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_ids_out_of_range(self):
+        """Test ids outside the bigint range are rejected, not queried"""
+        for ids in ('99999999999999999999', '0', '-1', '1,%d' % 2 ** 63):
+            res = self.client.get(RECIPES_URL, {'tags': ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('tags', res.data)
+
+        res = self.client.get(RECIPES_URL, {'tags': str(2 ** 63 - 1)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(RECIPE_FILTER_MAX_ALL_IDS=2)
+    def test_filter_all_ids_capped(self):
+        """Test match=all accepts a bounded number of ids"""
+        ids = ','.join(
+            str(pk) for pk in (self.vegan.id, self.quick.id, 999999)
+        )
+
+        res = self.client.get(RECIPES_URL, {'tags': ids, 'match': 'all'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', res.data)
+
+        self.assertEqual(
+            self.titles({'tags': ids}), ['Steak', 'Salad', 'Curry']
+        )
+
+    def test_filtered_pages(self):
+        """Test filters combine with keyset pagination"""
+        res = self.client.get(RECIPES_URL, {
+            'tags': '%d,%d' % (self.vegan.id, self.quick.id),
+            'page_size': 2,
+        })
+        titles = [recipe['title'] for recipe in res.data['results']]
+        res = self.client.get(res.data['next'])
+        titles += [recipe['title'] for recipe in res.data['results']]
+
+        self.assertEqual(titles, ['Steak', 'Salad', 'Curry'])
+
+
+class AssignedOnlyApiTests(TestCase):
+    """Test limiting tags and ingredients to those used by recipes"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_assigned_tags_unique(self):
+        """Test a tag used by several recipes is listed once"""
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Unused')
+        sample_recipe(self.user, 'Curry', tags=[vegan])
+        sample_recipe(self.user, 'Salad', tags=[vegan])
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(res.data, [{'id': vegan.id, 'name': 'Vegan'}])
+
+    def test_assigned_ingredients_follow_links(self):
+        """Test linking and unlinking a recipe updates the cached list"""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        recipe = sample_recipe(self.user, 'Chips')
+        self.assertEqual(
+            self.client.get(INGREDIENT_URL, {'assigned_only': 1}).data, []
+        )
+
+        recipe.ingredients.add(salt)
+        res = self.client.get(INGREDIENT_URL, {'assigned_only': 1})
+        self.assertEqual(res.data, [{'id': salt.id, 'name': 'Salt'}])
+
+        salt.recipe_set.clear()
+        res = self.client.get(INGREDIENT_URL, {'assigned_only': 1})
+        self.assertEqual(res.data, [])
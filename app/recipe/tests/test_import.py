@@ -0,0 +1,201 @@
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from core.testing import BudgetedAPIClient
+from recipe.importer import RecipeImporter
+
+IMPORT_URL = reverse('recipe:import')
+
+
+def fail_batch(number):
+    """Return an import_batch that raises a database error on batch number"""
+    batches = []
+    real = RecipeImporter.import_batch
+
+    def import_batch(importer, batch):
+        batches.append(batch)
+        if len(batches) == number:
+            raise DatabaseError('server closed the connection')
+        return real(importer, batch)
+    return import_batch
+
+
+def recipe_line(title, tags=(), ingredients=()):
+    return json.dumps({
+        'title': title,
+        'time_minutes': 10,
+        'price': '4.50',
+        'tags': list(tags),
+        'ingredients': list(ingredients),
+    })
+
+
+class RecipeImporterTests(TestCase):
+    """Test the batched NDJSON recipe importer"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+
+    def test_import_in_batches(self):
+        """Test recipes and their names are imported across batches"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        lines = [
+            json.dumps({'type': 'ingredient', 'name': 'Unused'}),
+            recipe_line('Salad', ['Vegan'], ['Lettuce', 'Oil']),
+            recipe_line('Soup', ['Vegan', 'Hot'], ['Oil']),
+            recipe_line('Stew', ['Hot'], ['Beef']),
+        ]
+        reports = []
+
+        stats = RecipeImporter(
+            self.user, batch_size=2, progress=reports.append
+        ).run(lines)
+
+        self.assertEqual(stats['recipes'], 3)
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', flat=True)),
+            {'Unused', 'Lettuce', 'Oil', 'Beef'}
+        )
+        soup = Recipe.objects.get(title='Soup')
+        self.assertEqual(
+            sorted(soup.tags.values_list('name', flat=True)), ['Hot', 'Vegan']
+        )
+
+    def test_invalid_lines_reported(self):
+        """Test bad lines are skipped and reported with line numbers"""
+        lines = [
+            'not json',
+            json.dumps({'title': 'No time'}),
+            recipe_line('Toast'),
+        ]
+
+        stats = RecipeImporter(self.user).run(lines)
+
+        self.assertEqual(stats['recipes'], 1)
+        self.assertEqual(
+            [error['line'] for error in stats['errors']], [1, 2]
+        )
+
+    def test_names_stripped(self):
+        """Test tag and ingredient names are stripped, as in the API"""
+        lines = [
+            json.dumps({'type': 'tag', 'name': '  Vegan '}),
+            json.dumps({'type': 'ingredient', 'name': '   '}),
+            recipe_line('Salad', [' Vegan'], ['Oil ']),
+        ]
+
+        stats = RecipeImporter(self.user).run(lines)
+
+        self.assertEqual(
+            list(Tag.objects.values_list('name', flat=True)), ['Vegan']
+        )
+        self.assertEqual(
+            list(Ingredient.objects.values_list('name', flat=True)), ['Oil']
+        )
+        self.assertEqual([error['line'] for error in stats['errors']], [2])
+
+    def test_database_error_stops_import(self):
+        """Test committed batches are reported when a later one fails"""
+        lines = [recipe_line('Recipe %d' % i) for i in range(5)]
+
+        with patch.object(RecipeImporter, 'import_batch', fail_batch(2)), \
+                self.assertLogs('recipe.importer', 'ERROR'):
+            stats = RecipeImporter(self.user, batch_size=2).run(lines)
+
+        self.assertEqual(stats['recipes'], 2)
+        self.assertEqual(stats['stopped_at'], 3)
+        self.assertEqual(stats['errors'][-1]['line'], 3)
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('title', flat=True)),
+            ['Recipe 0', 'Recipe 1']
+        )
+
+    def test_import_command_database_error(self):
+        """Test the command fails after reporting what was imported"""
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson') as f:
+            f.write(recipe_line('Pancakes') + '\n')
+            f.flush()
+            with patch.object(RecipeImporter, 'import_batch',
+                              fail_batch(1)), \
+                    self.assertLogs('recipe.importer', 'ERROR'), \
+                    self.assertRaisesMessage(CommandError, 'at line 1 '):
+                call_command('import_recipes', f.name, email=self.user.email,
+                             stdout=StringIO(), stderr=StringIO())
+
+    def test_import_command(self):
+        """Test importing a file with the management command"""
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson') as f:
+            f.write(recipe_line('Pancakes', ingredients=['Flour']) + '\n')
+            f.flush()
+            out = StringIO()
+            call_command(
+                'import_recipes', f.name, email=self.user.email, stdout=out
+            )
+
+        self.assertIn('Imported 1 recipes', out.getvalue())
+        self.assertTrue(Recipe.objects.filter(title='Pancakes').exists())
+
+
+class RecipeImportApiTests(TestCase):
+    """Test the NDJSON import endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_import_ndjson(self):
+        """Test posting an NDJSON body imports the recipes"""
+        body = '\n'.join(recipe_line('Recipe %d' % i, ['Quick'])
+                         for i in range(5))
+
+        res = self.client.post(
+            IMPORT_URL, body, content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['recipes'], 5)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+
+    def test_import_partially_committed(self):
+        """Test a failed batch after committed ones returns 207"""
+        body = '\n'.join(recipe_line('Recipe %d' % i) for i in range(3))
+
+        with self.settings(RECIPE_IMPORT_BATCH_SIZE=2), \
+                patch.object(RecipeImporter, 'import_batch', fail_batch(2)), \
+                self.assertLogs('recipe.importer', 'ERROR'):
+            res = self.client.post(
+                IMPORT_URL, body, content_type='application/x-ndjson'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(res.data['recipes'], 2)
+        self.assertEqual(res.data['stopped_at'], 3)
+
+    def test_import_requires_ndjson(self):
+        """Test other content types are rejected"""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(
+            res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
@@ -3,9 +3,9 @@ from django.urls import reverse
 from django.test import TestCase
 
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from core.models import Ingredient
+from core.testing import BudgetedAPIClient
 
 from recipe.serializers import IngredientSerializer
 
@@ -15,7 +15,7 @@ INGREDIENT_URL = reverse('recipe:ingredient-list')
 class PublicIngredientApiTests(TestCase):
     """Test the publically available ingredients API"""
     def setUp(self):
-        self.client = APIClient()
+        self.client = BudgetedAPIClient()
 
     def test_login_required(self):
         """Test that login is required to access this endpoint"""
@@ -27,7 +27,7 @@ class PublicIngredientApiTests(TestCase):
 class PrivateIngredientApiTests(TestCase):
     """Test authentication is required to access ingredients"""
     def setUp(self):
-        self.client = APIClient()
+        self.client = BudgetedAPIClient()
         self.user = get_user_model().objects.create_user(
             "whafeez21@gmail.com",
             "Password1"
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient
+from recipe import cache
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+
+
+class ListCacheTests(TestCase):
+    """Test the per-user cache of tag and ingredient lists"""
+
+    def setUp(self):
+        caches[settings.RECIPE_LIST_CACHE_ALIAS].clear()
+        cache.reset_stats()
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_second_request_served_from_cache(self):
+        """Test a repeated list request runs no queries"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        first = self.client.get(TAGS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(TAGS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_create_invalidates(self):
+        """Test creating a tag through the API drops the cached list"""
+        self.client.get(TAGS_URL)
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.json(), [
+            {'id': Tag.objects.get().id, 'name': 'Dessert'}
+        ])
+
+    def test_delete_invalidates(self):
+        """Test deleting an ingredient drops the cached list"""
+        Ingredient.objects.create(user=self.user, name='Salt')
+        self.client.get(INGREDIENT_URL)
+        Ingredient.objects.all().delete()
+
+        res = self.client.get(INGREDIENT_URL)
+
+        self.assertEqual(res.json(), [])
+
+    def test_cache_is_per_user(self):
+        """Test users never see each other's cached lists"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.client.get(TAGS_URL)
+        user2 = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        self.client.force_authenticate(user2)
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.json(), [])
+
+    def test_query_string_is_part_of_key(self):
+        """Test paginated and plain lists are cached separately"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.client.get(TAGS_URL)
+
+        res = self.client.get(TAGS_URL, {'page_size': 1})
+
+        self.assertIn('results', res.json())
+
+    @override_settings(RECIPE_LIST_CACHE_ENABLED=False)
+    def test_cache_disabled(self):
+        """Test lists hit the database when the cache is disabled"""
+        self.client.get(TAGS_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(TAGS_URL)
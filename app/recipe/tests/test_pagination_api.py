@@ -0,0 +1,104 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient
+
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class KeysetPaginationApiTests(TestCase):
+    """Test cursor pagination of the tag and ingredient lists"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, page_size):
+        """Follow next links from the first page and return all names"""
+        names = []
+        res = self.client.get(url, {'page_size': page_size})
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            names.extend(item['name'] for item in res.data['results'])
+            if not res.data['next']:
+                return names
+            res = self.client.get(res.data['next'])
+
+    def test_list_not_paginated_by_default(self):
+        """Test plain list is returned when no page params are sent"""
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+
+    def test_walk_all_pages(self):
+        """Test following the cursor returns every row once in order"""
+        names = ['Item %02d' % i for i in range(25)]
+        Ingredient.objects.bulk_create(
+            Ingredient(user=self.user, name=name) for name in names
+        )
+
+        self.assertEqual(
+            self.walk(INGREDIENT_URL, 7),
+            sorted(names, reverse=True)
+        )
+
+    def test_page_boundary_on_shared_prefix(self):
+        """Test names sharing a prefix are split across pages correctly"""
+        for name in ('Salt', 'Salt flakes', 'Salt rock', 'Saltpeter'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+        self.assertEqual(
+            self.walk(INGREDIENT_URL, 1),
+            ['Saltpeter', 'Salt rock', 'Salt flakes', 'Salt']
+        )
+
+    def test_cursor_stable_under_inserts(self):
+        """Test rows inserted before the cursor do not shift later pages"""
+        for name in ('E', 'D', 'C', 'B', 'A'):
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {'page_size': 2})
+        self.assertEqual(
+            [item['name'] for item in res.data['results']], ['E', 'D']
+        )
+        Tag.objects.create(user=self.user, name='F')
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(
+            [item['name'] for item in res.data['results']], ['C', 'B']
+        )
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        res = self.client.get(TAGS_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Test cursors with wrong types or lengths are rejected"""
+        for position in (['a', 'zz'], ['a', None], ['a'], ['a', 1, 2],
+                         [['a'], 1], ['a', 1.5]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(position).encode()
+            ).decode()
+
+            res = self.client.get(TAGS_URL, {'cursor': cursor})
+
+            self.assertEqual(
+                res.status_code, status.HTTP_404_NOT_FOUND, position
+            )
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+
+from core import factories
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient, count_queries, report
+from recipe import autocomplete
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class QueryScalingTests(TestCase):
+    """Test list endpoints run as many queries for 10x the data"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+        self.created = 0
+
+    def add_recipes(self, count):
+        """Add recipes, each with two new tags and ingredients"""
+        start, self.created = self.created, self.created + count
+        factories.recipes(
+            self.user, count, 'Curry %d', start,
+            tags=factories.tags(self.user, 2 * count, start=2 * start),
+            ingredients=factories.ingredients(
+                self.user, 2 * count, start=2 * start
+            ),
+            per_recipe=2, price=1.00
+        )
+
+    def fetch(self, path):
+        # Nothing served from the list cache or autocomplete indexes
+        caches[settings.RECIPE_LIST_CACHE_ALIAS].clear()
+        autocomplete.clear()
+        res = self.client.get(path)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        if res.streaming:
+            b''.join(res.streaming_content)
+
+    def assertConstantQueries(self, path):
+        """Assert path runs as many queries at 1x and 10x the data"""
+        self.add_recipes(2)
+        small = count_queries(self.fetch, path)
+        self.add_recipes(18)
+        large = count_queries(self.fetch, path)
+
+        self.assertEqual(len(small), len(large), '%s\n1x:\n%s\n10x:\n%s' % (
+            path, report(small), report(large)
+        ))
+
+    def test_tag_list(self):
+        self.assertConstantQueries(reverse('recipe:tag-list'))
+        self.assertConstantQueries(
+            reverse('recipe:tag-list') + '?assigned_only=1'
+        )
+
+    def test_ingredient_list(self):
+        self.assertConstantQueries(reverse('recipe:ingredient-list'))
+        self.assertConstantQueries(
+            reverse('recipe:ingredient-list') + '?assigned_only=1'
+        )
+
+    def test_tag_autocomplete(self):
+        # Fewer matches than the limit, so shared names are looked up too
+        self.assertConstantQueries(
+            reverse('recipe:tag-autocomplete') + '?prefix=tag&limit=50'
+        )
+
+    def test_ingredient_autocomplete(self):
+        self.assertConstantQueries(
+            reverse('recipe:ingredient-autocomplete') + '?prefix=in&limit=50'
+        )
+
+    def test_recipe_list(self):
+        self.assertConstantQueries(RECIPES_URL)
+
+    def test_recipe_filter(self):
+        self.add_recipes(1)
+        tag = Tag.objects.get(name='Tag 0')
+        ingredient = Ingredient.objects.get(name='Ingredient 0')
+
+        self.assertConstantQueries('%s?tags=%d&ingredients=%d&match=any' % (
+            RECIPES_URL, tag.id, ingredient.id
+        ))
+
+    def test_recipe_search(self):
+        self.assertConstantQueries(reverse('recipe:recipe-search') + '?q=cur')
+
+    def test_export(self):
+        self.assertConstantQueries(reverse('recipe:export'))
+
+    def test_create_recipe_with_many_tags(self):
+        """Test linking 10x the tags and ingredients costs no queries"""
+        def create(count):
+            self.add_recipes(count)
+            payload = {
+                'title': 'Stew', 'time_minutes': 5, 'price': '1.00',
+                'tags': list(Tag.objects.values_list('id', flat=True)),
+                'ingredients': list(
+                    Ingredient.objects.values_list('id', flat=True)
+                ),
+            }
+            return count_queries(self.client.post, RECIPES_URL, payload)
+
+        small = create(1)
+        large = create(9)
+
+        self.assertEqual(len(small), len(large), report(large))
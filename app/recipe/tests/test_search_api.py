@@ -0,0 +1,137 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from core.testing import BudgetedAPIClient
+from recipe.search import InvertedIndex
+
+SEARCH_URL = reverse('recipe:recipe-search')
+
+
+def sample_recipe(user, title, tags=(), ingredients=()):
+    """Create and return a recipe linked to tags and ingredients"""
+    recipe = Recipe.objects.create(
+        user=user, title=title, time_minutes=10, price=5.00
+    )
+    recipe.tags.add(*tags)
+    recipe.ingredients.add(*ingredients)
+    return recipe
+
+
+class RecipeSearchApiTests(TestCase):
+    """Test ranked recipe search with the configured backend"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+        self.curry = Tag.objects.create(user=self.user, name='Curry')
+        self.chicken = Ingredient.objects.create(
+            user=self.user, name='Chicken thighs'
+        )
+
+    def titles(self, query, **params):
+        res = self.client.get(SEARCH_URL, dict(params, q=query))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['title'] for recipe in res.data['results']]
+
+    def test_title_matches_rank_first(self):
+        """Test title matches outrank tag and ingredient matches"""
+        sample_recipe(self.user, 'Chicken curry')
+        sample_recipe(self.user, 'Rice', tags=[self.curry])
+        sample_recipe(self.user, 'Toast')
+
+        self.assertEqual(self.titles('curry'), ['Chicken curry', 'Rice'])
+
+    def test_prefix_terms_all_required(self):
+        """Test every word matches as a prefix of some recipe word"""
+        sample_recipe(self.user, 'Green curry', ingredients=[self.chicken])
+        sample_recipe(self.user, 'Green salad')
+
+        self.assertEqual(self.titles('gre chick'), ['Green curry'])
+        self.assertEqual(self.titles('gre'), ['Green salad', 'Green curry'])
+
+    def test_recipe_deleted_during_search(self):
+        """Test ids of recipes deleted after the lookup are skipped"""
+        toast = sample_recipe(self.user, 'Toast')
+        gone = sample_recipe(self.user, 'Toasted bagel')
+        ids = [gone.id, toast.id]
+        gone.delete()
+
+        with patch('recipe.search.search', return_value=ids):
+            self.assertEqual(self.titles('toast'), ['Toast'])
+
+    def test_search_follows_link_and_name_changes(self):
+        """Test results change when links and linked names change"""
+        recipe = sample_recipe(self.user, 'Stew')
+        self.assertEqual(self.titles('curry'), [])
+
+        recipe.tags.add(self.curry)
+        self.assertEqual(self.titles('curry'), ['Stew'])
+
+        self.curry.name = 'Spicy'
+        self.curry.save()
+        self.assertEqual(self.titles('curry'), [])
+        self.assertEqual(self.titles('spicy'), ['Stew'])
+
+        self.curry.delete()
+        self.assertEqual(self.titles('spicy'), [])
+
+    def test_search_paginated(self):
+        """Test results are returned in numbered pages"""
+        for i in range(5):
+            sample_recipe(self.user, 'Soup %d' % i)
+
+        res = self.client.get(SEARCH_URL, {'q': 'soup', 'page_size': 2})
+
+        self.assertEqual(res.data['count'], 5)
+        self.assertEqual(
+            [recipe['title'] for recipe in res.data['results']],
+            ['Soup 4', 'Soup 3']
+        )
+        self.assertIsNotNone(res.data['next'])
+
+    def test_search_limited_to_user(self):
+        """Test other users' recipes are not returned"""
+        user2 = get_user_model().objects.create_user(
+            'test@whbx.io',
+            'Password1'
+        )
+        sample_recipe(user2, 'Curry')
+
+        self.assertEqual(self.titles('curry'), [])
+
+    def test_query_required(self):
+        """Test a query without words is rejected"""
+        res = self.client.get(SEARCH_URL, {'q': ' - '})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(RECIPE_SEARCH_BACKEND='python')
+class PythonRecipeSearchApiTests(RecipeSearchApiTests):
+    """Test ranked recipe search with the in-process index"""
+
+
+class InvertedIndexTests(TestCase):
+    """Test the in-process search index"""
+
+    def test_weights_and_prefixes(self):
+        """Test scores add up across fields and prefixes"""
+        index = InvertedIndex([
+            (1, 'Lamb stew', ['Winter'], ['Lamb']),
+            (2, 'Stew', [], ['Lamb']),
+            (3, 'Lasagne', [], []),
+        ])
+
+        self.assertEqual(index.search(['la']), [1, 3, 2])
+        self.assertEqual(index.search(['lamb', 'st']), [1, 2])
+        self.assertEqual(index.search(['lamb', 'pie']), [])
@@ -1,13 +1,15 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import TestCase
 
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from core.models import Tag
+from core.testing import BudgetedAPIClient
 
-from recipe.serializers import TagSerializer
+from recipe.serializers import TagSerializer, UniqueNameMixin
 
 TAGS_URL = reverse('recipe:tag-list')
 
@@ -20,7 +22,7 @@ class PublicTagApiTests(TestCase):
             'whafeez21@gmail.com',
             'Password1'
         )
-        self.client = APIClient()
+        self.client = BudgetedAPIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
@@ -67,3 +69,25 @@ class PublicTagApiTests(TestCase):
         res = self.client.post(TAGS_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_tag_duplicate_name(self):
+        """Test a user cannot create two tags with the same name"""
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_create_tag_duplicate_race(self):
+        """Test a duplicate inserted after validation is still a 400"""
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        # As if the other request committed between check and insert
+        with patch.object(UniqueNameMixin, 'validate_name',
+                          lambda self, value: value):
+            res = self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['name'], [UniqueNameMixin.duplicate_message])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
@@ -0,0 +1,59 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from core.models import Ingredient, Tag
+from core.testing import BudgetedAPIClient
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+
+ALPHABET = 'aZ09 _-\'"\\/<>&é漢字 \t🍅'
+
+
+def random_name(rng):
+    """Return a random non-blank name mixing awkward characters"""
+    length = rng.randint(1, 40)
+    name = ''.join(rng.choice(ALPHABET) for _ in range(length))
+    return name if name.strip() else 'x' + name
+
+
+@override_settings(RECIPE_LIST_CACHE_ENABLED=False)
+class ValuesListEquivalenceTests(TestCase):
+    """Test the values() list path matches the serializer byte for byte"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'whafeez21@gmail.com',
+            'Password1'
+        )
+        self.client = BudgetedAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_both(self, url, params):
+        with override_settings(RECIPE_VALUES_LIST=False):
+            expected = self.client.get(url, params)
+        with override_settings(RECIPE_VALUES_LIST=True):
+            actual = self.client.get(url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+    def test_random_lists_identical(self):
+        """Test random names, page sizes and cursors give equal output"""
+        rng = random.Random(15)
+        for trial in range(20):
+            model = rng.choice((Tag, Ingredient))
+            url = TAGS_URL if model is Tag else INGREDIENT_URL
+            names = {random_name(rng) for _ in range(rng.randint(0, 30))}
+            model.objects.filter(user=self.user).delete()
+            model.objects.bulk_create(
+                model(user=self.user, name=name) for name in names
+            )
+
+            self.get_both(url, {})
+            res = self.get_both(url, {'page_size': rng.randint(1, 10)})
+            while res.data['next']:
+                res = self.get_both(res.data['next'], {})
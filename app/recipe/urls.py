@@ -6,9 +6,12 @@ from recipe import views
 router = DefaultRouter()
 router.register('tags', views.TagViewSet)
 router.register('ingredient', views.IngredientViewSet)
+router.register('recipes', views.RecipeViewSet)
 
 app_name = 'recipe'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('export/', views.RecipeExportView.as_view(), name='export'),
+    path('import/', views.RecipeImportView.as_view(), name='import'),
+    path('', include(router.urls)),
 ]
@@ -1,34 +1,392 @@
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType, \
+    ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import conditional
+from core.authentication import CachedTokenAuthentication
+from core.models import Tag, Ingredient, Recipe
+from core.parsers import FastJSONParser, NDJSONParser
+from core.renderers import CSVRenderer, NDJSONRenderer
+from core.routers import ReplicaRoutingMixin
+from recipe import autocomplete, cache, export, filters, search, \
+    serializers
+from recipe.importer import RecipeImporter
+from recipe.pagination import KeysetPagination, SearchPagination
+
+
+class RecipePagination(KeysetPagination):
+    """Keyset pagination for recipes, newest first"""
+    ordering = ('-id',)
+
+
+class ConditionalListMixin:
+    """Answer conditional list requests before running the list query.
+
+    The ETag comes from the user's collection version, which every write
+    path bumps, and Last-Modified from the newest `updated_at`, fetched
+    once per version.
+    """
+
+    def list(self, request, *args, **kwargs):
+        model = self.queryset.model
+        label = model._meta.label_lower
+        etag = conditional.make_etag(
+            cache.get_version(label, request.user.pk),
+            request.get_full_path(),
+            request.accepted_media_type,
+        )
+        modified = cache.last_modified(
+            label, request.user.pk,
+            lambda: model.objects.filter(user=request.user).aggregate(
+                newest=Max('updated_at')
+            )['newest']
+        )
+        return conditional.respond(
+            request, etag, modified,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+
+class CachedListMixin:
+    """Serve rendered JSON lists from the per-user list cache"""
+
+    def list(self, request, *args, **kwargs):
+        """Serve the list from the per-user cache when possible"""
+        renderer = request.accepted_renderer
+        if not cache.enabled() or renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        key = cache.make_key(
+            self.queryset.model._meta.label_lower,
+            request.user.pk,
+            request.get_full_path()
+        )
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, content_type=renderer.media_type)
 
-from core.models import Tag, Ingredient
-from recipe import serializers
+        response = super().list(request, *args, **kwargs)
+        response.accepted_renderer = renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        response.render()
+        cache.set(key, response.content)
+        return response
 
 
-class BaseRecipeAttrViewSet(viewsets.GenericViewSet,
+class ValuesListMixin:
+    """Build list items from values() dicts instead of the serializer.
+
+    Used when the view sets `values_fields`, which must name model
+    fields that the serializer outputs unchanged and in the same order.
+    """
+    values_fields = None
+
+    def list(self, request, *args, **kwargs):
+        if not self.values_fields or not settings.RECIPE_VALUES_LIST:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *self.values_fields
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
+
+class BaseRecipeAttrViewSet(ReplicaRoutingMixin,
+                            ConditionalListMixin,
+                            CachedListMixin,
+                            ValuesListMixin,
+                            viewsets.GenericViewSet,
                             mixins.ListModelMixin,
                             mixins.CreateModelMixin):
     """Base class for viewsets"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    # Matches TagSerializer and IngredientSerializer
+    values_fields = ('id', 'name')
 
     def get_queryset(self):
         """Return Objects for authenticated user"""
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.request.query_params.get('assigned_only') in ('1', 'true'):
+            queryset = filters.assigned_only(queryset, self.recipe_relation)
+        return queryset.order_by(*self.pagination_class.ordering)
 
     def perform_create(self, serializer):
         """Creating New object"""
         serializer.save(user=self.request.user)
 
+    @action(detail=False)
+    def autocomplete(self, request):
+        """Suggest names starting with `prefix` from memory"""
+        prefix = request.query_params.get('prefix', '')
+        if not prefix:
+            raise ValidationError({'prefix': 'This parameter is required.'})
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1),
+                        50)
+        except ValueError:
+            raise ValidationError({'limit': 'Expected a number.'})
+        return Response(autocomplete.suggest(
+            self.queryset.model, request.user, prefix, limit
+        ))
+
+    @action(detail=False, methods=['post'],
+            parser_classes=(FastJSONParser, NDJSONParser))
+    def bulk(self, request):
+        """Create many objects from a JSON array or NDJSON body.
+
+        `on_conflict` decides what happens to names the user already has
+        or that repeat in the payload: `error` (default) rejects the whole
+        request, `ignore` skips them and `merge` returns the existing row.
+        """
+        mode = request.query_params.get('on_conflict', 'error')
+        if mode not in ('error', 'ignore', 'merge'):
+            raise ValidationError({'on_conflict': 'Unknown mode.'})
+        if not isinstance(request.data, list):
+            raise ValidationError('Expected a list of items.')
+        if len(request.data) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise ValidationError('At most %d items per request.' % (
+                settings.RECIPE_BULK_MAX_ITEMS
+            ))
+
+        context = dict(self.get_serializer_context(), skip_unique_check=True)
+        serializer = self.get_serializer(
+            data=request.data, many=True, context=context
+        )
+        serializer.is_valid(raise_exception=True)
+        names = [item['name'] for item in serializer.validated_data]
+
+        model = self.queryset.model
+        try:
+            with transaction.atomic():
+                existing = dict(model.objects.filter(
+                    user=request.user, name__in=names
+                ).values_list('name', 'id'))
+                if mode == 'error':
+                    counts = Counter(names)
+                    duplicates = set(existing).union(
+                        name for name, count in counts.items() if count > 1
+                    )
+                    if duplicates:
+                        return self.conflict(duplicates)
+
+                new = [name for name in dict.fromkeys(names)
+                       if name not in existing]
+                model.objects.bulk_create(
+                    (model(user=request.user, name=name) for name in new),
+                    ignore_conflicts=mode != 'error'
+                )
+                created = dict(model.objects.filter(
+                    user=request.user, name__in=new
+                ).values_list('name', 'id'))
+        except IntegrityError:
+            # A concurrent request inserted one of the names after the
+            # check above
+            return self.conflict(model.objects.filter(
+                user=request.user, name__in=new
+            ).values_list('name', flat=True))
+        # bulk_create sends no signals, so drop the cached lists here
+        cache.bump_version(model._meta.label_lower, request.user.pk)
+
+        ids = dict(existing, **created)
+        results = []
+        for name in names:
+            if created.pop(name, None) is not None:
+                item = {'id': ids[name], 'name': name, 'status': 'created'}
+            elif mode == 'merge':
+                item = {'id': ids.get(name), 'name': name, 'status': 'merged'}
+            else:
+                item = {'name': name, 'status': 'ignored'}
+            results.append(item)
+
+        created_any = any(item['status'] == 'created' for item in results)
+        return Response(
+            results,
+            status=status.HTTP_201_CREATED if created_any
+            else status.HTTP_200_OK
+        )
+
+    def conflict(self, names):
+        return Response(
+            {'duplicates': sorted(names)}, status=status.HTTP_409_CONFLICT
+        )
+
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the databse"""
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    recipe_relation = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage Ingredients in the database"""
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    recipe_relation = 'ingredients'
+
+
+class RecipeViewSet(ReplicaRoutingMixin,
+                    ConditionalListMixin,
+                    viewsets.GenericViewSet,
+                    mixins.ListModelMixin,
+                    mixins.RetrieveModelMixin,
+                    mixins.CreateModelMixin,
+                    mixins.UpdateModelMixin):
+    """Manage recipes in the database"""
+    queryset = Recipe.objects.all()
+    serializer_class = serializers.RecipeSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = RecipePagination
+
+    def get_queryset(self):
+        """Return recipes for the authenticated user"""
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = self.filter_relations(queryset)
+        if self.action in ('list', 'retrieve', 'search'):
+            # One query per relation however many recipes are on the page
+            queryset = queryset.defer('search_vector').prefetch_related(
+                Prefetch(
+                    'tags',
+                    queryset=Tag.objects.only('id', 'name').order_by('name')
+                ),
+                Prefetch(
+                    'ingredients',
+                    queryset=Ingredient.objects.only(
+                        'id', 'name'
+                    ).order_by('name')
+                ),
+            )
+        return queryset.order_by(*self.pagination_class.ordering)
+
+    def filter_relations(self, queryset):
+        """Apply `?tags=`, `?ingredients=` and `?match=any|all`"""
+        params = self.request.query_params
+        match = params.get('match', 'any')
+        if match not in filters.MATCH_MODES:
+            raise ValidationError({'match': 'Expected any or all.'})
+        for relation in filters.RELATIONS:
+            if params.get(relation):
+                ids = filters.parse_ids(params[relation], relation)
+                if match == 'all' and \
+                        len(ids) > settings.RECIPE_FILTER_MAX_ALL_IDS:
+                    raise ValidationError({relation: (
+                        'At most %d ids with match=all.'
+                        % settings.RECIPE_FILTER_MAX_ALL_IDS
+                    )})
+                queryset = filters.filter_recipes(
+                    queryset, relation, ids, match
+                )
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """Answer conditional requests from the recipe's updated_at"""
+        try:
+            updated_at = Recipe.objects.filter(
+                user=request.user, pk=kwargs['pk']
+            ).values_list('updated_at', flat=True).first()
+        except ValueError:
+            updated_at = None
+        if updated_at is None:
+            # Let the regular lookup raise the 404
+            return super().retrieve(request, *args, **kwargs)
+        etag = conditional.make_etag(
+            kwargs['pk'], updated_at.isoformat(), request.accepted_media_type
+        )
+        return conditional.respond(
+            request, etag, conditional.timestamp(updated_at),
+            lambda: super(RecipeViewSet, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+    @action(detail=False)
+    def search(self, request):
+        """Return recipes matching every word of `q`, best match first.
+
+        Words match as prefixes of title, tag and ingredient words; title
+        matches rank highest.
+        """
+        text = request.query_params.get('q', '')
+        if not search.terms(text):
+            raise ValidationError({'q': 'Enter at least one word.'})
+        paginator = SearchPagination()
+        ids = list(paginator.paginate_queryset(
+            search.search(request.user, text), request, view=self
+        ))
+        recipes = self.get_queryset().in_bulk(ids)
+        # A recipe deleted since the ids were looked up is left out
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_serializer_class(self):
+        """Return the serializer class for the current action"""
+        if self.action in ('list', 'search'):
+            return serializers.RecipeListSerializer
+        if self.action == 'retrieve':
+            return serializers.RecipeDetailSerializer
+        return self.serializer_class
+
+    def perform_create(self, serializer):
+        """Create a new recipe for the authenticated user"""
+        serializer.save(user=self.request.user)
+
+
+class RecipeExportView(ReplicaRoutingMixin, APIView):
+    """Stream the authenticated user's recipe library as NDJSON or CSV"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+    streams = {'ndjson': export.stream_ndjson, 'csv': export.stream_csv}
+
+    def get(self, request, format=None):
+        renderer = request.accepted_renderer
+        stream = self.streams[renderer.format](
+            request.user, settings.RECIPE_EXPORT_CHUNK_SIZE
+        )
+        response = StreamingHttpResponse(
+            stream, content_type=renderer.media_type
+        )
+        response['Content-Disposition'] = \
+            'attachment; filename="recipes.%s"' % renderer.format
+        return response
+
+
+class RecipeImportView(ReplicaRoutingMixin, APIView):
+    """Import recipes for the authenticated user from an NDJSON body"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, format=None):
+        if request.content_type.split(';')[0] != NDJSONParser.media_type:
+            raise UnsupportedMediaType(request.content_type)
+        # Read the body line by line instead of parsing it all up front
+        importer = RecipeImporter(
+            request.user, batch_size=settings.RECIPE_IMPORT_BATCH_SIZE
+        )
+        stats = importer.run(request.stream or ())
+        # Some batches may be committed when a later one fails
+        return Response(stats, status=(
+            status.HTTP_207_MULTI_STATUS if stats['stopped_at']
+            else status.HTTP_201_CREATED
+        ))
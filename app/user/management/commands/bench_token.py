@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core import hashers
+from core.benchmark import api_client, summarize
+
+EMAIL = 'bench-token@whbx.io'
+PASSWORD = 'Password1'
+
+
+class Command(BaseCommand):
+    """Measure /api/user/token/ throughput under concurrent logins."""
+    help = 'Benchmark token creation with inline and offloaded hashing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--workers', default='0,2,4',
+            help='Comma separated PASSWORD_HASH_WORKERS values to compare'
+        )
+
+    def handle(self, *args, **options):
+        api_client()  # set up the test environment outside the overrides
+        get_user_model().objects.filter(email=EMAIL).delete()
+        get_user_model().objects.create_user(EMAIL, PASSWORD)
+        try:
+            for workers in options['workers'].split(','):
+                with override_settings(PASSWORD_HASH_WORKERS=int(workers)):
+                    self.run(
+                        int(workers),
+                        options['requests'],
+                        options['concurrency']
+                    )
+                hashers.shutdown()
+        finally:
+            get_user_model().objects.filter(email=EMAIL).delete()
+
+    def run(self, workers, requests, concurrency):
+        url = reverse('user:token')
+        payload = {'email': EMAIL, 'password': PASSWORD}
+
+        def login(_):
+            client = api_client()
+            start = time.perf_counter()
+            try:
+                res = client.post(url, payload)
+                assert res.status_code == 200, res.content
+            finally:
+                connection.close()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(login, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        stats = summarize(samples)
+        self.stdout.write(
+            'hash workers %d: %7.1f req/s  p50 %7.1fms  p99 %7.1fms' % (
+                workers, requests / elapsed, stats['p50'], stats['p99']
+            )
+        )
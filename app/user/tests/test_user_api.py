@@ -2,9 +2,10 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.testing import BudgetedAPIClient
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
@@ -19,7 +20,7 @@ class PublicUserApiTests(TestCase):
     """Test the user api public."""
 
     def setUp(self):
-        self.client = APIClient()
+        self.client = BudgetedAPIClient()
 
     def test_create_valid_user_success(self):
         """Test creating a valid user with payload successfully"""
@@ -113,7 +114,7 @@ class PrivateUserApiTests(TestCase):
             name='Waqas Hafeez'
         )
 
-        self.client = APIClient()
+        self.client = BudgetedAPIClient()
         self.client.force_authenticate(user=self.user)
 
     def test_retrieve_profile_success(self):
@@ -142,3 +143,22 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_profile_not_modified(self):
+        """Test a matching ETag returns 304 without queries"""
+        res = self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_etag_changes_on_update(self):
+        """Test updating the profile changes the ETag"""
+        etag = self.client.get(ME_URL)['ETag']
+        self.client.patch(ME_URL, {'name': 'Waqas'})
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Waqas')
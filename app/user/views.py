@@ -1,26 +1,42 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from core import conditional
+from core.authentication import CachedTokenAuthentication
+from core.routers import ReplicaRoutingMixin
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(ReplicaRoutingMixin, generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(ReplicaRoutingMixin, ObtainAuthToken):
     """create a new auth token for the user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ReplicaRoutingMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+    def retrieve(self, request, *args, **kwargs):
+        """Answer conditional requests from the user's updated_at"""
+        user = request.user
+        etag = conditional.make_etag(
+            user.pk, user.updated_at.isoformat(), request.accepted_media_type
+        )
+        return conditional.respond(
+            request, etag, conditional.timestamp(user.updated_at),
+            lambda: super(ManageUserView, self).retrieve(
+                request, *args, **kwargs
+            )
+        )